@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+.app_cache 디렉터리 캐시 계층
+
+- 메모리 미러: 파일 내용을 (mtime_ns, size)와 함께 보관하고, 디스크가 바뀌지 않았으면 다시 읽지 않음
+- 변경 시에만 쓰기: 저장할 내용의 SHA-256이 현재 내용과 같으면 쓰지 않음
+- 원자적 쓰기: 같은 디렉터리의 임시파일에 쓴 뒤 os.replace로 교체
+- 파일 잠금: 여러 Streamlit 워커가 같은 디렉터리를 공유해도 쓰기가 섞이지 않도록 .lock 파일에 배타 잠금
+  (fcntl이 없는 환경에서는 잠금 없이 원자적 교체만 수행)
+
+사용 예)
+    cache = AppCache(Path(__file__).parent / ".app_cache")
+    cache.write_bytes("logo.png", png_bytes)     # 내용이 같으면 쓰지 않음
+    cache.read_bytes("logo.png")                 # 디스크 변경이 없으면 메모리에서 반환
+"""
+
+from __future__ import annotations
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock, local
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    import fcntl  # POSIX
+except ImportError:  # Windows 등
+    fcntl = None
+
+
+_LOCK_NAME = ".lock"
+
+
+class AppCache:
+    """파일 단위 캐시 (메모리 미러 + dirty check + 원자적 쓰기)."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # name -> (stat 서명, 내용, sha256)
+        self._mirror: Dict[str, Tuple[Tuple[int, int], bytes, str]] = {}
+        self._mutex = Lock()
+        self._held = local()  # 스레드별 잠금 깊이 (같은 스레드에서 다시 잠가도 교착 없이 통과)
+        self.stats = {"disk_reads": 0, "disk_writes": 0, "skipped_writes": 0}
+
+    # ---- 내부 유틸 ----
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    @contextmanager
+    def file_lock(self):
+        """디렉터리 단위 배타 잠금 (다른 워커와의 쓰기/정리 직렬화, 같은 스레드 안에서는 재진입 가능)."""
+        depth = getattr(self._held, "depth", 0)
+        if fcntl is None or depth > 0:
+            self._held.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._held.depth = depth
+            return
+        with open(self.root / _LOCK_NAME, "a+b") as lf:
+            fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+            self._held.depth = 1
+            try:
+                yield
+            finally:
+                self._held.depth = 0
+                fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+
+    # ---- 읽기 ----
+    def read_bytes(self, name: str) -> Optional[bytes]:
+        path = self.root / name
+        sig = self._signature(path)
+        with self._mutex:
+            if sig is None:
+                self._mirror.pop(name, None)
+                return None
+            cached = self._mirror.get(name)
+            if cached is not None and cached[0] == sig:
+                return cached[1]
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                self._mirror.pop(name, None)
+                return None
+            self.stats["disk_reads"] += 1
+            self._mirror[name] = (sig, data, hashlib.sha256(data).hexdigest())
+            return data
+
+    def read_json(self, name: str, default=None):
+        data = self.read_bytes(name)
+        if data is None:
+            return default
+        try:
+            return json.loads(data.decode("utf-8"))
+        except Exception:
+            return default
+
+    # ---- 쓰기 ----
+    def write_bytes(self, name: str, data: bytes, mirror: bool = True) -> bool:
+        """내용이 바뀐 경우에만 원자적으로 기록. 실제로 썼으면 True.
+        mirror=False: 메모리 미러에 보관하지 않음 (자산 저장소처럼 별도 캐시가 있는 큰 파일용)"""
+        data = bytes(data)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.root / name
+
+        # 1) 잠금 없이 빠른 확인: 메모리 미러가 디스크와 같고 내용도 같으면 종료
+        sig = self._signature(path)
+        with self._mutex:
+            cached = self._mirror.get(name)
+            if cached is not None and sig is not None and cached[0] == sig and cached[2] == digest:
+                self.stats["skipped_writes"] += 1
+                return False
+
+        # 2) 잠금 후 디스크 기준으로 다시 확인 (다른 워커가 먼저 같은 내용을 썼을 수 있음)
+        with self.file_lock():
+            if mirror:
+                current = self.read_bytes(name)
+            else:
+                try:
+                    current = path.read_bytes()
+                except FileNotFoundError:
+                    current = None
+            if current is not None and hashlib.sha256(current).hexdigest() == digest:
+                with self._mutex:
+                    self.stats["skipped_writes"] += 1
+                return False
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+            except Exception:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+
+            new_sig = self._signature(path)
+            with self._mutex:
+                self.stats["disk_writes"] += 1
+                if mirror and new_sig is not None:
+                    self._mirror[name] = (new_sig, data, digest)
+        return True
+
+    def write_json(self, name: str, obj) -> bool:
+        # 키 순서를 고정해 같은 내용이면 같은 해시가 나오도록 함
+        data = json.dumps(obj, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        return self.write_bytes(name, data)
+
+
+_caches: Dict[str, AppCache] = {}
+_caches_lock = Lock()
+
+
+def get_app_cache(root: Path) -> AppCache:
+    """경로별 AppCache 1개를 프로세스 전역에서 공유 (세션 간 메모리 미러 공유)."""
+    key = str(Path(root).resolve())
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = AppCache(Path(key))
+            _caches[key] = cache
+        return cache
@@ -19,23 +19,26 @@ def _inject_force_top_once() -> None:
 # === /Force scroll to top ===
 import streamlit as st
 import json
-import io
 import os
-import tempfile
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill
-from openpyxl.drawing.image import Image as XLImage
-from PIL import Image as PILImage
-
 from employment_tax_credit_calc import (
     CompanySize, Region, HeadcountInputs,
-    load_params_from_json, calc_gross_credit,
-    apply_caps_and_min_tax, calc_clawback, PolicyParameters
+    load_params_from_json, PolicyParameters
+)
+from calc_graph import CalcGraph
+from session_store import get_session_store
+from asset_store import (
+    BROWSER_COOKIE, AssetStore, browser_tenant, get_asset_store, is_browser_token, new_browser_token, user_tenant,
 )
+from excel_report import render_report_xlsx
+from excel_jobs import content_key, get_excel_jobs
+from scenario_store import ScenarioRecord, ScenarioStore, get_scenario_store
+from policy_registry import PolicyRegistry, load_registry
+from params_schema import ParamsValidationError, parse_params_dict
+from industry_index import compile_exclusions
 
 st.set_page_config(page_title="통합고용세액공제 계산기", layout="wide")
 # Force scroll to top on load
@@ -57,31 +60,80 @@ def _cache_dir() -> Path:
     d.mkdir(parents=True, exist_ok=True)
     return d
 
+def _asset_store() -> AssetStore:
+    # 프로세스 전역 공유: 로고는 SHA-256 내용주소로 1번만 저장, 테넌트별 포인터로 참조
+    return get_asset_store(_cache_dir())
+
+def _login_tenant() -> str | None:
+    # 로그인(st.login, OIDC) 사용자면 발급자 + subject로 테넌트 결정
+    user = getattr(st, "user", None) or getattr(st, "experimental_user", None)
+    try:
+        if user is not None and getattr(user, "is_logged_in", False):
+            return user_tenant(user.get("iss", ""), user.get("sub") or user.get("email"))
+    except Exception:
+        pass
+    return None
+
+def _set_browser_cookie(token: str) -> None:
+    # 브라우저 토큰을 1년짜리 쿠키로 저장 (다음 접속부터 st.context.cookies로 읽음, token은 URL-safe 문자만)
+    _components.html(f"""
+    <script>
+    (function() {{
+      var secure = window.parent.location.protocol === 'https:' ? '; Secure' : '';
+      window.parent.document.cookie = '{BROWSER_COOKIE}={token}; path=/; max-age=31536000; SameSite=Strict' + secure;
+    }})();
+    </script>
+    """, height=0)
+
+def _tenant_id() -> str:
+    # 테넌트 구분: 로그인 사용자 → 브라우저별 임의 토큰(쿠키) 순, 세션 안에서는 한 번 정한 값 유지
+    # URL 쿼리 등 사용자가 적는 값은 쓰지 않고, 공용 테넌트로 돌아가지도 않음
+    tenant = st.session_state.get("_tenant_id")
+    if tenant:
+        return tenant
+    tenant = _login_tenant()
+    if tenant is None:
+        try:
+            token = st.context.cookies.get(BROWSER_COOKIE)
+        except Exception:  # st.context 미지원 버전 → 이 세션 전용 토큰
+            token = None
+        if not is_browser_token(token):
+            token = new_browser_token()
+            _set_browser_cookie(token)
+        tenant = browser_tenant(token)
+    st.session_state["_tenant_id"] = tenant
+    return tenant
+
+def _scenario_store() -> ScenarioStore:
+    # 계산 이력은 세션과 무관하게 SQLite(WAL)에 영구 보관, 프로세스 전역 연결 공유
+    return get_scenario_store(str(_cache_dir() / "scenarios.db"))
+
+def _policy_registry() -> PolicyRegistry:
+    # policies/*.json(과세연도별 시행령) → 컴파일 스냅샷은 .app_cache에 보관, 원본이 바뀔 때만 다시 컴파일
+    try:
+        here = Path(__file__).parent
+    except NameError:
+        here = Path(".").resolve()
+    return load_registry(str(here / "policies"), str(_cache_dir() / "policy_snapshot.npz"))
+
 def save_cached_logo(png_bytes: bytes):
     try:
-        ( _cache_dir() / "logo.png" ).write_bytes(png_bytes)
+        _asset_store().set_logo(_tenant_id(), png_bytes)
     except Exception:
         pass
 
 def load_cached_logo() -> bytes | None:
-    p = _cache_dir() / "logo.png"
-    return p.read_bytes() if p.exists() else None
+    return _asset_store().get_logo(_tenant_id())
 
 def save_prefs(company_name: str):
     try:
-        pref = {"company_name": company_name}
-        ( _cache_dir() / "prefs.json" ).write_text(json.dumps(pref, ensure_ascii=False), encoding="utf-8")
+        _asset_store().set_company_name(_tenant_id(), company_name)
     except Exception:
         pass
 
 def load_prefs() -> dict:
-    p = _cache_dir() / "prefs.json"
-    if p.exists():
-        try:
-            return json.loads(p.read_text(encoding="utf-8"))
-        except Exception:
-            return {}
-    return {}
+    name = _asset_store().get_company_name(_tenant_id())
+    return {"company_name": name} if name else {}
 
 # =====================
 # 세션 상태 기본 초기화 + 캐시 로드
@@ -96,12 +148,16 @@ _ensure("saved_company_name", None)
 _ensure("followup_table", None)
 _ensure("calc_summary", None)
 _ensure("last_calc", None)
+_ensure("calc_graph", CalcGraph())  # 단계별 증분 계산 (입력이 바뀐 단계만 재계산)
+
+# 큰 값(로고/표/계산이력/채팅)은 세션 예산 안에서 관리 (초과 시 LRU 순으로 디스크에 내림)
+store = get_session_store(st.session_state)
 
 # 캐시에서 로고/기관명 불러오기 (세션이 비어 있을 때만)
-if st.session_state.get("saved_logo_png") is None:
+if store.get("saved_logo_png") is None:
     cached = load_cached_logo()
     if cached:
-        st.session_state.saved_logo_png = cached
+        store.set("saved_logo_png", cached)
 prefs = load_prefs()
 if st.session_state.get("saved_company_name") is None and prefs.get("company_name"):
     st.session_state.saved_company_name = prefs["company_name"]
@@ -112,13 +168,13 @@ trigger_calc = False
 # ==== 사후관리 표 유틸 ====
 def ensure_followup_table(retention_years:int, default_total:int, default_youth:int):
     import pandas as _pd
-    cur = st.session_state.get("followup_table")
+    cur = store.get("followup_table")
     target_years = list(range(1, int(retention_years) + 1))
 
     if cur is None or getattr(cur, "empty", True):
-        st.session_state.followup_table = _pd.DataFrame(
+        store.set("followup_table", _pd.DataFrame(
             [{"연차": y, "사후연도 상시": int(default_total), "사후연도 청년등": int(default_youth)} for y in target_years]
-        )
+        ))
         return
 
     cur = cur.copy()
@@ -134,7 +190,7 @@ def ensure_followup_table(retention_years:int, default_total:int, default_youth:
             rows.append({"연차": y, "사후연도 상시": tot, "사후연도 청년등": yth})
         else:
             rows.append({"연차": y, "사후연도 상시": int(default_total), "사후연도 청년등": int(default_youth)})
-    st.session_state.followup_table = _pd.DataFrame(rows).sort_values("연차").reset_index(drop=True)
+    store.set("followup_table", _pd.DataFrame(rows).sort_values("연차").reset_index(drop=True))
 
 with st.sidebar:
     st.header("1) 최근 시행령 적용")
@@ -171,6 +227,7 @@ with st.sidebar:
     except Exception as _e:
         st.caption(f"템플릿 생성 오류: {_e}")
     default_info = st.toggle("당초 시행령 적용(미업로드시)", value=True)
+    tax_year = st.number_input("과세연도", min_value=2000, max_value=2100, value=datetime.now().year - 1, step=1)
 
     st.header("2) 보고서 옵션")
     company_name = st.text_input("회사/기관명 (머리글용)", value=st.session_state.saved_company_name or "(기관명)")
@@ -181,10 +238,13 @@ with st.sidebar:
     if logo_file is not None:
         logo_bytes = logo_file.getvalue()
         if remember_logo:
-            st.session_state.saved_logo_png = logo_bytes
+            store.set("saved_logo_png", logo_bytes)
             save_cached_logo(logo_bytes)  # 디스크 캐시
-    elif st.session_state.saved_logo_png is not None:
-        logo_bytes = st.session_state.saved_logo_png or load_cached_logo()
+    elif store.get("saved_logo_png") is not None:
+        logo_bytes = store.get("saved_logo_png") or load_cached_logo()
+
+    _usage = store.usage()
+    st.caption(f"세션 메모리 {_usage['memory_bytes'] / 1024:,.0f}KB / 디스크 {_usage['disk_bytes'] / 1024:,.0f}KB")
 
     if company_name:
         st.session_state.saved_company_name = company_name
@@ -194,40 +254,36 @@ with st.sidebar:
     params: PolicyParameters = None
     if uploaded is not None:
         try:
-            cfg = json.load(uploaded)
-            tmp_path = "._tmp_params.json"
-            with open(tmp_path, "w", encoding="utf-8") as f:
-                json.dump(cfg, f, ensure_ascii=False)
-            params = load_params_from_json(tmp_path)
-            os.remove(tmp_path)
+            # 임시파일 없이 바로 검증/변환 (모든 오류를 JSON 경로와 함께 표시)
+            params = parse_params_dict(json.load(uploaded))
             st.success("업로드한 파라미터를 불러왔습니다.")
+        except ParamsValidationError as e:
+            st.error("파라미터 검증 실패 ({}건)\n\n".format(len(e.errors)) + "\n".join(f"- `{x.path}` {x.message}" for x in e.errors))
         except Exception as e:
             st.error(f"파라미터 로딩 실패: {e}")
     elif default_info:
-        demo_cfg = {
-            "per_head_basic": {
-                "중소기업": {"수도권": 1200000, "지방": 1300000},
-                "중견기업": {"수도권": 900000, "지방": 1000000},
-                "대기업":   {"수도권": 600000, "지방": 700000}
-            },
-            "per_head_youth": {
-                "중소기업": {"수도권": 1500000, "지방": 1600000},
-                "중견기업": {"수도권": 1100000, "지방": 1200000},
-                "대기업":   {"수도권": 800000,  "지방": 900000}
-            },
-            "per_head_conversion": 800000,
-            "per_head_return_from_parental": 800000,
-            "retention_years": {"중소기업": 3, "중견기업": 3, "대기업": 2},
-            "max_credit_total": None,
-            "min_tax_limit_rate": 0.07,
-            "excluded_industries": ["유흥주점업", "기타소비성서비스업"]
-        }
-        tmp_path = "._tmp_params_demo.json"
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(demo_cfg, f, ensure_ascii=False)
-        params = load_params_from_json(tmp_path)
-        os.remove(tmp_path)
-       
+        # 과세연도에 시행 중인 시행령 (policies/ 레지스트리)
+        try:
+            _registry = _policy_registry()
+            try:
+                _version = _registry.version_for_year(int(tax_year))
+            except KeyError:
+                if not _registry.years:
+                    raise
+                # 가장 이른 시행령보다 앞선 연도 → 가장 이른 버전으로 계산하고 경고 (계산이 막히지 않도록)
+                _version = _registry.version_for_year(_registry.years[0])
+                st.warning(f"{int(tax_year)}년에 시행 중인 시행령이 없어 가장 이른 "
+                           f"{_version.name}({_version.effective_year}년 시행)을 적용합니다.")
+            params = _version.params
+            st.caption(f"적용 시행령: {_version.name} ({_version.effective_year}년 시행)")
+        except KeyError as e:
+            st.error(e.args[0])
+        except Exception as e:
+            st.error(f"시행령 레지스트리 로딩 실패: {e}")
+
+
+# 일괄 계산 페이지(pages/batch_upload.py)에서 같은 파라미터를 재사용
+st.session_state.policy_params = params
 
 st.subheader("기업 정보 및 사후관리 옵션")
 colA, colB = st.columns(2)
@@ -236,6 +292,8 @@ with colA:
     region_label = st.selectbox("지역", [r.value for r in Region], index=1, key="main_region")
     size = CompanySize(size_label)
     region = Region(region_label)
+    industry_code = st.text_input("업종코드 (KSIC, 선택)", value="", key="main_industry_code",
+                                  help="시행령의 제외업종(excluded_industries) 코드 앞자리와 비교합니다.")
 with colB:
     clawback_options = {
         "비례 추징 (감소율만큼)": "proportional",
@@ -271,8 +329,17 @@ st.session_state.current_inputs = {
     "returned_parental": int(returned_parental),
     "tax_before_credit": int(tax_before_credit),
     "clawback_method": clawback_method,
+    "tax_year": int(tax_year),
+    "industry_code": industry_code.strip(),
 }
 
+# 제외업종 확인 (시행령 excluded_industries의 KSIC 앞자리)
+excluded_reason = ""
+if params is not None and industry_code.strip():
+    excluded_reason = compile_exclusions(params.excluded_industries).match(industry_code)
+    if excluded_reason:
+        st.warning(f"{excluded_reason} — 세액공제 대상이 아닙니다.")
+
 st.divider()
 run = st.button("계산하기", type="primary", disabled=(params is None))
 
@@ -280,6 +347,9 @@ if run:
     if params is None:
         st.error("파라미터(JSON)를 먼저 불러오세요.")
         st.stop()
+    if excluded_reason:
+        st.error(f"{excluded_reason} — 계산하지 않습니다.")
+        st.stop()
 
     heads = HeadcountInputs(
         prev_total=int(prev_total),
@@ -289,9 +359,15 @@ if run:
         converted_regular=int(converted_regular),
         returned_from_parental_leave=int(returned_parental),
     )
-    gross = calc_gross_credit(size, region, heads, params)
-    applied = apply_caps_and_min_tax(gross, params, tax_before_credit=int(tax_before_credit) if tax_before_credit else None)
-    retention_years = params.retention_years[size]
+    graph = st.session_state.calc_graph
+    graph.set_params(params)
+    graph.set_company(size, region)
+    graph.set_heads(heads)
+    graph.set_tax_before_credit(int(tax_before_credit) if tax_before_credit else None)
+    graph.set_clawback_method(clawback_method)
+    gross = graph.gross
+    applied = graph.applied
+    retention_years = graph.retention_years
 
     st.session_state.calc_summary = {
         "gross": int(gross),
@@ -320,7 +396,8 @@ if summary is not None:
     st.caption("표를 입력한 뒤 아래 **[추징세액 계산하기]** 버튼을 누르면 표가 자동 반영되어 계산됩니다.")
 
     with st.container():
-        buf_df = st.session_state.followup_table.copy() if st.session_state.followup_table is not None else pd.DataFrame()
+        _ft = store.get("followup_table")
+        buf_df = _ft.copy() if _ft is not None else pd.DataFrame()
         colcfg = {
             "연차": st.column_config.NumberColumn("연차", step=1, disabled=True),
             "사후연도 상시": st.column_config.NumberColumn("사후연도 상시", step=1, min_value=0),
@@ -336,44 +413,43 @@ if summary is not None:
         )
 
     if st.button("🔁 추징세액 계산하기", type="primary"):
-        st.session_state.followup_table = edited.copy()
+        store.set("followup_table", edited.copy())
         trigger_calc = True
 
     if trigger_calc:
-        schedule_records = []
-        for _, row in st.session_state.followup_table.iterrows():
-            yidx = int(row["연차"])
-            fol_total = int(row["사후연도 상시"])
-            fol_youth = int(row.get("사후연도 청년등", 0))
-
-            claw = calc_clawback(
-                credit_applied=int(summary["applied"]),
-                base_headcount_at_credit=int(summary["base_headcount"]),
-                headcount_in_followup_year=fol_total,
-                retention_years_for_company=int(summary["retention_years"]),
-                year_index_from_credit=yidx,
-                method=summary["clawback_method"],
-            )
-            schedule_records.append({
-                "연차": yidx,
-                "사후연도 상시": fol_total,
-                "사후연도 청년등": fol_youth,
-                "추징세액": int(claw),
-            })
+        # 그래프에는 요약 시점의 입력이 남아 있으므로 변경된 연차 행만 재계산됨
+        graph = st.session_state.calc_graph
+        graph.set_followups(
+            (int(row["연차"]), int(row["사후연도 상시"]), int(row.get("사후연도 청년등", 0)))
+            for _, row in store.get("followup_table").iterrows()
+        )
+        schedule_records = graph.schedule_records()
         schedule_df = pd.DataFrame(schedule_records).sort_values("연차").reset_index(drop=True)
         total_clawback = int(schedule_df["추징세액"].sum()) if not schedule_df.empty else 0
 
         st.dataframe(schedule_df, use_container_width=True)
         st.metric("추징세액 합계", f"{total_clawback:,} 원")
 
-        st.session_state.last_calc = {
+        store.set("last_calc", {
             **summary,
             "schedule_records": schedule_df.to_dict(orient="records"),
             "total_clawback": total_clawback,
-        }
+        })
+        try:
+            _ss = _scenario_store()
+            _ss.add_scenario(ScenarioRecord.from_last_calc(
+                store.get("last_calc"),
+                st.session_state.get("current_inputs"),
+                company=st.session_state.get("saved_company_name") or None,
+                tenant=_tenant_id(),
+                tax_year=int(tax_year),
+                params_hash=_ss.save_params(params) if params is not None else None,
+            ))
+        except Exception as e:
+            st.caption(f"계산 이력 저장 실패: {e}")
 
 if not trigger_calc:
-    _prev = st.session_state.get("last_calc")
+    _prev = store.get("last_calc")
     if _prev is not None and _prev.get("schedule_records"):
         import pandas as pd
         schedule_df = pd.DataFrame(_prev["schedule_records"])
@@ -381,8 +457,27 @@ if not trigger_calc:
         st.dataframe(schedule_df, use_container_width=True)
         st.metric("추징세액 합계", f"{int(_prev.get('total_clawback',0)):,} 원")
 
-safe_total_clawback = (st.session_state.last_calc["total_clawback"]
-    if (st.session_state.get("last_calc") and "total_clawback" in st.session_state.last_calc)
+# 계산 이력 (현재 테넌트의 최근 시나리오, 회사/기관명이 있으면 그 회사만)
+with st.expander("계산 이력 (최근 20건)"):
+    try:
+        _hist = _scenario_store().query(
+            _tenant_id(), company=st.session_state.get("saved_company_name") or None, limit=20,
+        )
+    except Exception as e:
+        _hist = []
+        st.caption(f"계산 이력 조회 실패: {e}")
+    if _hist:
+        st.dataframe(pd.DataFrame([{
+            "시각": h["created_at"], "기업규모": h["company_size"], "지역": h["region"],
+            "추징방식": h["clawback_method"], "적용 공제액": h["applied"], "추징세액 합계": h["total_clawback"],
+            "파라미터 버전": h["params_hash"],
+        } for h in _hist]), use_container_width=True, hide_index=True)
+    else:
+        st.caption("저장된 계산 이력이 없습니다.")
+
+_last = store.get("last_calc")
+safe_total_clawback = (_last["total_clawback"]
+    if (_last and "total_clawback" in _last)
     else 0)
 
 st.session_state.calc_context = {
@@ -397,149 +492,68 @@ st.session_state.calc_context = {
 }
 
 # ============================
-# 엑셀 생성 (요약 + 사후관리 결과표) + 상단 로고 워터마크 삽입 (임시파일 방식)
+# 엑셀 생성 (요약 + 사후관리 결과표) + 상단 로고 워터마크 삽입 (excel_report)
+# - 스크립트 스레드를 막지 않도록 백그라운드 스레드 풀(excel_jobs)에서 생성
+# - 같은 내용(해시)의 요청은 진행 중/완료된 작업에 합류, 완성되면 다운로드 버튼 활성화
+# - 작업 키는 내용만으로 정함: 생성일시는 그 내용으로 처음 제출한 작업의 시각 (합류한 요청은 같은 파일을 받음)
+# - 입력이 바뀐 재실행에서만 제출, 완성된 bytes는 작업 관리자(LRU, 최근 max_results개)에만 보관
+#   (세션 저장소에 다시 복사하지 않음: 같은 내용을 여러 세션이 받아도 메모리에는 1부)
 # ============================
-def _build_excel():
-    """엑셀 내보내기: (1) 결과요약 시트(상단 로고 워터마크 포함), (2) 사후관리 결과표 시트."""
-    buffer = io.BytesIO()
-    wb = Workbook()
-    tmp_logo_path = None
-
-    # ---- 시트1: 결과요약 ----
-    ws_sum = wb.active
-    ws_sum.title = "결과요약"
-
-    # 로고 워터마크 삽입: 임시파일에 저장 후 openpyxl로 로드 (A1 위치)
-    start_row = 1
-    logo_bytes = st.session_state.get("saved_logo_png") or load_cached_logo()
-    if logo_bytes:
-        try:
-            img = PILImage.open(io.BytesIO(logo_bytes))
-            if img.mode != "RGBA":
-                img = img.convert("RGBA")
-            max_w = 420
-            if img.width > max_w:
-                ratio = max_w / float(img.width)
-                img = img.resize((int(img.width * ratio), int(img.height * ratio)))
-            # 매우 연하게(약 15% 불투명)
-            r, g, b, a = img.split()
-            a = a.point(lambda p: int(p * 0.15))
-            img = PILImage.merge("RGBA", (r, g, b, a))
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp:
-                img.save(tmp, format="PNG")
-                tmp_logo_path = tmp.name
-            xl_img = XLImage(tmp_logo_path)
-            ws_sum.add_image(xl_img, "A1")
-            start_row = 8
-            ws_sum.row_dimensions[1].height = 24
-        except Exception:
-            start_row = 1
-
-    # 데이터 작성
-    summary = st.session_state.get("calc_summary") or {}
-    inputs = st.session_state.get("current_inputs") or {}
-    last = st.session_state.get("last_calc") or {}
-
-    header_row = start_row
-    ws_sum.cell(row=header_row, column=1, value="항목")
-    ws_sum.cell(row=header_row, column=2, value="값")
-
-    rows = [
-        ("생성일시", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-        ("회사/기관명", st.session_state.get("saved_company_name") or ""),
-        ("기업규모", summary.get("company_size", "")),
-        ("지역", summary.get("region", "")),
-        ("유지기간(년)", summary.get("retention_years", "")),
-        ("총공제액(최저한세/한도 전)", f"{summary.get('gross', 0):,}"),
-        ("적용 공제액(최저한세/한도 후)", f"{summary.get('applied', 0):,}"),
-        ("세전세액(입력)", f"{inputs.get('tax_before_credit', 0):,}"),
-        ("추징 방식", summary.get("clawback_method", inputs.get('clawback_method', ''))),
-        ("추징 합계", f"{last.get('total_clawback', 0):,}"),
-        ("전년 상시/청년등", f"{inputs.get('prev_total', 0)}/{inputs.get('prev_youth', 0)}"),
-        ("당해 상시/청년등", f"{inputs.get('curr_total', 0)}/{inputs.get('curr_youth', 0)}"),
-        ("정규직 전환 / 육아휴직 복귀", f"{inputs.get('converted_regular', 0)} / {inputs.get('returned_parental', 0)}"),
-    ]
-    r = header_row + 1
-    for k, v in rows:
-        ws_sum.cell(row=r, column=1, value=k)
-        ws_sum.cell(row=r, column=2, value=v)
-        r += 1
-
-    bold = Font(bold=True)
-    ws_sum.cell(row=header_row, column=1).font = bold
-    ws_sum.cell(row=header_row, column=2).font = bold
-    ws_sum.column_dimensions["A"].width = 28
-    ws_sum.column_dimensions["B"].width = 36
-
-    # ---- 시트2: 사후관리 결과표 ----
-    ws = wb.create_sheet(title="사후관리 결과표")
-    headers = ["연차", "사후연도 상시", "사후연도 청년등", "추징세액"]
-    ws.append(headers)
-    last_calc = st.session_state.get("last_calc")
-    if last_calc and last_calc.get("schedule_records"):
-        for row in last_calc["schedule_records"]:
-            ws.append([row["연차"], row["사후연도 상시"], row.get("사후연도 청년등", 0), row["추징세액"]])
-
-    # === [변경 v2] 숫자 있는 첫 3칸 연한 노랑 ===
-    try:
-        # openpyxl은 RGB 6자리 코드 권장
-        yellow_fill = PatternFill(start_color="FCE8A1", end_color="FCE8A1", fill_type="solid")
-
-        # 헤더(1행)에서 대상 열 인덱스 계산 (정수 인덱스 보장)
-        header_map = {cell.value: idx for idx, cell in enumerate(ws[1], start=1)}
-        col_total = header_map.get("사후연도 상시")
-        col_youth = header_map.get("사후연도 청년등")
-
-        def has_number(v):
-            if v is None:
-                return False
-            # 숫자 or 숫자 문자열 허용
-            try:
-                float(str(v).replace(',', '').strip())
-                return True
-            except Exception:
-                return False
-
-        # 숫자가 들어있는 셀 3개씩만 채움
-        filled_total = 0
-        filled_youth = 0
-        for r in range(2, ws.max_row + 1):
-            if col_total and filled_total < 3:
-                c = ws.cell(row=r, column=col_total)
-                if has_number(c.value):
-                    c.fill = yellow_fill
-                    filled_total += 1
-
-            if col_youth and filled_youth < 3:
-                c = ws.cell(row=r, column=col_youth)
-                if has_number(c.value):
-                    c.fill = yellow_fill
-                    filled_youth += 1
-
-            if filled_total >= 3 and filled_youth >= 3:
-                break
-    except Exception as _style_err:
-        # 색상 적용 실패 시에도 저장은 진행
-        pass
+def _excel_job():
+    """엑셀 내보내기 작업 제출: (1) 결과요약 시트(상단 로고 워터마크 포함), (2) 사후관리 결과표 시트."""
+    summary = st.session_state.get("calc_summary")
+    inputs = st.session_state.get("current_inputs")
+    last_calc = store.get("last_calc")
+    company_name = st.session_state.get("saved_company_name") or ""
+    logo_png = store.get("saved_logo_png") or load_cached_logo()
+    key = content_key(summary, inputs, last_calc, company_name, logo_png or b"")
+    fut = st.session_state.get("excel_job_future")
+    if (st.session_state.get("excel_job_key") == key and fut is not None
+            and not (fut.done() and fut.exception() is not None)):
+        return fut
+    # 서식/로고는 미리 만든 골격을 재사용하고 값만 채움
+    fut = get_excel_jobs().submit(
+        key, render_report_xlsx,
+        summary=summary, inputs=inputs, last_calc=last_calc,
+        company_name=company_name, logo_png=logo_png, created_at=datetime.now().replace(microsecond=0),
+    )
+    st.session_state.excel_job_key = key
+    st.session_state.excel_job_future = fut
+    return fut
+
+
+def _excel_download(fut):
+    excel_name = f"tax_credit_result_pro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    ready = fut.done() and fut.exception() is None
+    if fut.done() and not ready:
+        st.error(f"엑셀 생성 실패: {fut.exception()}")
+    elif not ready:
+        st.caption("엑셀 파일 준비 중…")
+    st.download_button(
+        label="엑셀 다운로드 (.xlsx)",
+        file_name=excel_name,
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        data=fut.result() if ready else b"",
+        disabled=not ready,
+    )
+    return ready
 
-    try:
-        wb.save(buffer)
-    finally:
-        if tmp_logo_path and os.path.exists(tmp_logo_path):
-            try:
-                os.remove(tmp_logo_path)
-            except Exception:
-                pass
-    return buffer.getvalue()
-
-excel_bytes = _build_excel()
-excel_name = f"tax_credit_result_pro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-st.download_button(
-    label="엑셀 다운로드 (.xlsx)",
-    file_name=excel_name,
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    data=excel_bytes,
-)
+
+_excel_future = _excel_job()
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+if _excel_future.done() or _fragment is None:
+    if not _excel_download(_excel_future):
+        # fragment 미지원 버전: 수동으로 다시 확인
+        st.button("엑셀 준비 상태 확인", key="excel_job_refresh")
+else:
+    # 준비될 때까지 이 영역만 주기적으로 다시 그림 (전체 스크립트는 재실행하지 않음)
+    @_fragment(run_every=0.5)
+    def _excel_download_fragment():
+        if _excel_future.done():
+            st.rerun()  # 완성되면 한 번만 전체 재실행 → 주기적 갱신 없는 일반 버튼으로 전환
+        _excel_download(_excel_future)
+
+    _excel_download_fragment()
 
 # ==============================
 # 💬 OpenAI 챗봇 (메인 화면 하단) — 기존 구조 유지
@@ -592,7 +606,7 @@ if show_chat:
         st.stop()
     
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+        store.set("chat_history", [])
     if "system_prompt" not in st.session_state:
         st.session_state.system_prompt = "You are a helpful assistant for Korean tax credit calculator users. Reply in Korean by default."
     
@@ -605,7 +619,7 @@ if show_chat:
         if apply_pref:
             st.session_state.system_prompt = sys_prompt
     
-    for m in st.session_state.chat_history:
+    for m in store.get("chat_history"):
         with st.chat_message(m["role"]):
             st.markdown(m["content"])
     
@@ -614,7 +628,7 @@ if show_chat:
             preview = []
             if st.session_state.get("system_prompt"):
                 preview.append({"role":"system","type":"input_text"})
-            for m in st.session_state.get("chat_history", []):
+            for m in store.get("chat_history", []):
                 role = m.get("role","user")
                 typ = "output_text" if role == "assistant" else "input_text"
                 preview.append({"role": role, "type": typ})
@@ -644,7 +658,7 @@ if show_chat:
     # === [End New] ===
 
     if user_text:
-        st.session_state.chat_history.append({"role": "user", "content": user_text})
+        store.append("chat_history", {"role": "user", "content": user_text})
         with st.chat_message("user"):
             st.markdown(user_text)
     
@@ -655,7 +669,7 @@ if show_chat:
                 ctx = _build_chat_context() if include_ctx else ""
                 sys_msg = st.session_state.system_prompt + ("\n\n" + ctx if ctx else "")
                 for token in stream_chat(
-                    st.session_state.chat_history,
+                    store.get("chat_history"),
                     system_prompt=sys_msg,
                     model=model,
                 ):
@@ -665,4 +679,4 @@ if show_chat:
                 acc = f"⚠️ 오류가 발생했어요: {e}"
                 placeholder.markdown(acc)
     
-        st.session_state.chat_history.append({"role": "assistant", "content": acc})
\ No newline at end of file
+        store.append("chat_history", {"role": "assistant", "content": acc})
\ No newline at end of file
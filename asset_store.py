@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+테넌트별 내용주소(content-addressed) 자산 저장소 (로고 / 기관명)
+
+.app_cache/
+  assets/<sha256>.png     # 로고 원본 (내용 해시가 파일명 → 같은 로고는 테넌트가 달라도 1개만 저장)
+  tenants/<tenant키>.json  # {"logo": <sha256>, "company_name": "..."} 테넌트별 현재 포인터
+
+- 한 서버를 여러 사용자가 써도 서로의 로고/기관명을 덮어쓰지 않음
+- 자산 파일은 불변이므로 한 번 읽은 뒤에는 프로세스 메모리(LRU)에서 바로 반환 (내보내기마다 재읽기 없음)
+- 전체 자산 용량이 max_total_bytes를 넘으면 가장 오래 쓰이지 않은 자산부터 삭제(LRU GC)
+  최근 사용 시각은 파일 mtime으로 기록하며, 여러 워커가 공유해도 동작합니다.
+  테넌트 포인터가 가리키는 자산은 삭제하지 않음
+- 쓰기는 AppCache(원자적 교체 + 파일 잠금)를 통해 수행, 포인터 읽기-수정-쓰기도 잠금 안에서
+- 이전 형식(.app_cache/logo.png, prefs.json)은 처음 열 때 기본 테넌트("default")로 가져옴 (원본 파일은 유지)
+- 테넌트 id는 사용자가 고를 수 없는 값에서만 만듦
+  · 로그인(OIDC) 사용자: user_tenant(발급자, subject)
+  · 그 외: 브라우저별 임의 토큰(new_browser_token, 쿠키에 보관) → browser_tenant(토큰)
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import re
+import secrets
+import time
+
+from app_cache import AppCache, get_app_cache
+
+
+DEFAULT_MAX_TOTAL_BYTES = 64 * 1024 * 1024   # 자산 전체 용량 한도 (64MB)
+DEFAULT_MEMORY_BYTES = 16 * 1024 * 1024      # 프로세스 메모리 캐시 한도 (16MB)
+_TOUCH_INTERVAL_SEC = 60                      # mtime 갱신 최소 간격 (읽을 때마다 쓰지 않도록)
+_SHA_RE = re.compile(r"^[0-9a-f]{64}$")
+DEFAULT_TENANT = "default"
+_LEGACY_LOGO = "logo.png"
+_LEGACY_PREFS = "prefs.json"
+BROWSER_COOKIE = "tc_browser_id"
+_BROWSER_TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{43}$")  # secrets.token_urlsafe(32)
+
+
+def _tenant_key(tenant_id: str) -> str:
+    # 테넌트 id를 그대로 경로에 쓰지 않음 (경로 조작 방지)
+    return hashlib.sha256((tenant_id or "default").encode("utf-8")).hexdigest()[:32]
+
+
+def new_browser_token() -> str:
+    """브라우저별 식별 토큰 (256비트 임의값, 추측 불가)."""
+    return secrets.token_urlsafe(32)
+
+
+def is_browser_token(token: Optional[str]) -> bool:
+    return isinstance(token, str) and bool(_BROWSER_TOKEN_RE.match(token))
+
+
+def browser_tenant(token: str) -> str:
+    """브라우저 토큰 → 테넌트 id (형식이 다른 값은 ValueError: 임의 문자열로 다른 테넌트를 지정하지 못하도록)."""
+    if not is_browser_token(token):
+        raise ValueError("브라우저 식별 토큰 형식이 아닙니다.")
+    return "b-" + hashlib.sha256(token.encode("ascii")).hexdigest()[:32]
+
+
+def user_tenant(issuer: str, subject: str) -> str:
+    """로그인 사용자(발급자 + subject) → 테넌트 id."""
+    if not subject:
+        raise ValueError("로그인 사용자 식별자가 없습니다.")
+    return "u-" + hashlib.sha256(f"{issuer or ''}\x00{subject}".encode("utf-8")).hexdigest()[:32]
+
+
+class AssetStore:
+    """SHA-256 내용주소 자산 저장소 + 테넌트 포인터."""
+
+    def __init__(
+        self,
+        cache: AppCache,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+    ):
+        self.cache = cache
+        self.max_total_bytes = int(max_total_bytes)
+        self.memory_bytes = int(memory_bytes)
+        self.assets_dir = cache.root / "assets"
+        self.assets_dir.mkdir(parents=True, exist_ok=True)
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._mem_total = 0
+        self._touched: Dict[str, float] = {}
+        self._mutex = Lock()
+
+    # ---- 자산(blob) ----
+    def _asset_name(self, digest: str) -> str:
+        return f"assets/{digest}.png"
+
+    def put_asset(self, data: bytes) -> str:
+        """자산 저장 후 SHA-256 반환. 이미 있으면 쓰지 않고 사용 시각만 갱신."""
+        data = bytes(data)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.cache.root / self._asset_name(digest)
+        if path.exists():
+            self._touch(digest, force=True)
+        else:
+            self.cache.write_bytes(self._asset_name(digest), data, mirror=False)
+            self.gc()
+        self._remember(digest, data)
+        return digest
+
+    def get_asset(self, digest: str) -> Optional[bytes]:
+        if not digest or not _SHA_RE.match(digest):
+            return None
+        with self._mutex:
+            data = self._mem.get(digest)
+            if data is not None:
+                self._mem.move_to_end(digest)
+        if data is None:
+            path = self.cache.root / self._asset_name(digest)
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                return None
+            if hashlib.sha256(data).hexdigest() != digest:
+                return None  # 손상 파일
+            self._remember(digest, data)
+        self._touch(digest)
+        return data
+
+    def _remember(self, digest: str, data: bytes) -> None:
+        with self._mutex:
+            if digest in self._mem:
+                self._mem.move_to_end(digest)
+                return
+            self._mem[digest] = data
+            self._mem_total += len(data)
+            while self._mem_total > self.memory_bytes and len(self._mem) > 1:
+                _, old = self._mem.popitem(last=False)
+                self._mem_total -= len(old)
+
+    def _touch(self, digest: str, force: bool = False) -> None:
+        now = time.time()
+        last = self._touched.get(digest, 0.0)
+        if not force and now - last < _TOUCH_INTERVAL_SEC:
+            return
+        self._touched[digest] = now
+        try:
+            os.utime(self.cache.root / self._asset_name(digest), (now, now))
+        except OSError:
+            pass
+
+    def gc(self) -> List[str]:
+        """
+        전체 용량이 한도를 넘으면 LRU(mtime 오래된 순)로 삭제. 삭제한 해시 목록 반환.
+        테넌트 포인터가 가리키는 자산은 오래됐어도 남김 (지우면 get_logo가 조용히 None을 반환하게 됨).
+        """
+        removed: List[str] = []
+        with self.cache.file_lock():
+            entries = []
+            total = 0
+            for p in self.assets_dir.glob("*.png"):
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+            if total <= self.max_total_bytes:
+                return removed
+            referenced = self._referenced_digests()
+            entries = [e for e in entries if e[2].stem not in referenced]
+            entries.sort()
+            # 가장 최근 자산 1개는 남김 (방금 올린 로고가 바로 지워지지 않도록)
+            for _, size, p in entries[:-1]:
+                if total <= self.max_total_bytes:
+                    break
+                try:
+                    p.unlink()
+                except FileNotFoundError:
+                    continue
+                total -= size
+                removed.append(p.stem)
+        with self._mutex:
+            for digest in removed:
+                data = self._mem.pop(digest, None)
+                if data is not None:
+                    self._mem_total -= len(data)
+                self._touched.pop(digest, None)
+        return removed
+
+    def _referenced_digests(self) -> set:
+        """tenants/*.json이 가리키는 자산 해시 (잠금 안에서 디스크 기준으로 읽음)."""
+        out = set()
+        for p in (self.cache.root / "tenants").glob("*.json"):
+            try:
+                pointer = json.loads(p.read_bytes().decode("utf-8"))
+            except (OSError, ValueError):
+                continue
+            if isinstance(pointer, dict) and isinstance(pointer.get("logo"), str):
+                out.add(pointer["logo"])
+        return out
+
+    # ---- 테넌트 포인터 ----
+    def _pointer_name(self, tenant_id: str) -> str:
+        return f"tenants/{_tenant_key(tenant_id)}.json"
+
+    def get_pointer(self, tenant_id: str) -> dict:
+        pointer = self.cache.read_json(self._pointer_name(tenant_id), {})
+        return pointer if isinstance(pointer, dict) else {}
+
+    def _update_pointer(self, tenant_id: str, **fields) -> bool:
+        # 읽기-수정-쓰기를 잠금 안에서 (동시에 set_logo / set_company_name이 와도 한쪽이 사라지지 않도록)
+        with self.cache.file_lock():
+            pointer = dict(self.get_pointer(tenant_id))
+            pointer.update(fields)
+            return self.cache.write_json(self._pointer_name(tenant_id), pointer)
+
+    def set_logo(self, tenant_id: str, png_bytes: bytes) -> str:
+        # 자산 저장 → 포인터 갱신을 한 잠금 안에서 (그 사이 GC가 새 자산을 지우지 않도록)
+        with self.cache.file_lock():
+            digest = self.put_asset(png_bytes)
+            self._update_pointer(tenant_id, logo=digest)
+        return digest
+
+    def get_logo(self, tenant_id: str) -> Optional[bytes]:
+        digest = self.get_pointer(tenant_id).get("logo")
+        return self.get_asset(digest) if digest else None
+
+    def set_company_name(self, tenant_id: str, company_name: str) -> bool:
+        return self._update_pointer(tenant_id, company_name=company_name)
+
+    def get_company_name(self, tenant_id: str) -> Optional[str]:
+        return self.get_pointer(tenant_id).get("company_name")
+
+    def import_legacy(self, tenant_id: str = DEFAULT_TENANT) -> bool:
+        """이전 형식 logo.png / prefs.json → 테넌트 포인터 (한 번만, 이미 값이 있으면 덮어쓰지 않음)."""
+        with self.cache.file_lock():
+            pointer = self.get_pointer(tenant_id)
+            if pointer.get("legacy_imported"):
+                return False
+            logo_path = self.cache.root / _LEGACY_LOGO
+            prefs = self.cache.read_json(_LEGACY_PREFS, {})
+            if not logo_path.exists() and not prefs:
+                return False
+            fields = {"legacy_imported": True}
+            if "logo" not in pointer and logo_path.exists():
+                fields["logo"] = self.put_asset(logo_path.read_bytes())
+            name = prefs.get("company_name") if isinstance(prefs, dict) else None
+            if "company_name" not in pointer and name:
+                fields["company_name"] = name
+            return self._update_pointer(tenant_id, **fields)
+
+
+_stores: Dict[str, AssetStore] = {}
+_stores_lock = Lock()
+
+
+def get_asset_store(root: Path, **kwargs) -> AssetStore:
+    """경로별 AssetStore 1개를 프로세스 전역에서 공유."""
+    cache = get_app_cache(root)
+    key = str(cache.root)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = AssetStore(cache, **kwargs)
+            store.import_legacy()
+            _stores[key] = store
+        return store
@@ -0,0 +1,578 @@
+# -*- coding: utf-8 -*-
+"""
+통합고용세액공제 일괄(batch) 계산 엔진 — 여러 기업을 NumPy 배열 연산으로 한 번에 계산
+
+employment_tax_credit_calc의 단건 함수(calc_gross_credit / apply_caps_and_min_tax / calc_clawback)와
+같은 규칙을 열(column) 단위로 계산합니다.
+
+입력 열 (DataFrame)
+- company (선택): 기업 식별자/이름
+- company_size: "중소기업" / "중견기업" / "대기업"  (Enum 이름 SME/MIDSIZE/LARGE 도 허용)
+- region: "수도권" / "지방"                       (SEOUL_METRO/NON_METRO 도 허용)
+- prev_total, curr_total, prev_youth, curr_youth, converted_regular, returned_from_parental_leave
+- tax_before_credit (선택): 최저한세 적용 시 세전세액 (비어 있으면 미적용)
+- tax_year (선택): 과세연도 — compute_batch_by_year에서 행별 시행령 버전 선택에 사용
+- industry_code / industry_name (선택): KSIC 업종코드 / 업종명 — 제외업종이면 계산하지 않고 사유 기록
+- followup_1, followup_2, ... (선택): 사후관리 n년차 말 상시근로자 수 (비어 있으면 추징 0)
+
+출력 열
+- gross, applied, retention_years, clawback_1.., total_clawback, error(입력 오류 사유, 정상은 "")
+- excluded: 제외업종 사유 (해당 없으면 "", 해당 행은 공제액 0)
+
+tiered 추징 구간표는 TierTable로 한 번 컴파일해 두고 np.searchsorted로 조회
+(과세연도별 계산에서는 버전마다 다른 표를 한 배열에 이어 붙여 searchsorted 한 번으로 처리)
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import io
+
+import numpy as np
+import pandas as pd
+
+from employment_tax_credit_calc import CompanySize, Region, PolicyParameters, compile_clawback_tiers
+from industry_index import ExclusionIndex, compile_exclusions
+
+
+SIZES: List[CompanySize] = list(CompanySize)
+REGIONS: List[Region] = list(Region)
+
+HEAD_COLUMNS = [
+    "prev_total", "curr_total", "prev_youth", "curr_youth",
+    "converted_regular", "returned_from_parental_leave",
+]
+# 비어 있으면 계산하지 않는 인원 열 (0으로 채우면 전 인원이 증가/감소로 잡힘)
+REQUIRED_HEAD_COLUMNS = ("prev_total", "curr_total")
+INPUT_COLUMNS = ["company", "industry_code", "company_size", "region", *HEAD_COLUMNS, "tax_before_credit"]
+# 앞자리 0을 보존해야 하는 입력 열 (KSIC 코드 01110 등)
+TEXT_INPUT_COLUMNS = {"company": str, "industry_code": str, "industry_name": str}
+# 선택 입력: tax_year (과세연도별 시행령 적용 시, compute_batch_by_year)
+FOLLOWUP_PREFIX = "followup_"
+CLAWBACK_PREFIX = "clawback_"
+
+# 규모/지역 라벨(한글 값·Enum 이름) → SIZES/REGIONS 위치 (columnar_export 분할 이름에도 사용)
+SIZE_LOOKUP: Dict[str, int] = {}
+for _i, _s in enumerate(SIZES):
+    SIZE_LOOKUP[_s.value] = _i
+    SIZE_LOOKUP[_s.name] = _i
+REGION_LOOKUP: Dict[str, int] = {}
+for _i, _r in enumerate(REGIONS):
+    REGION_LOOKUP[_r.value] = _i
+    REGION_LOOKUP[_r.name] = _i
+
+
+# 버전 v의 하한에 v × TIER_STRIDE를 더해 이어 붙임 (감소율·하한은 0~1이므로 버전끼리 겹치지 않음)
+TIER_STRIDE = 2.0
+
+
+@dataclass
+class TierTable:
+    """
+    구간추징표 배열판 (버전 V개를 한 배열로)
+    - keys: 버전 순서로 이어 붙인 하한 + v × TIER_STRIDE (오름차순)
+    - rates: keys와 같은 위치의 추징률
+    - starts[v]: 버전 v 구간의 시작 위치 (길이 V + 1)
+    """
+    keys: np.ndarray
+    rates: np.ndarray
+    starts: np.ndarray
+
+    def lookup(self, ratio: np.ndarray, version: Optional[np.ndarray] = None) -> np.ndarray:
+        """감소율 → 추징률 (version: ratio와 브로드캐스트되는 버전 번호, None이면 0번 표)."""
+        ratio = np.asarray(ratio, dtype=np.float64)
+        v = np.zeros(1, dtype=np.int64) if version is None else np.asarray(version, dtype=np.int64)
+        pos = np.searchsorted(self.keys, ratio + v * TIER_STRIDE, side="right")
+        inside = pos > self.starts[v]
+        return np.where(inside, self.rates[np.maximum(pos - 1, 0)], 0.0)
+
+
+def compile_tier_table(tiers: Iterable) -> TierTable:
+    """ClawbackTiers(또는 compile_clawback_tiers가 받는 값) 목록 → TierTable."""
+    compiled = [compile_clawback_tiers(t) for t in tiers]
+    keys = [np.asarray(t.thresholds, dtype=np.float64) + v * TIER_STRIDE for v, t in enumerate(compiled)]
+    rates = [np.asarray(t.rates, dtype=np.float64) for t in compiled]
+    sizes = [len(t.thresholds) for t in compiled]
+    return TierTable(
+        keys=np.concatenate(keys) if keys else np.zeros(0),
+        rates=np.concatenate(rates) if rates else np.zeros(0),
+        starts=np.r_[0, np.cumsum(sizes)].astype(np.int64),
+    )
+
+
+@dataclass
+class PolicyArrays:
+    """
+    PolicyParameters를 배열 연산용으로 변환한 값
+    - basic[size, region], youth[size, region]: 1인당 공제액 (int64, 미정의 칸은 0)
+    - retention[size]: 유지기간(년)
+    - exclusions: 제외업종 색인 (excluded_industries)
+    - clawback_tiers: tiered 추징 구간표 (clawback_tiers, 없으면 기본 3구간)
+    """
+    basic: np.ndarray
+    youth: np.ndarray
+    conversion: int
+    parental: int
+    retention: np.ndarray
+    max_credit_total: Optional[int]
+    min_tax_limit_rate: Optional[float]
+    exclusions: Optional[ExclusionIndex] = None
+    clawback_tiers: Optional[TierTable] = None
+
+
+def compile_policy_arrays(params: PolicyParameters) -> PolicyArrays:
+    basic = np.zeros((len(SIZES), len(REGIONS)), dtype=np.int64)
+    youth = np.zeros_like(basic)
+    retention = np.zeros(len(SIZES), dtype=np.int64)
+    for i, s in enumerate(SIZES):
+        for j, r in enumerate(REGIONS):
+            basic[i, j] = int(params.per_head_basic.get(s, {}).get(r, 0))
+            youth[i, j] = int(params.per_head_youth.get(s, {}).get(r, 0))
+        retention[i] = int((params.retention_years or {}).get(s, 0))
+    return PolicyArrays(
+        basic=basic,
+        youth=youth,
+        conversion=int(params.per_head_conversion),
+        parental=int(params.per_head_return_from_parental),
+        retention=retention,
+        max_credit_total=params.max_credit_total,
+        min_tax_limit_rate=params.min_tax_limit_rate,
+        exclusions=compile_exclusions(params.excluded_industries),
+        clawback_tiers=compile_tier_table([params.clawback_tiers]),
+    )
+
+
+def followup_columns(df: pd.DataFrame) -> List[str]:
+    cols = [c for c in df.columns if str(c).startswith(FOLLOWUP_PREFIX) and str(c)[len(FOLLOWUP_PREFIX):].isdigit()]
+    return sorted(cols, key=lambda c: int(str(c)[len(FOLLOWUP_PREFIX):]))
+
+
+def _codes(series: pd.Series, lookup: Dict[str, int]) -> np.ndarray:
+    return series.astype(str).str.strip().map(lookup).fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _number_column(df: pd.DataFrame, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """숫자 열 → (float64 값(NaN = 빈칸/오류), 빈칸 여부, 숫자가 아닌 값 여부)."""
+    n = len(df)
+    if name not in df.columns:
+        return np.full(n, np.nan), np.ones(n, dtype=bool), np.zeros(n, dtype=bool)
+    raw = df[name]
+    v = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64)
+    blank = raw.isna().to_numpy(dtype=bool)
+    if pd.api.types.is_string_dtype(raw) or pd.api.types.is_object_dtype(raw):
+        blank = blank | (raw.astype("string").str.strip() == "").fillna(True).to_numpy(dtype=bool)
+    return v, blank, np.isnan(v) & ~blank
+
+
+def _head_column(values: np.ndarray) -> np.ndarray:
+    """인원 값: 정수면 int64, 월평균 인원(소수, roster 집계 결과)이 있으면 float64 (NaN은 0)."""
+    v = np.nan_to_num(values, nan=0.0)
+    return v.astype(np.int64) if np.array_equal(v, np.floor(v)) else v
+
+
+def _add_error(error: np.ndarray, mask: np.ndarray, message: str) -> np.ndarray:
+    """mask 행의 error에 사유 추가 (이미 사유가 있으면 "; "로 이어 붙임)."""
+    if not mask.any():
+        return error
+    error = np.asarray(error, dtype=object).copy()
+    error[mask] = [f"{e}; {message}" if e else message for e in error[mask]]
+    return error
+
+
+def clawback_matrix(
+    applied: np.ndarray,
+    base: np.ndarray,
+    followups: np.ndarray,
+    retention: np.ndarray,
+    method: str = "proportional",
+    tiered_thresholds=None,
+    tier_version: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    calc_clawback의 배열판
+    - applied, base, retention: (n,)
+    - followups: (n, k) 사후 n년차 말 인원 (NaN = 미입력 → 추징 0)
+    - tiered_thresholds: TierTable 또는 calc_clawback과 같은 형식 (ClawbackTiers / 구간표 / 임계값 dict)
+    - tier_version: (n,) 행별 TierTable 버전 번호 (None이면 0번 표)
+    반환: (n, k) int64 연차별 추징세액
+    """
+    n, k = followups.shape
+    if k == 0:
+        return np.zeros((n, 0), dtype=np.int64)
+    applied_f = applied.astype(np.float64)[:, None]
+    base_f = base.astype(np.float64)[:, None]
+    year_idx = np.arange(1, k + 1)[None, :]
+
+    valid = ~np.isnan(followups) & (year_idx <= retention[:, None]) & (base_f > 0)
+    fol = np.nan_to_num(followups, nan=0.0)
+    decrease = np.maximum(0.0, base_f - fol)
+    valid &= decrease > 0
+    ratio = np.divide(decrease, base_f, out=np.zeros_like(decrease), where=base_f > 0)
+
+    if method == "all_or_nothing":
+        out = np.broadcast_to(applied_f, ratio.shape)
+    elif method == "tiered":
+        table = tiered_thresholds if isinstance(tiered_thresholds, TierTable) else compile_tier_table([tiered_thresholds])
+        rate = table.lookup(ratio, None if tier_version is None else np.asarray(tier_version)[:, None])
+        out = np.rint(applied_f * rate)
+        out = np.where(rate >= 1.0, applied_f, out)
+    else:
+        out = np.rint(applied_f * ratio)
+
+    return np.where(valid, out, 0).astype(np.int64)
+
+
+def compute_batch(
+    df: pd.DataFrame,
+    params: PolicyParameters,
+    method: str = "proportional",
+    tiered_thresholds: Optional[Dict[str, float]] = None,
+    arrays: Optional[PolicyArrays] = None,
+) -> pd.DataFrame:
+    """기업 목록 DataFrame → 공제액/한도/추징 일정이 추가된 DataFrame."""
+    pa = arrays or compile_policy_arrays(params)
+    n = len(df)
+    size_idx, region_idx = _size_region_codes(df)
+    valid_code = (size_idx >= 0) & (region_idx >= 0)
+    excluded = excluded_reasons(df, pa.exclusions)
+    ok = valid_code & (excluded == "")
+    si = np.where(ok, size_idx, 0)
+    ri = np.where(ok, region_idx, 0)
+    units = {
+        "basic": pa.basic[si, ri],
+        "youth": pa.youth[si, ri],
+        "conversion": np.full(n, pa.conversion, dtype=np.int64),
+        "parental": np.full(n, pa.parental, dtype=np.int64),
+        "retention": pa.retention[si],
+        "max_credit_total": np.full(n, np.nan if pa.max_credit_total is None else float(pa.max_credit_total)),
+        "min_tax_limit_rate": np.full(n, np.nan if pa.min_tax_limit_rate is None else float(pa.min_tax_limit_rate)),
+    }
+    error = np.where(valid_code, "", "기업규모/지역 값 오류")
+    tiers = tiered_thresholds if tiered_thresholds is not None else pa.clawback_tiers
+    return _compute_rows(df, ok, units, method, tiers, error, excluded)
+
+
+def excluded_reasons(df: pd.DataFrame, index: Optional[ExclusionIndex]) -> np.ndarray:
+    """제외업종 사유 (industry_code 앞자리 / industry_name, 해당 없으면 "")."""
+    n = len(df)
+    if not index or ("industry_code" not in df.columns and "industry_name" not in df.columns):
+        return np.full(n, "", dtype=object)
+    return index.classify(df.get("industry_code"), df.get("industry_name"))
+
+
+def _size_region_codes(df: pd.DataFrame):
+    n = len(df)
+    size_idx = _codes(df["company_size"], SIZE_LOOKUP) if "company_size" in df.columns else np.full(n, -1)
+    region_idx = _codes(df["region"], REGION_LOOKUP) if "region" in df.columns else np.full(n, -1)
+    return size_idx, region_idx
+
+
+def _compute_rows(
+    df: pd.DataFrame,
+    ok: np.ndarray,
+    units: Dict[str, np.ndarray],
+    method: str,
+    tiered_thresholds,
+    error: np.ndarray,
+    excluded: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    행별 단가/한도 배열(units)로 계산 (단일 시행령/과세연도별 시행령 공통)
+    - units: basic, youth, conversion, parental, retention (int64),
+             max_credit_total, min_tax_limit_rate (float64, NaN = 미적용),
+             tier_version (선택, tiered_thresholds가 여러 버전의 TierTable일 때 행별 버전)
+    - 숫자 검사: 인원/세전세액/사후 인원 칸에 숫자가 아닌 값이 있거나 상시근로자 수(직전/당해)가 비어 있으면
+      error에 사유를 남기고 계산하지 않음 (0으로 채워 계산하지 않도록)
+      · 청년등/전환/복귀 인원의 빈칸은 0, 세전세액 빈칸은 최저한세 미적용, 사후 인원 빈칸은 추징 0
+    """
+    n = len(df)
+    out = df.copy()
+
+    heads = {}
+    for c in HEAD_COLUMNS:
+        values, blank, bad = _number_column(df, c)
+        if c in REQUIRED_HEAD_COLUMNS:
+            error = _add_error(error, blank, f"{c} 값 누락")
+            ok = ok & ~blank
+        error = _add_error(error, bad, f"{c} 숫자 아님")
+        ok = ok & ~bad
+        heads[c] = _head_column(values)
+    tax, _, bad_tax = _number_column(df, "tax_before_credit")
+    error = _add_error(error, bad_tax, "tax_before_credit 숫자 아님")
+    ok = ok & ~bad_tax
+    fcols = followup_columns(df)
+    fvalues = []
+    for c in fcols:
+        values, _, bad = _number_column(df, c)
+        error = _add_error(error, bad, f"{c} 숫자 아님")
+        ok = ok & ~bad
+        fvalues.append(values)
+    inc_total = np.maximum(0, heads["curr_total"] - heads["prev_total"])
+    inc_youth = np.maximum(0, heads["curr_youth"] - heads["prev_youth"])
+
+    gross = (
+        inc_total * units["basic"]
+        + inc_youth * units["youth"]
+        + heads["converted_regular"] * units["conversion"]
+        + heads["returned_from_parental_leave"] * units["parental"]
+    )
+    gross = np.where(ok, np.maximum(0, gross), 0).astype(np.int64)
+
+    applied = gross.copy()
+    cap = units["max_credit_total"]
+    has_cap = ~np.isnan(cap)
+    if has_cap.any():
+        applied = np.where(has_cap, np.minimum(applied, np.nan_to_num(cap).astype(np.int64)), applied)
+    rate = units["min_tax_limit_rate"]
+    if "tax_before_credit" in df.columns and (~np.isnan(rate)).any():
+        use = ~np.isnan(tax) & ~np.isnan(rate)
+        limit = np.floor(np.nan_to_num(rate) * np.nan_to_num(tax, nan=0.0)).astype(np.int64)
+        applied = np.where(use, np.minimum(applied, limit), applied)
+    applied = np.maximum(0, applied).astype(np.int64)
+
+    retention = np.where(ok, units["retention"], 0).astype(np.int64)
+
+    if fcols:
+        followups = np.column_stack(fvalues)
+    else:
+        followups = np.zeros((n, 0), dtype=np.float64)
+    claw = clawback_matrix(applied, heads["curr_total"], followups, retention, method, tiered_thresholds,
+                           units.get("tier_version"))
+
+    out["gross"] = gross
+    out["applied"] = applied
+    out["retention_years"] = retention
+    for j, c in enumerate(fcols):
+        out[CLAWBACK_PREFIX + str(c)[len(FOLLOWUP_PREFIX):]] = claw[:, j]
+    out["total_clawback"] = claw.sum(axis=1) if claw.shape[1] else np.zeros(n, dtype=np.int64)
+    out["error"] = error
+    out["excluded"] = excluded if excluded is not None else ""
+    return out
+
+
+# -----------------------------
+# 과세연도별 시행령 (버전 축을 더한 단가 텐서)
+# -----------------------------
+
+@dataclass
+class PolicyTensor:
+    """
+    시행 연도순으로 쌓은 PolicyArrays (V = 시행령 버전 수)
+    - years[v]: v번째 버전의 시행 과세연도 (오름차순)
+    - basic[v, size, region], youth[v, size, region], retention[v, size]
+    - conversion[v], parental[v] (int64) / max_credit_total[v], min_tax_limit_rate[v] (float64, NaN = 미적용)
+    - clawback_tiers: 버전별 구간추징표 (TierTable, 버전 번호 = v)
+    """
+    years: np.ndarray
+    basic: np.ndarray
+    youth: np.ndarray
+    conversion: np.ndarray
+    parental: np.ndarray
+    retention: np.ndarray
+    max_credit_total: np.ndarray
+    min_tax_limit_rate: np.ndarray
+    clawback_tiers: Optional[TierTable] = None
+
+    def version_index(self, tax_years: np.ndarray) -> np.ndarray:
+        """과세연도별 적용 버전 (해당 연도 이전에 시행된 가장 최근 버전, 없으면 -1)."""
+        return np.searchsorted(self.years, np.asarray(tax_years, dtype=np.int64), side="right") - 1
+
+
+def stack_policy_arrays(years: List[int], params_list: List[PolicyParameters]) -> PolicyTensor:
+    order = np.argsort(np.asarray(years, dtype=np.int64), kind="stable")
+    arrs = [compile_policy_arrays(params_list[i]) for i in order]
+    return PolicyTensor(
+        years=np.asarray(years, dtype=np.int64)[order],
+        basic=np.stack([a.basic for a in arrs]) if arrs else np.zeros((0, len(SIZES), len(REGIONS)), dtype=np.int64),
+        youth=np.stack([a.youth for a in arrs]) if arrs else np.zeros((0, len(SIZES), len(REGIONS)), dtype=np.int64),
+        conversion=np.array([a.conversion for a in arrs], dtype=np.int64),
+        parental=np.array([a.parental for a in arrs], dtype=np.int64),
+        retention=np.stack([a.retention for a in arrs]) if arrs else np.zeros((0, len(SIZES)), dtype=np.int64),
+        max_credit_total=np.array([np.nan if a.max_credit_total is None else a.max_credit_total for a in arrs], dtype=np.float64),
+        min_tax_limit_rate=np.array([np.nan if a.min_tax_limit_rate is None else a.min_tax_limit_rate for a in arrs], dtype=np.float64),
+        clawback_tiers=compile_tier_table([params_list[i].clawback_tiers for i in order]),
+    )
+
+
+def compute_batch_by_year(
+    df: pd.DataFrame,
+    tensor: PolicyTensor,
+    method: str = "proportional",
+    tiered_thresholds: Optional[Dict[str, float]] = None,
+    tax_year: Optional[int] = None,
+    exclusions: Optional[List[ExclusionIndex]] = None,
+) -> pd.DataFrame:
+    """
+    과세연도가 섞인 기업 목록을 한 번에 계산 (행마다 tax_year 열로 시행령 버전 선택)
+    tax_year 열이 없거나 비어 있는 행은 인자 tax_year 사용
+    exclusions: 버전별 제외업종 색인 (tensor.years 순서)
+    tiered_thresholds: 주면 모든 행에 같은 구간표, None이면 행마다 해당 버전의 clawback_tiers
+    """
+    n = len(df)
+    default_year = -1 if tax_year is None else int(tax_year)
+    if "tax_year" in df.columns:
+        years = pd.to_numeric(df["tax_year"], errors="coerce").fillna(default_year).to_numpy(dtype=np.int64)
+    else:
+        years = np.full(n, default_year, dtype=np.int64)
+    vi = tensor.version_index(years)
+    has_version = vi >= 0
+
+    size_idx, region_idx = _size_region_codes(df)
+    valid_code = (size_idx >= 0) & (region_idx >= 0)
+    excluded = np.full(n, "", dtype=object)
+    for k, index in enumerate(exclusions or []):
+        rows = np.flatnonzero(vi == k)
+        if len(rows) and index:
+            excluded[rows] = excluded_reasons(df.iloc[rows], index)
+    ok = valid_code & has_version & (excluded == "")
+    v = np.where(ok, vi, 0)
+    si = np.where(ok, size_idx, 0)
+    ri = np.where(ok, region_idx, 0)
+    if len(tensor.years) == 0:
+        z = np.zeros(n, dtype=np.int64)
+        units = {k: z for k in ("basic", "youth", "conversion", "parental", "retention")}
+        units["max_credit_total"] = units["min_tax_limit_rate"] = np.full(n, np.nan)
+    else:
+        units = {
+            "basic": tensor.basic[v, si, ri],
+            "youth": tensor.youth[v, si, ri],
+            "conversion": tensor.conversion[v],
+            "parental": tensor.parental[v],
+            "retention": tensor.retention[v, si],
+            "max_credit_total": tensor.max_credit_total[v],
+            "min_tax_limit_rate": tensor.min_tax_limit_rate[v],
+        }
+    tiers = tiered_thresholds
+    if tiers is None and tensor.clawback_tiers is not None and len(tensor.years):
+        tiers = tensor.clawback_tiers
+        units["tier_version"] = v
+    error = np.where(~valid_code, "기업규모/지역 값 오류", np.where(~has_version, "과세연도에 해당하는 시행령 없음", ""))
+    return _compute_rows(df, ok, units, method, tiers, error, excluded)
+
+
+# -----------------------------
+# 입력 파일 읽기 (청크 단위)
+# -----------------------------
+
+def read_companies_chunked(source, filename: str = "", chunksize: int = 5000) -> Iterator[pd.DataFrame]:
+    """CSV/XLSX를 chunksize 행씩 읽어 DataFrame으로 반환 (XLSX는 read-only 스트리밍 + 머리글 자동 매핑, .xls는 ValueError)."""
+    name = (filename or getattr(source, "name", "") or str(source)).lower()
+    if name.endswith((".xlsx", ".xlsm")):
+        from excel_import import iter_xlsx_chunks
+        yield from iter_xlsx_chunks(source, chunksize=chunksize)
+        return
+    if name.endswith(".xls"):
+        # 구형 .xls는 스트리밍 읽기가 안 되어 시트 전체를 메모리에 올리므로 받지 않음
+        raise ValueError(".xls 파일은 지원하지 않습니다. .xlsx 또는 CSV로 저장해 주세요.")
+    for chunk in pd.read_csv(source, chunksize=chunksize, encoding="utf-8-sig", dtype=TEXT_INPUT_COLUMNS):
+        yield chunk
+
+
+def _accumulate(totals: Dict[str, int], res: pd.DataFrame) -> None:
+    totals["rows"] += len(res)
+    totals["errors"] += int((res["error"] != "").sum())
+    totals["excluded"] += int((res["excluded"] != "").sum())
+    for k in ("gross", "applied", "total_clawback"):
+        totals[k] += int(res[k].sum())
+
+
+# -----------------------------
+# Arrow 결과 (화면 표 표시용)
+# - 비압축 Arrow IPC 파일로 기록 → memory map으로 열면 복사 없이 Table로 사용
+# - 페이지는 Table.slice (복사 없음)로 보이는 범위만 잘라 st.dataframe에 전달
+# -----------------------------
+
+def arrow_result_columns(clawback_years: int):
+    """화면 표 열 구성: 기업명/규모/지역 + columnar_export.result_columns."""
+    from columnar_export import result_columns
+
+    cols = result_columns(clawback_years)
+    return cols[:1] + [("company_size", "string"), ("region", "string")] + cols[1:]
+
+
+def _arrow_schema(columns):
+    import pyarrow as pa
+
+    types = {"string": pa.string(), "int64": pa.int64(), "int16": pa.int16(), "float64": pa.float64()}
+    return pa.schema([pa.field(n, types[t]) for n, t in columns])
+
+
+def run_batch_to_arrow(
+    chunks: Iterable[pd.DataFrame],
+    params: PolicyParameters,
+    out_path: str,
+    method: str = "proportional",
+    tiered_thresholds: Optional[Dict[str, float]] = None,
+    on_chunk=None,
+    registry=None,
+    tax_year: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    청크별로 계산해 결과를 Arrow IPC 파일(record batch 단위, 비압축)에 이어 씀 (전체 결과를 메모리에 쌓지 않음)
+    on_chunk(rows_done): 진행률 표시용 콜백
+    반환: 합계 요약 {"rows", "errors", "excluded", "gross", "applied", "total_clawback"}
+    연차별 추징 열 수는 첫 청크의 followup_ 열 수로 고정
+    registry(policy_registry.PolicyRegistry)가 있으면 params 대신 행별 tax_year의 시행령으로 계산
+    """
+    import pyarrow as pa
+    from columnar_export import _conform, _record_batch
+
+    arrays = compile_policy_arrays(params) if registry is None else None
+    totals = {"rows": 0, "errors": 0, "excluded": 0, "gross": 0, "applied": 0, "total_clawback": 0}
+    writer = None
+    columns = schema = None
+    try:
+        for chunk in chunks:
+            if registry is None:
+                res = compute_batch(chunk, params, method, tiered_thresholds, arrays=arrays)
+            else:
+                res = registry.compute(chunk, method, tiered_thresholds, tax_year=tax_year)
+            if writer is None:
+                columns = arrow_result_columns(len(followup_columns(res)))
+                schema = _arrow_schema(columns)
+                writer = pa.ipc.new_file(out_path, schema)
+            writer.write_batch(_record_batch(_conform(res, columns), schema))
+            _accumulate(totals, res)
+            if on_chunk is not None:
+                on_chunk(totals["rows"])
+        if writer is None:  # 빈 입력도 열 수 있는 파일로 남김
+            writer = pa.ipc.new_file(out_path, _arrow_schema(arrow_result_columns(0)))
+    finally:
+        if writer is not None:
+            writer.close()
+    return totals
+
+
+def open_arrow_result(path: str):
+    """Arrow IPC 결과를 memory map으로 열기 (버퍼를 복사하지 않는 pyarrow.Table)."""
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def arrow_result_page(table, page: int, page_size: int):
+    """Table에서 한 페이지만 잘라냄 (page는 0부터, 복사 없음)."""
+    start = max(0, int(page)) * int(page_size)
+    return table.slice(start, int(page_size))
+
+
+def arrow_result_to_csv(path: str, out_path: str) -> None:
+    """Arrow 결과 → CSV (record batch 단위, 엑셀에서 한글이 깨지지 않도록 BOM 포함)."""
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    with pa.memory_map(path, "r") as source, open(out_path, "wb") as f:
+        reader = pa.ipc.open_file(source)
+        f.write("\ufeff".encode("utf-8"))
+        with pacsv.CSVWriter(f, reader.schema, write_options=pacsv.WriteOptions(quoting_style="needed")) as w:
+            for i in range(reader.num_record_batches):
+                w.write_batch(reader.get_batch(i))
+
+
+def template_csv_bytes(followup_years: int = 3) -> bytes:
+    cols = INPUT_COLUMNS + [f"{FOLLOWUP_PREFIX}{y}" for y in range(1, followup_years + 1)]
+    sample = ["(주)예시", "25112", CompanySize.SME.value, Region.NON_METRO.value, 50, 60, 10, 14, 2, 1, 120_000_000, 60, 58, 60]
+    buf = io.StringIO()
+    pd.DataFrame([sample[:len(cols)]], columns=cols).to_csv(buf, index=False)
+    return buf.getvalue().encode("utf-8-sig")
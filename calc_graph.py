@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+통합고용세액공제 계산 단계의 증분(incremental) 데이터플로 그래프
+
+계산 단계를 노드로 나누고, 상위 입력이 바뀐 노드만 다시 계산합니다.
+
+    params ─┐
+    size  ──┼─> gross ─┐
+    region ─┤          ├─> applied ─┐
+    heads ──┘          │            ├─> clawback[n] (연차별) ─> schedule
+    tax_before_credit ─┘            │
+    followup[n] ────────────────────┘
+
+- 입력값은 이전 값과 같으면(==) 버전을 올리지 않습니다. (Streamlit rerun마다 같은 값을 다시 넣어도 재계산 없음)
+- 파생 노드는 재계산 결과가 이전과 같으면 버전을 유지합니다(early cut-off).
+  예) tax_before_credit 변경 → gross는 건너뛰고 applied부터 재계산
+      사후관리 2년차 인원 변경 → clawback[2] 한 행만 재계산
+- tiered 구간표: set_clawback_method로 준 값이 없으면 params.clawback_tiers (없으면 기본 3구간)
+  → clawback_tiers 노드에서 한 번만 컴파일하고 연차별 행이 공유
+- 각 노드는 employment_tax_credit_calc의 calc_* 함수를 그대로 호출 (공식을 따로 두지 않음)
+- CLI(employment_tax_credit_calc.main)와 Streamlit 앱에서 같은 방식으로 사용합니다.
+"""
+
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from employment_tax_credit_calc import (
+    CompanySize, Region, HeadcountInputs, PolicyParameters,
+    ClawbackTiers, apply_caps_and_min_tax, calc_clawback, calc_gross_credit, compile_clawback_tiers,
+)
+
+
+_MISSING = object()
+
+# 사후관리 결과표 컬럼명 (앱의 schedule_records 형식과 동일)
+COL_YEAR = "연차"
+COL_TOTAL = "사후연도 상시"
+COL_YOUTH = "사후연도 청년등"
+COL_CLAWBACK = "추징세액"
+
+
+class _Node:
+    __slots__ = ("name", "fn", "deps", "value", "version", "seen")
+
+    def __init__(self, name: str, fn: Optional[Callable] = None, deps: Sequence[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.value = _MISSING
+        self.version = 0
+        self.seen: Optional[Tuple[int, ...]] = None
+
+
+class CalcGraph:
+    """
+    계산 단계 의존 그래프
+
+    사용 예)
+        g = CalcGraph()
+        g.set_params(params); g.set_company(size, region); g.set_heads(heads)
+        g.set_tax_before_credit(120_000_000)
+        g.gross, g.applied, g.retention_years
+        g.set_followups([(1, 60, 14), (2, 58, 14), (3, 60, 14)])
+        g.schedule_records(), g.total_clawback
+
+    eval_counts: 노드별 실제 계산 횟수 (재계산 여부 확인용)
+    """
+
+    def __init__(self) -> None:
+        self._nodes: Dict[str, _Node] = {}
+        self._followup_years: List[int] = []
+        self.eval_counts: Dict[str, int] = {}
+
+        for name in ("params", "size", "region", "heads"):
+            self._add_input(name)
+        self._add_input("tax_before_credit", None)
+        self._add_input("clawback_method", "proportional")
+        self._add_input("tiered_thresholds", None)
+
+        self._add_derived(
+            "gross",
+            lambda params, size, region, heads: calc_gross_credit(size, region, heads, params),
+            ("params", "size", "region", "heads"),
+        )
+        self._add_derived(
+            "applied",
+            lambda gross, params, tax: apply_caps_and_min_tax(gross, params, tax_before_credit=tax),
+            ("gross", "params", "tax_before_credit"),
+        )
+        self._add_derived("retention_years", lambda params, size: int(params.retention_years[size]), ("params", "size"))
+        self._add_derived("base_headcount", lambda heads: int(heads.curr_total), ("heads",))
+        self._add_derived(
+            "clawback_tiers",
+            lambda params, thresholds: compile_clawback_tiers(thresholds if thresholds is not None else params.clawback_tiers),
+            ("params", "tiered_thresholds"),
+        )
+
+    # ---- 그래프 구성 ----
+    def _add_input(self, name: str, default=_MISSING) -> None:
+        node = _Node(name)
+        node.value = default
+        self._nodes[name] = node
+
+    def _add_derived(self, name: str, fn: Callable, deps: Sequence[str]) -> None:
+        self._nodes[name] = _Node(name, fn, deps)
+
+    def _set(self, name: str, value) -> bool:
+        """입력값 설정. 값이 바뀐 경우에만 버전 증가 후 True 반환."""
+        node = self._nodes[name]
+        if node.value is not _MISSING and node.value == value:
+            return False
+        node.value = value
+        node.version += 1
+        return True
+
+    def _get(self, name: str):
+        node = self._nodes[name]
+        if node.fn is None:
+            if node.value is _MISSING:
+                raise ValueError(f"입력값이 설정되지 않았습니다: {name}")
+            return node.value
+
+        values = []
+        versions = []
+        for dep in node.deps:
+            values.append(self._get(dep))
+            versions.append(self._nodes[dep].version)
+        seen = tuple(versions)
+        if node.value is not _MISSING and node.seen == seen:
+            return node.value
+
+        new_value = node.fn(*values)
+        self.eval_counts[name] = self.eval_counts.get(name, 0) + 1
+        if node.value is _MISSING or new_value != node.value:
+            node.value = new_value
+            node.version += 1
+        node.seen = seen
+        return node.value
+
+    # ---- 입력 ----
+    def set_params(self, params: PolicyParameters) -> bool:
+        return self._set("params", params)
+
+    def set_company(self, size: CompanySize, region: Region) -> bool:
+        changed = self._set("size", CompanySize(size))
+        return self._set("region", Region(region)) or changed
+
+    def set_heads(self, heads: HeadcountInputs) -> bool:
+        return self._set("heads", heads)
+
+    def set_tax_before_credit(self, tax_before_credit: Optional[int]) -> bool:
+        return self._set("tax_before_credit", None if tax_before_credit is None else int(tax_before_credit))
+
+    def set_clawback_method(self, method: str, tiered_thresholds=None) -> bool:
+        """추징방식 설정. tiered_thresholds: ClawbackTiers / 구간표 / 기존 임계값 dict (None이면 params 값)."""
+        changed = self._set("clawback_method", method)
+        return self._set("tiered_thresholds", tiered_thresholds) or changed
+
+    def set_followup(self, year_index: int, headcount_total: int, headcount_youth: int = 0) -> bool:
+        """사후관리 n년차 말 인원 설정. 해당 연차 행 노드만 무효화됩니다."""
+        year_index = int(year_index)
+        key = f"followup[{year_index}]"
+        if key not in self._nodes:
+            self._add_input(key)
+            self._add_derived(
+                f"clawback[{year_index}]",
+                self._make_row_fn(year_index),
+                ("applied", "base_headcount", "retention_years", "clawback_method", "clawback_tiers", key),
+            )
+        if year_index not in self._followup_years:
+            self._followup_years = sorted(self._followup_years + [year_index])
+        return self._set(key, (int(headcount_total), int(headcount_youth)))
+
+    def set_followups(self, rows: Iterable[Tuple[int, int, int]]) -> None:
+        """(연차, 사후연도 상시, 사후연도 청년등) 목록으로 표 전체 설정. 목록에 없는 연차는 제외."""
+        years = []
+        for year_index, total, youth in rows:
+            self.set_followup(year_index, total, youth)
+            years.append(int(year_index))
+        self._followup_years = sorted(set(years))
+
+    @staticmethod
+    def _make_row_fn(year_index: int) -> Callable:
+        def _row(applied, base, retention, method, tiers: ClawbackTiers, followup):
+            return calc_clawback(
+                credit_applied=applied,
+                base_headcount_at_credit=base,
+                headcount_in_followup_year=followup[0],
+                retention_years_for_company=retention,
+                year_index_from_credit=year_index,
+                method=method,
+                tiered_thresholds=tiers,
+            )
+        return _row
+
+    # ---- 출력 ----
+    @property
+    def gross(self) -> int:
+        return self._get("gross")
+
+    @property
+    def applied(self) -> int:
+        return self._get("applied")
+
+    @property
+    def retention_years(self) -> int:
+        return self._get("retention_years")
+
+    def clawback(self, year_index: int) -> int:
+        return self._get(f"clawback[{int(year_index)}]")
+
+    def schedule_records(self) -> List[dict]:
+        records = []
+        for y in self._followup_years:
+            total, youth = self._get(f"followup[{y}]")
+            records.append({
+                COL_YEAR: y,
+                COL_TOTAL: total,
+                COL_YOUTH: youth,
+                COL_CLAWBACK: int(self.clawback(y)),
+            })
+        return records
+
+    @property
+    def total_clawback(self) -> int:
+        return sum(self.clawback(y) for y in self._followup_years)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+이월공제 원장 — 최저한세 한도로 공제받지 못한 세액을 최대 N년(기본 10년) 이월
+
+apply_caps_and_min_tax는 한도(min_tax_limit_rate × tax_before_credit)를 넘는 금액을 버리지만,
+실제로는 다음 과세연도부터 이월해 공제합니다. 이 모듈은 기업 × 연도 배열로 한 번에 계산합니다.
+
+연도별 계산 (모든 기업을 배열 연산으로 동시에)
+1) 사용 가능 = [이월분(오래된 것부터) …, 당기 발생분] — 선입선출(FIFO) 버킷
+2) 공제 한도 = floor(한도율 × 세전세액) (한도율이 없거나 세액 칸이 비어 있으면 한도 없음)
+3) 누적합으로 오래된 버킷부터 한도까지 사용
+4) 이월기간 마지막 해 버킷의 잔액은 소멸, 나머지는 한 해씩 나이를 더해 다음 해로
+
+- 당기 발생분 = gross에 max_credit_total(총공제한도)을 적용한 금액
+- 입력에 행이 없는 (기업, 연도)는 발생 0 / 세전세액 0 (공제 불가)으로 봄
+- 결과(원 단위 정수): generated, used, used_carryforward, used_current, expired, balance(연말 이월잔액)
+
+CLI 예시)
+    python carryforward.py --params-json params.json --credits credits.csv --out ledger.csv
+    (credits.csv: company, tax_year, gross, tax_before_credit)
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from employment_tax_credit_calc import PolicyParameters
+
+
+NO_LIMIT = np.iinfo(np.int64).max // 4  # 한도 미적용 (누적합과 더해도 넘치지 않는 큰 값)
+LEDGER_FIELDS = ("generated", "used", "used_carryforward", "used_current", "expired", "balance")
+
+
+@dataclass
+class CarryforwardLedger:
+    """
+    기업 × 연도 원장 (각 배열 shape = (기업 수, 연도 수))
+    - buckets: 마지막 연도 말 이월잔액 (기업 수, carry_years) — 열 순서는 오래된 것부터
+      (buckets[:, 0]은 내년이 이월 마지막 해인 금액)
+    """
+    companies: List[str]
+    years: List[int]
+    carry_years: int
+    generated: np.ndarray
+    used: np.ndarray
+    used_carryforward: np.ndarray
+    used_current: np.ndarray
+    expired: np.ndarray
+    balance: np.ndarray
+    buckets: np.ndarray
+
+    def to_frame(self) -> pd.DataFrame:
+        """긴 형식 [company, tax_year, generated, used, …, balance]."""
+        n, y = self.generated.shape
+        out = pd.DataFrame({
+            "company": np.repeat(np.asarray(self.companies, dtype=object), y),
+            "tax_year": np.tile(np.asarray(self.years, dtype=np.int64), n),
+        })
+        for f in LEDGER_FIELDS:
+            out[f] = getattr(self, f).reshape(-1)
+        return out
+
+    def totals(self) -> pd.DataFrame:
+        """연도별 포트폴리오 합계."""
+        return pd.DataFrame({"tax_year": self.years, **{f: getattr(self, f).sum(axis=0) for f in LEDGER_FIELDS}})
+
+
+def run_ledger(
+    generated: np.ndarray,
+    limit: np.ndarray,
+    carry_years: int = 10,
+    opening: Optional[np.ndarray] = None,
+    companies: Optional[Sequence[str]] = None,
+    years: Optional[Sequence[int]] = None,
+) -> CarryforwardLedger:
+    """
+    배열 원장 계산
+    - generated: (기업, 연도) 당기 발생 공제액 (정수)
+    - limit: (기업, 연도) 연도별 공제 한도 (NO_LIMIT 이상이면 한도 없음)
+    - opening: 첫 해 시작 시 이월잔액 (기업, carry_years), 오래된 것부터
+    """
+    gen = np.asarray(generated, dtype=np.int64)
+    lim = np.minimum(np.asarray(limit, dtype=np.int64), NO_LIMIT)
+    n, n_years = gen.shape
+    k = int(carry_years)
+    buckets = np.zeros((n, k), dtype=np.int64) if opening is None else np.asarray(opening, dtype=np.int64).copy()
+    if buckets.shape != (n, k):
+        raise ValueError(f"opening은 (기업 수, {k}) 배열이어야 합니다.")
+
+    out = {f: np.zeros((n, n_years), dtype=np.int64) for f in LEDGER_FIELDS}
+    for t in range(n_years):
+        avail = np.concatenate([buckets, gen[:, t:t + 1]], axis=1)  # 오래된 것부터, 마지막 열 = 당기분
+        cum = np.cumsum(avail, axis=1)
+        used = np.clip(np.minimum(cum, lim[:, t:t + 1]) - (cum - avail), 0, None)
+        remain = avail - used
+        out["generated"][:, t] = gen[:, t]
+        out["used"][:, t] = used.sum(axis=1)
+        out["used_current"][:, t] = used[:, -1]
+        out["used_carryforward"][:, t] = out["used"][:, t] - used[:, -1]
+        if k > 0:
+            out["expired"][:, t] = remain[:, 0]  # 이월기간 마지막 해 잔액
+            buckets = remain[:, 1:]
+        else:
+            out["expired"][:, t] = remain[:, -1]
+        out["balance"][:, t] = buckets.sum(axis=1)
+
+    return CarryforwardLedger(
+        companies=list(companies) if companies is not None else [str(i) for i in range(n)],
+        years=list(years) if years is not None else list(range(n_years)),
+        carry_years=k,
+        buckets=buckets,
+        **out,
+    )
+
+
+def ledger_from_frame(
+    df: pd.DataFrame,
+    params: PolicyParameters,
+    years: Optional[Sequence[int]] = None,
+    opening: Optional[np.ndarray] = None,
+) -> CarryforwardLedger:
+    """
+    긴 형식 [company, tax_year, gross, tax_before_credit] → 원장
+    - gross 대신 batch_engine 결과(gross 열)를 그대로 넣어도 됨
+    - years: 계산할 연도 (None이면 입력의 최소~최대 연도, 중간 빈 연도 포함)
+    """
+    company = df["company"].astype(str).to_numpy()
+    year = pd.to_numeric(df["tax_year"], errors="coerce").to_numpy(dtype=np.float64)
+    keep = ~np.isnan(year)
+    company, year = company[keep], year[keep].astype(np.int64)
+    gross = pd.to_numeric(df["gross"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)[keep].astype(np.int64)
+    tax = (pd.to_numeric(df["tax_before_credit"], errors="coerce").to_numpy(dtype=np.float64)[keep]
+           if "tax_before_credit" in df.columns else np.full(len(company), np.nan))
+
+    codes, names = pd.factorize(company)
+    if years is None:
+        years = list(range(int(year.min()), int(year.max()) + 1)) if len(year) else []
+    years = [int(y) for y in years]
+    years_arr = np.asarray(years, dtype=np.int64)
+    n, m = len(names), len(years)
+    col = np.minimum(np.searchsorted(years_arr, year), max(m - 1, 0))
+    inside = (years_arr[col] == year) if m else np.zeros(len(year), dtype=bool)
+
+    gross = np.maximum(gross, 0)
+    if params.max_credit_total is not None:
+        gross = np.minimum(gross, int(params.max_credit_total))
+    generated = np.zeros((n, m), dtype=np.int64)
+    np.add.at(generated, (codes[inside], col[inside]), gross[inside])
+    if params.min_tax_limit_rate is None:
+        limit = np.full((n, m), NO_LIMIT, dtype=np.int64)
+    else:
+        limit = np.zeros((n, m), dtype=np.int64)  # 행이 없는 연도 = 세전세액 0
+        row_limit = np.where(np.isnan(tax), NO_LIMIT,
+                             np.floor(float(params.min_tax_limit_rate) * np.nan_to_num(tax))).astype(np.int64)
+        limit[codes[inside], col[inside]] = np.maximum(row_limit[inside], 0)
+    return run_ledger(generated, limit, params.carryforward_years, opening, list(names), years)
+
+
+def main():
+    from employment_tax_credit_calc import load_params_from_json
+
+    parser = argparse.ArgumentParser(description="이월공제 원장 (최저한세 한도 초과분 이월)")
+    parser.add_argument("--params-json", required=True, help="법령 단가·기간 설정 JSON 경로")
+    parser.add_argument("--credits", required=True, help="CSV: company, tax_year, gross, tax_before_credit")
+    parser.add_argument("--out", default=None, help="기업 × 연도 원장 CSV 저장 (선택)")
+    args = parser.parse_args()
+
+    params = load_params_from_json(args.params_json)
+    df = pd.read_csv(args.credits, encoding="utf-8-sig", dtype={"company": str})
+    ledger = ledger_from_frame(df, params)
+    print(f"=== 이월공제 원장: 기업 {len(ledger.companies):,}곳 × {len(ledger.years)}개 연도 "
+          f"(이월 {ledger.carry_years}년) ===")
+    for r in ledger.totals().itertuples(index=False):
+        print(f"- {r.tax_year}: 발생 {r.generated:,} / 공제 {r.used:,} (이월분 {r.used_carryforward:,}) "
+              f"/ 소멸 {r.expired:,} / 이월잔액 {r.balance:,}")
+    if args.out:
+        ledger.to_frame().to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"- 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
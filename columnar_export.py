@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+일괄 계산 결과의 열 기반(columnar) 저장 — 데이터 웨어하우스 적재용
+
+- pyarrow가 있으면 Parquet 또는 Arrow IPC(Feather v2), 없으면 CSV로 기록
+- 과세연도 / 기업규모 / 지역별로 나눠 저장 (Hive 방식 디렉터리)
+    out_dir/tax_year=2024/company_size=SME/region=SEOUL_METRO/part-20250301T101500-1a2b3c4d.parquet
+  · 파일 이름은 실행마다 다름(시각 + 임의값) → 같은 디렉터리에 다시 내보내도 이전 결과를 덮어쓰지 않고 파일이 추가됨
+  · 디렉터리 값은 Enum 이름(ASCII), 잘못된 규모/지역 행은 "INVALID"
+  · 분할 기준 열은 파일 안에 다시 넣지 않음 (경로에서 복원)
+- 청크(DataFrame)를 받을 때마다 분할별 record batch로 바로 이어 씀 → 전체 결과를 메모리에 쌓지 않음
+- 금액/인원/유지기간/연차별 추징 열은 고정 타입 스키마(result_schema)로 기록 (입력 인원·세액은 float64, 계산 금액은 int64)
+
+CLI 예시)
+    python columnar_export.py --params-json params.json --companies companies.csv --out-dir out/ --format parquet --tax-year 2024
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+import argparse
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from batch_engine import (
+    CLAWBACK_PREFIX, FOLLOWUP_PREFIX, HEAD_COLUMNS, REGIONS, SIZES,
+    REGION_LOOKUP, SIZE_LOOKUP, followup_columns,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 미설치 → CSV만 지원
+    pa = None
+    pq = None
+
+
+FORMATS = ("parquet", "feather", "csv")
+PARTITION_COLUMNS = ("tax_year", "company_size", "region")
+INVALID_PARTITION = "INVALID"
+EXTENSIONS = {"parquet": ".parquet", "feather": ".arrow", "csv": ".csv"}
+
+
+def resolve_format(fmt: str = "auto") -> str:
+    """"auto"는 pyarrow가 있으면 parquet, 없으면 csv."""
+    if fmt == "auto":
+        return "parquet" if pa is not None else "csv"
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    if fmt != "csv" and pa is None:
+        raise RuntimeError(f"{fmt} 형식은 pyarrow가 필요합니다. (pip install pyarrow)")
+    return fmt
+
+
+def result_columns(clawback_years: int) -> List[Tuple[str, str]]:
+    """파일에 기록하는 열과 타입 (분할 기준 열 제외). 타입: string / int64 / int16 / float64."""
+    cols: List[Tuple[str, str]] = [("company", "string"), ("industry_code", "string")]
+    # 인원(사후 인원 포함)은 월평균 상시근로자 수(소수)를 그대로, 세전세액도 입력 값 그대로 (소수 원 단위 허용)
+    cols += [(c, "float64") for c in HEAD_COLUMNS]
+    cols.append(("tax_before_credit", "float64"))
+    cols += [(f"{FOLLOWUP_PREFIX}{y}", "float64") for y in range(1, clawback_years + 1)]
+    cols += [("gross", "int64"), ("applied", "int64"), ("retention_years", "int16")]
+    cols += [(f"{CLAWBACK_PREFIX}{y}", "int64") for y in range(1, clawback_years + 1)]
+    cols += [("total_clawback", "int64"), ("error", "string"), ("excluded", "string")]
+    return cols
+
+
+def result_schema(clawback_years: int):
+    """result_columns의 pyarrow 스키마 (공제액/적용액/추징액은 null 불가)."""
+    if pa is None:
+        raise RuntimeError("pyarrow가 필요합니다.")
+    types = {"string": pa.string(), "int64": pa.int64(), "int16": pa.int16(), "float64": pa.float64()}
+    required = {"gross", "applied", "retention_years", "total_clawback"}
+    required.update(f"{CLAWBACK_PREFIX}{y}" for y in range(1, clawback_years + 1))
+    return pa.schema([pa.field(name, types[t], nullable=name not in required)
+                      for name, t in result_columns(clawback_years)])
+
+
+def _partition_names(series: Optional[pd.Series], lookup: Dict[str, int], members, n: int) -> np.ndarray:
+    names = np.array([m.name for m in members] + [INVALID_PARTITION], dtype=object)
+    if series is None:
+        return np.full(n, INVALID_PARTITION, dtype=object)
+    codes = series.astype(str).str.strip().map(lookup).fillna(-1).to_numpy(dtype=np.int64)
+    return names[codes]  # -1 → 마지막(INVALID)
+
+
+def partition_keys(res: pd.DataFrame, tax_year: Optional[int]) -> pd.DataFrame:
+    """행별 분할 키 (tax_year 열이 있으면 행 값, 없거나 비어 있으면 기본 과세연도)."""
+    n = len(res)
+    default_year = -1 if tax_year is None else int(tax_year)
+    if "tax_year" in res.columns:
+        years = pd.to_numeric(res["tax_year"], errors="coerce").fillna(default_year).to_numpy(dtype=np.int64)
+    else:
+        years = np.full(n, default_year, dtype=np.int64)
+    return pd.DataFrame({
+        "tax_year": years,
+        "company_size": _partition_names(res.get("company_size"), SIZE_LOOKUP, SIZES, n),
+        "region": _partition_names(res.get("region"), REGION_LOOKUP, REGIONS, n),
+    }, index=res.index)
+
+
+def _conform(res: pd.DataFrame, columns: List[Tuple[str, str]]) -> pd.DataFrame:
+    """청크를 고정 열 구성으로 맞춤 (없는 열은 빈 값, 추징 열은 0)."""
+    out = {}
+    for name, t in columns:
+        if name in res.columns:
+            s = res[name]
+        elif name.startswith(CLAWBACK_PREFIX):
+            s = pd.Series(0, index=res.index)
+        else:
+            s = pd.Series(None, index=res.index, dtype=object)
+        if t == "string":
+            out[name] = s.where(s.notna(), None).map(lambda v: v if v is None else str(v))
+        else:
+            out[name] = pd.to_numeric(s, errors="coerce")
+    return pd.DataFrame(out, index=res.index)
+
+
+def _record_batch(df: pd.DataFrame, schema):
+    arrays = [pa.array(df[f.name], type=f.type, from_pandas=True) for f in schema]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ColumnarResultWriter:
+    """
+    compute_batch 결과 청크 → 분할별 Parquet/Feather/CSV 파일에 이어 쓰기
+    - clawback_years: 연차별 추징 열 수 (None이면 첫 청크의 followup_ 열 수로 고정)
+    - tax_year: tax_year 열이 없을 때 쓸 과세연도 (없으면 -1)
+    - run_id: 이번 실행의 파일 이름 (part-<run_id>), 분할마다 같은 이름
+    """
+
+    def __init__(self, out_dir: str, fmt: str = "auto", clawback_years: Optional[int] = None,
+                 tax_year: Optional[int] = None):
+        self.out_dir = out_dir
+        self.fmt = resolve_format(fmt)
+        self.clawback_years = clawback_years
+        self.tax_year = tax_year
+        self._columns: Optional[List[Tuple[str, str]]] = None
+        self._schema = None
+        self._writers: Dict[Tuple[Any, ...], Any] = {}
+        self.stats = {"rows": 0, "files": 0, "batches": 0}
+        self.run_id = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+    def __enter__(self) -> "ColumnarResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _path(self, key: Tuple[Any, ...]) -> str:
+        d = os.path.join(self.out_dir, *[f"{c}={v}" for c, v in zip(PARTITION_COLUMNS, key)])
+        os.makedirs(d, exist_ok=True)
+        return os.path.join(d, f"part-{self.run_id}{EXTENSIONS[self.fmt]}")
+
+    def _writer(self, key: Tuple[Any, ...]):
+        w = self._writers.get(key)
+        if w is None:
+            path = self._path(key)
+            if self.fmt == "parquet":
+                w = pq.ParquetWriter(path, self._schema, compression="zstd")
+            elif self.fmt == "feather":
+                w = pa.ipc.new_file(path, self._schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+            else:
+                w = open(path, "w", encoding="utf-8-sig", newline="")
+                w.write(",".join(name for name, _ in self._columns) + "\n")
+            self._writers[key] = w
+            self.stats["files"] += 1
+        return w
+
+    def write(self, res: pd.DataFrame) -> None:
+        if len(res) == 0:
+            return
+        if self._columns is None:
+            if self.clawback_years is None:
+                self.clawback_years = len(followup_columns(res))
+            self._columns = result_columns(self.clawback_years)
+            if self.fmt != "csv":
+                self._schema = result_schema(self.clawback_years)
+
+        data = _conform(res, self._columns)
+        keys = partition_keys(res, self.tax_year)
+        for key, idx in keys.groupby(list(PARTITION_COLUMNS), sort=False).groups.items():
+            part = data.loc[idx]
+            w = self._writer(tuple(key))
+            if self.fmt == "csv":
+                part.astype({n: "Int64" for n, t in self._columns if t in ("int64", "int16")}).to_csv(w, header=False, index=False)
+            else:
+                w.write_batch(_record_batch(part, self._schema))
+            self.stats["batches"] += 1
+        self.stats["rows"] += len(res)
+
+    def close(self) -> Dict[str, int]:
+        for w in self._writers.values():
+            w.close()
+        self._writers.clear()
+        return self.stats
+
+
+def write_batch_columnar(
+    chunks: Iterable[pd.DataFrame],
+    params,
+    out_dir: str,
+    fmt: str = "auto",
+    method: str = "proportional",
+    tax_year: Optional[int] = None,
+    tiered_thresholds: Optional[Dict[str, float]] = None,
+) -> Dict[str, int]:
+    """입력 청크를 계산하면서 바로 열 기반 파일로 기록. 반환: {"rows", "files", "batches"}"""
+    from batch_engine import compile_policy_arrays, compute_batch
+
+    arrays = compile_policy_arrays(params)
+    with ColumnarResultWriter(out_dir, fmt=fmt, tax_year=tax_year) as w:
+        for chunk in chunks:
+            w.write(compute_batch(chunk, params, method, tiered_thresholds, arrays=arrays))
+    return w.stats
+
+
+def main():
+    from employment_tax_credit_calc import load_params_from_json
+    from batch_engine import read_companies_chunked
+
+    parser = argparse.ArgumentParser(description="통합고용세액공제 일괄 계산 결과 → Parquet/Arrow/CSV (분할 저장)")
+    parser.add_argument("--params-json", required=True, help="법령 단가·기간 설정 JSON 경로")
+    parser.add_argument("--companies", required=True, help="기업 목록 CSV/XLSX (batch_engine 입력 형식)")
+    parser.add_argument("--out-dir", required=True, help="출력 디렉터리")
+    parser.add_argument("--format", choices=["auto", *FORMATS], default="auto")
+    parser.add_argument("--tax-year", type=int, default=None, help="tax_year 열이 없을 때 쓸 과세연도")
+    parser.add_argument("--clawback-method", choices=["proportional", "all_or_nothing", "tiered"], default="proportional")
+    parser.add_argument("--chunksize", type=int, default=5000)
+    args = parser.parse_args()
+
+    params = load_params_from_json(args.params_json)
+    stats = write_batch_columnar(
+        read_companies_chunked(args.companies, args.companies, chunksize=args.chunksize),
+        params, args.out_dir, fmt=args.format, method=args.clawback_method, tax_year=args.tax_year,
+    )
+    print("=== 열 기반 결과 저장 ===")
+    print(f"- 형식: {resolve_format(args.format)} / 경로: {args.out_dir}")
+    print(f"- 기업 수: {stats['rows']:,} / 파일 수: {stats['files']:,} / record batch: {stats['batches']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,10 @@
 """
 
 from __future__ import annotations
+from bisect import bisect_right
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Optional, Literal
+from typing import Dict, Optional, Literal, Sequence, Tuple, Union
 import json
 import math
 import argparse
@@ -65,6 +66,68 @@ class HeadcountInputs:
         return max(0, self.curr_youth - self.prev_youth)
 
 
+DEFAULT_TIERED_THRESHOLDS = {"none": 0.0, "half": 0.02, "full": 0.05}
+
+
+@dataclass(frozen=True)
+class ClawbackTiers:
+    """
+    구간추징표 (감소율 하한 → 추징률), 하한 오름차순
+    - thresholds[i] 이상이면 rates[i] 적용 (가장 낮은 하한 미만은 추징 0)
+    - 예) [(0.0, 0), (0.01, 0.25), (0.03, 0.5), (0.05, 1.0)]
+    - 조회는 bisect (구간 수 N에 대해 O(log N))
+    """
+    thresholds: Tuple[float, ...]
+    rates: Tuple[float, ...]
+
+    @classmethod
+    def from_pairs(cls, pairs: Sequence[Sequence[float]]) -> "ClawbackTiers":
+        """[(하한, 추징률), ...] → 검증 후 컴파일 (하한은 0~1에서 순증가, 추징률은 0~1에서 비감소)."""
+        th, rt = [], []
+        for item in pairs:
+            lo, rate = float(item[0]), float(item[1])
+            if not (0.0 <= lo <= 1.0 and 0.0 <= rate <= 1.0):
+                raise ValueError(f"구간추징표 값은 0~1이어야 합니다: ({lo}, {rate})")
+            if th and lo <= th[-1]:
+                raise ValueError(f"구간추징표 하한은 오름차순(중복 없음)이어야 합니다: {th[-1]} → {lo}")
+            if rt and rate < rt[-1]:
+                raise ValueError(f"구간추징표 추징률은 앞 구간보다 작을 수 없습니다: {rt[-1]} → {rate}")
+            th.append(lo)
+            rt.append(rate)
+        if not th:
+            raise ValueError("구간추징표가 비어 있습니다.")
+        return cls(tuple(th), tuple(rt))
+
+    @classmethod
+    def from_thresholds(cls, thresholds: Optional[Dict[str, float]] = None) -> "ClawbackTiers":
+        """기존 형식 {"none", "half", "full"} → 3구간표 (half 미만 0%, full 미만 50%, 이상 100%)."""
+        t = thresholds or DEFAULT_TIERED_THRESHOLDS
+        half = float(t.get("half", DEFAULT_TIERED_THRESHOLDS["half"]))
+        full = float(t.get("full", DEFAULT_TIERED_THRESHOLDS["full"]))
+        if full <= half:
+            return cls((half,), (1.0,))
+        return cls((half, full), (0.5, 1.0))
+
+    def rate(self, ratio: float) -> float:
+        """감소율 → 추징률."""
+        i = bisect_right(self.thresholds, ratio)
+        return self.rates[i - 1] if i > 0 else 0.0
+
+    def to_pairs(self) -> list:
+        return [[t, r] for t, r in zip(self.thresholds, self.rates)]
+
+
+def compile_clawback_tiers(
+    tiers: Union[None, "ClawbackTiers", Dict[str, float], Sequence[Sequence[float]]],
+) -> ClawbackTiers:
+    """None(기본 3구간) / 기존 임계값 dict / [(하한, 추징률), ...] / ClawbackTiers → ClawbackTiers."""
+    if isinstance(tiers, ClawbackTiers):
+        return tiers
+    if tiers is None or isinstance(tiers, dict):
+        return ClawbackTiers.from_thresholds(tiers)
+    return ClawbackTiers.from_pairs(tiers)
+
+
 @dataclass
 class PolicyParameters:
     """
@@ -77,6 +140,11 @@ class PolicyParameters:
     - max_credit_total (선택): 총 공제 한도 (없으면 None)
     - min_tax_limit_rate (선택): 최저한세 한도율 (예: 0.07). 세전 세액과 함께 제공 시 적용.
     - excluded_industries (선택): 제외 업종 코드 리스트
+    - youth_age_bands (선택): 청년등 연령 구간 [[하한, 상한], ...] (상한 None = 제한 없음, 기본 [[15, 34]])
+    - youth_military_extension_years: 병역 이행 기간을 연령에서 빼 주는 최대 연수 (기본 6)
+    - youth_age_basis: 연령 판단 시점 "month_end"(매월 말일) 또는 "hire"(입사일)
+    - carryforward_years: 최저한세 등으로 공제받지 못한 금액의 이월공제 기간(년) (기본 10)
+    - clawback_tiers (선택): tiered 추징 구간표 (없으면 기본 3구간 0%/50%/100%)
     """
     per_head_basic: Dict[CompanySize, Dict[Region, int]]
     per_head_youth: Dict[CompanySize, Dict[Region, int]]
@@ -86,6 +154,11 @@ class PolicyParameters:
     max_credit_total: Optional[int] = None
     min_tax_limit_rate: Optional[float] = None
     excluded_industries: Optional[list] = None
+    youth_age_bands: Optional[list] = None
+    youth_military_extension_years: int = 6
+    youth_age_basis: str = "month_end"
+    carryforward_years: int = 10
+    clawback_tiers: Optional[ClawbackTiers] = None
 
 
 # -----------------------------
@@ -147,7 +220,7 @@ def calc_clawback(
     retention_years_for_company: int,
     year_index_from_credit: int,
     method: Literal["proportional", "all_or_nothing", "tiered"] = "proportional",
-    tiered_thresholds: Optional[Dict[str, float]] = None,
+    tiered_thresholds: Union[None, ClawbackTiers, Dict[str, float], Sequence[Sequence[float]]] = None,
 ) -> int:
     """
     사후관리(유지기간 내 인원감소) 추징액 계산
@@ -161,10 +234,11 @@ def calc_clawback(
     - method:
         * proportional(비례추징): 감소비율만큼 추징
         * all_or_nothing(전액추징): 감소 발생 시 해당 연도분 전액 추징
-        * tiered(구간추징): 임계비율에 따라 0/50/100% 등 단계적 추징
-    - tiered_thresholds (tiered 전용):
+        * tiered(구간추징): 감소율 구간표에 따라 단계적 추징
+    - tiered_thresholds (tiered 전용): ClawbackTiers, 구간표 [(하한, 추징률), ...] 또는 기존 임계값 dict
         예시 {"none": 0.0, "half": 0.02, "full": 0.05}
         -> 감소율 < 2%: 0%, 2%~5%: 50%, ≥5%: 100%
+        예시 [(0.0, 0), (0.01, 0.25), (0.03, 0.5), (0.05, 1.0)]
 
     반환: 해당 사후관리 연도별 추징세액 (원단위 정수)
     """
@@ -184,14 +258,10 @@ def calc_clawback(
         return int(credit_applied) if decrease > 0 else 0
 
     if method == "tiered":
-        # 기본 임계값
-        thresholds = tiered_thresholds or {"none": 0.0, "half": 0.02, "full": 0.05}
-        if decrease_ratio < thresholds.get("half", 0.02):
-            return 0
-        elif decrease_ratio < thresholds.get("full", 0.05):
-            return int(round(credit_applied * 0.5))
-        else:
+        rate = compile_clawback_tiers(tiered_thresholds).rate(decrease_ratio)
+        if rate >= 1.0:
             return int(credit_applied)
+        return int(round(credit_applied * rate))
 
     # 기본값(안전장치): 비례
     return int(round(credit_applied * decrease_ratio))
@@ -202,9 +272,20 @@ def calc_clawback(
 # -----------------------------
 
 def load_params_from_json(path: str) -> PolicyParameters:
+    # 설정 전체를 검증한 뒤 변환 (JSON 형식 오류도 포함해 모두 ParamsValidationError로 보고)
+    from params_schema import ParamsValidationError, SchemaError, parse_params_dict
     with open(path, "r", encoding="utf-8") as f:
-        cfg = json.load(f)
+        try:
+            cfg = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ParamsValidationError(
+                [SchemaError("$", f"JSON 형식 오류: {path} {e.lineno}행 {e.colno}열 ({e.msg})")]
+            ) from e
+    return parse_params_dict(cfg)
+
 
+def params_from_dict(cfg: dict) -> PolicyParameters:
+    """JSON과 같은 형식의 dict(한글 키) -> PolicyParameters."""
     # JSON -> Enum key 변환
     def _to_size(k: str) -> CompanySize:
         mapping = {
@@ -237,9 +318,35 @@ def load_params_from_json(path: str) -> PolicyParameters:
         max_credit_total=(int(cfg["max_credit_total"]) if cfg.get("max_credit_total") is not None else None),
         min_tax_limit_rate=(float(cfg["min_tax_limit_rate"]) if cfg.get("min_tax_limit_rate") is not None else None),
         excluded_industries=cfg.get("excluded_industries"),
+        youth_age_bands=cfg.get("youth_age_bands"),
+        youth_military_extension_years=int(cfg.get("youth_military_extension_years", 6)),
+        youth_age_basis=cfg.get("youth_age_basis", "month_end"),
+        carryforward_years=int(cfg.get("carryforward_years", 10)),
+        # 구간추징표는 읽을 때 한 번만 검증·컴파일 (없으면 기존 tiered_thresholds 형식)
+        clawback_tiers=(compile_clawback_tiers(cfg["clawback_tiers"]) if cfg.get("clawback_tiers") is not None
+                        else compile_clawback_tiers(cfg["tiered_thresholds"]) if cfg.get("tiered_thresholds") else None),
     )
 
 
+def params_to_dict(params: PolicyParameters) -> dict:
+    """PolicyParameters -> load_params_from_json과 같은 형식의 dict (한글 키)."""
+    return {
+        "per_head_basic": {s.value: {r.value: int(v) for r, v in rv.items()} for s, rv in params.per_head_basic.items()},
+        "per_head_youth": {s.value: {r.value: int(v) for r, v in rv.items()} for s, rv in params.per_head_youth.items()},
+        "per_head_conversion": int(params.per_head_conversion),
+        "per_head_return_from_parental": int(params.per_head_return_from_parental),
+        "retention_years": {s.value: int(v) for s, v in (params.retention_years or {}).items()},
+        "max_credit_total": params.max_credit_total,
+        "min_tax_limit_rate": params.min_tax_limit_rate,
+        "excluded_industries": params.excluded_industries,
+        "youth_age_bands": params.youth_age_bands,
+        "youth_military_extension_years": int(params.youth_military_extension_years),
+        "youth_age_basis": params.youth_age_basis,
+        "carryforward_years": int(params.carryforward_years),
+        "clawback_tiers": params.clawback_tiers.to_pairs() if params.clawback_tiers is not None else None,
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(description="통합고용세액공제 계산기 (템플릿)")
     parser.add_argument("--company-size", choices=[s.value for s in CompanySize], required=True)
@@ -255,6 +362,10 @@ def main():
     parser.add_argument("--clawback-followup", type=int, default=None, help="사후관리 연도 말 상시근로자수(예: 공제+1년차)")
     parser.add_argument("--clawback-year-index", type=int, default=1, help="공제연도로부터 n년차(1~유지기간)")
     parser.add_argument("--clawback-method", choices=["proportional", "all_or_nothing", "tiered"], default="proportional")
+    parser.add_argument("--company", default=None, help="회사/기관명 (--history-db 저장용)")
+    parser.add_argument("--tax-year", type=int, default=None, help="과세연도 (--history-db 저장용)")
+    parser.add_argument("--history-db", default=None, help="계산 결과를 저장할 시나리오 DB(SQLite) 경로 (선택)")
+    parser.add_argument("--tenant", default="default", help="시나리오를 저장할 테넌트 id (--history-db 저장용, 기본 default)")
 
     args = parser.parse_args()
 
@@ -271,9 +382,19 @@ def main():
         returned_from_parental_leave=args.returned_parental,
     )
 
-    gross = calc_gross_credit(size, region, heads, params)
-    applied = apply_caps_and_min_tax(gross, params, tax_before_credit=args.tax_before_credit)
-    retention = params.retention_years[size]
+    # 단계별 계산은 calc_graph.CalcGraph로 수행 (Streamlit 앱과 동일 경로)
+    from calc_graph import CalcGraph
+
+    graph = CalcGraph()
+    graph.set_params(params)
+    graph.set_company(size, region)
+    graph.set_heads(heads)
+    graph.set_tax_before_credit(args.tax_before_credit)
+    graph.set_clawback_method(args.clawback_method)
+
+    gross = graph.gross
+    applied = graph.applied
+    retention = graph.retention_years
 
     print("=== 통합고용세액공제 계산 결과 ===")
     print(f"- 기업규모 / 지역: {size.value} / {region.value}")
@@ -286,20 +407,38 @@ def main():
 
     # 사후관리(옵션)
     if args.clawback_followup is not None:
-        clawback = calc_clawback(
-            credit_applied=applied,
-            base_headcount_at_credit=heads.curr_total,
-            headcount_in_followup_year=args.clawback_followup,
-            retention_years_for_company=retention,
-            year_index_from_credit=args.clawback_year_index,
-            method=args.clawback_method,
-        )
+        graph.set_followup(args.clawback_year_index, args.clawback_followup)
+        clawback = graph.clawback(args.clawback_year_index)
         print("\n--- 사후관리(추징) 시뮬레이션 ---")
         print(f"- 공제연도 말 상시근로자수: {heads.curr_total}명")
         print(f"- 사후연도({args.clawback_year_index}년차) 말 상시근로자수: {args.clawback_followup}명")
         print(f"- 추징방식: {args.clawback_method}")
         print(f"- 추징세액: {clawback:,}원")
 
+    # 시나리오 저장(옵션)
+    if args.history_db:
+        from scenario_store import ScenarioRecord, ScenarioStore
+
+        history = ScenarioStore(args.history_db)
+        records = graph.schedule_records() if args.clawback_followup is not None else []
+        scenario_id = history.add_scenario(ScenarioRecord(
+            tenant=args.tenant,
+            gross=gross,
+            applied=applied,
+            retention_years=retention,
+            total_clawback=sum(int(r["추징세액"]) for r in records),
+            company=args.company,
+            tax_year=args.tax_year,
+            params_hash=history.save_params(params),
+            company_size=size.value,
+            region=region.value,
+            clawback_method=args.clawback_method,
+            inputs={**vars(heads), "tax_before_credit": args.tax_before_credit},
+            schedule=records,
+        ))
+        history.close()
+        print(f"\n- 시나리오 저장: #{scenario_id} ({args.history_db})")
+
 
 if __name__ == "__main__":
     # JSON 파라미터 예시 (참고용):
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+대용량 엑셀 내보내기 (openpyxl write-only 모드)
+
+- 행을 생성기(iterator)에서 받아 바로 디스크 임시 XML로 흘려 씀 → 행 수가 늘어도 메모리 사용량 일정
+- 금액/인원은 문자열(f"{v:,}")이 아니라 숫자 셀 + 표시형식(number_format)으로 기록
+- 서식(헤더/금액/연한 노랑 입력칸)은 워크북에 미리 등록한 NamedStyle 이름으로만 지정
+  (셀마다 Font/PatternFill 객체를 만들지 않음)
+
+사용 예)
+    write_rows_xlsx("out.xlsx", columns, iter_arrow_rows("batch_result.arrow"))
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+import math
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+
+YELLOW = "FCE8A1"  # 앱 엑셀(사후관리 결과표)과 같은 연한 노랑
+
+STYLE_HEADER = "tc_header"
+STYLE_KRW = "KRW"                  # 금액: 1,234,000원
+STYLE_KRW_INPUT = "KRW_input"      # 금액 + 연한 노랑
+STYLE_COUNT = "tc_count"           # 인원/연차 등 정수
+STYLE_COUNT_INPUT = "tc_count_input"
+STYLE_TEXT = "tc_text"
+
+# 배치 결과 열 중 금액 열 (나머지 숫자 열은 인원/정수로 표시)
+AMOUNT_COLUMNS = {"gross", "applied", "total_clawback", "tax_before_credit"}
+AMOUNT_PREFIXES = ("clawback_",)
+# 숫자처럼 보여도 문자열로 둘 열 (사업자번호 등 앞자리 0 보존)
+TEXT_COLUMNS = {"company", "industry_code", "industry_name", "company_size", "region", "error", "excluded"}
+# 숫자가 있는 첫 3칸을 연한 노랑으로 (앱 엑셀의 사후관리 결과표 규칙과 동일)
+HIGHLIGHT_LIMIT = 3
+
+
+def _make_styles() -> List[NamedStyle]:
+    yellow = PatternFill(start_color=YELLOW, end_color=YELLOW, fill_type="solid")
+    right = Alignment(horizontal="right", vertical="center")
+
+    header = NamedStyle(name=STYLE_HEADER)
+    header.font = Font(bold=True)
+    header.fill = PatternFill("solid", fgColor="F2F2F2")
+    header.alignment = Alignment(horizontal="center", vertical="center")
+
+    krw = NamedStyle(name=STYLE_KRW)
+    krw.number_format = '#,##0"원"'
+    krw.alignment = right
+
+    krw_input = NamedStyle(name=STYLE_KRW_INPUT)
+    krw_input.number_format = '#,##0"원"'
+    krw_input.alignment = right
+    krw_input.fill = yellow
+
+    count = NamedStyle(name=STYLE_COUNT)
+    count.number_format = "#,##0"
+    count.alignment = right
+
+    count_input = NamedStyle(name=STYLE_COUNT_INPUT)
+    count_input.number_format = "#,##0"
+    count_input.alignment = right
+    count_input.fill = yellow
+
+    text = NamedStyle(name=STYLE_TEXT)
+    return [header, krw, krw_input, count, count_input, text]
+
+
+def register_named_styles(wb: Workbook) -> None:
+    """워크북에 보고서 NamedStyle을 한 번만 등록."""
+    existing = set(wb.named_styles)
+    for style in _make_styles():
+        if style.name not in existing:
+            wb.add_named_style(style)
+
+
+def is_amount_column(name: str) -> bool:
+    return name in AMOUNT_COLUMNS or str(name).startswith(AMOUNT_PREFIXES)
+
+
+def _to_number(v: Any) -> Optional[float]:
+    if v is None or isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        return None if (isinstance(v, float) and math.isnan(v)) else v
+    try:
+        s = str(v).replace(",", "").strip()
+        if not s:
+            return None
+        f = float(s)
+        return int(f) if f.is_integer() else f
+    except ValueError:
+        return None
+
+
+def write_rows_xlsx(
+    out,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    sheet_title: str = "일괄 계산 결과",
+    highlight_columns: Sequence[str] = (),
+    column_widths: Optional[Dict[str, float]] = None,
+) -> int:
+    """
+    write-only 워크북에 행을 스트리밍 기록
+    - out: 파일 경로 또는 쓰기 가능한 바이너리 파일 객체
+    - rows: columns 순서의 값 시퀀스를 내는 iterator
+    - highlight_columns: 숫자가 있는 첫 HIGHLIGHT_LIMIT칸을 노랑으로 표시할 열
+    반환: 기록한 데이터 행 수
+    """
+    wb = Workbook(write_only=True)
+    register_named_styles(wb)
+    ws = wb.create_sheet(title=sheet_title)
+
+    # 열 폭은 행 기록 전에 지정해야 함 (write-only 제약)
+    widths = column_widths or {}
+    for idx, name in enumerate(columns, start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = widths.get(name, max(10, min(28, len(str(name)) * 2 + 4)))
+
+    header = []
+    for name in columns:
+        c = WriteOnlyCell(ws, value=name)
+        c.style = STYLE_HEADER
+        header.append(c)
+    ws.append(header)
+
+    amount_flags = [is_amount_column(name) for name in columns]
+    text_flags = [name in TEXT_COLUMNS for name in columns]
+    highlight_left = {i: HIGHLIGHT_LIMIT for i, name in enumerate(columns) if name in set(highlight_columns)}
+
+    n = 0
+    for row in rows:
+        cells = []
+        for i, v in enumerate(row):
+            num = None if text_flags[i] else _to_number(v)
+            if num is None:
+                empty = v is None or v == "" or (isinstance(v, float) and math.isnan(v))
+                c = WriteOnlyCell(ws, value=None if empty else v)
+                c.style = STYLE_TEXT
+            else:
+                c = WriteOnlyCell(ws, value=num)
+                hl = highlight_left.get(i, 0) > 0
+                if hl:
+                    highlight_left[i] -= 1
+                if amount_flags[i]:
+                    c.style = STYLE_KRW_INPUT if hl else STYLE_KRW
+                else:
+                    c.style = STYLE_COUNT_INPUT if hl else STYLE_COUNT
+            cells.append(c)
+        ws.append(cells)
+        n += 1
+
+    wb.save(out)
+    return n
+
+
+def iter_arrow_rows(path: str) -> Iterator[Sequence[Any]]:
+    """Arrow IPC 결과 파일을 record batch 단위로 읽어 행 리스트로 반환 (memory map)."""
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield from zip(*reader.get_batch(i).to_pydict().values())
+
+
+def arrow_to_xlsx(arrow_path: str, out, sheet_title: str = "일괄 계산 결과", highlight_columns: Sequence[str] = ()) -> int:
+    """배치 결과 Arrow 파일 → 엑셀 (record batch 단위 스트리밍)."""
+    import pyarrow as pa
+
+    with pa.memory_map(arrow_path, "r") as source:
+        columns = pa.ipc.open_file(source).schema.names
+    return write_rows_xlsx(out, columns, iter_arrow_rows(arrow_path), sheet_title=sheet_title,
+                           highlight_columns=highlight_columns)
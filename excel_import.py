@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+대용량 엑셀 읽기 (openpyxl read-only 모드, 값만)
+
+- read_only=True + iter_rows(values_only=True): 셀 객체를 만들지 않고 시트 XML을 행 단위로 흘려 읽음
+  → 50만 행 시트도 메모리는 "청크 1개" 크기만 사용
+- 머리글 자동 매핑: "직전 상시근로자 수", "당해 청년등(명)", "기업명" 같은 한글 머리글을
+  HeadcountInputs 필드(prev_total, curr_youth …)와 batch_engine 입력 열 이름으로 바꿈
+  (이미 열 이름 그대로면 그대로, 모르는 머리글은 원래 이름 유지)
+- 머리글 행은 앞쪽 몇 행 중 매핑되는 칸이 가장 많은 행으로 자동 선택 (제목/안내 행이 있어도 됨)
+- chunksize 행마다 DataFrame으로 내보냄 → batch_engine.compute_batch에 바로 전달
+
+사용 예)
+    for chunk in iter_xlsx_chunks("companies.xlsx", chunksize=5000):
+        res = compute_batch(chunk, params, arrays=arrays)
+"""
+
+from __future__ import annotations
+from dataclasses import fields
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import re
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from employment_tax_credit_calc import HeadcountInputs
+
+
+HEADCOUNT_FIELDS = [f.name for f in fields(HeadcountInputs)]
+
+# 정규화한 머리글(소문자, 공백/기호/단위 제거) → 열 이름
+HEADER_ALIASES: Dict[str, str] = {
+    # 기업 정보
+    "기업": "company", "기업명": "company", "회사": "company", "회사명": "company", "법인명": "company", "상호": "company",
+    "업종코드": "industry_code", "ksic": "industry_code", "ksic코드": "industry_code", "산업분류코드": "industry_code",
+    "업종": "industry_name", "업종명": "industry_name",
+    "기업규모": "company_size", "규모": "company_size",
+    "지역": "region", "소재지": "region", "소재지역": "region",
+    "세전세액": "tax_before_credit", "산출세액": "tax_before_credit", "공제전세액": "tax_before_credit",
+    "과세연도": "tax_year", "사업연도": "tax_year", "귀속연도": "tax_year",
+    # 인원 (HeadcountInputs)
+    "직전상시근로자": "prev_total", "직전연도상시근로자": "prev_total", "직전상시": "prev_total",
+    "당해상시근로자": "curr_total", "당해연도상시근로자": "curr_total", "당해상시": "curr_total",
+    "직전청년등": "prev_youth", "직전연도청년등": "prev_youth", "직전청년": "prev_youth",
+    "직전청년등상시근로자": "prev_youth", "직전연도청년등상시근로자": "prev_youth",
+    "당해청년등": "curr_youth", "당해연도청년등": "curr_youth", "당해청년": "curr_youth",
+    "당해청년등상시근로자": "curr_youth", "당해연도청년등상시근로자": "curr_youth",
+    "정규직전환": "converted_regular", "정규직전환인원": "converted_regular",
+    "육아휴직복귀": "returned_from_parental_leave", "육아휴직복귀인원": "returned_from_parental_leave",
+    # 급여대장 (roster.py)
+    "사번": "employee_id", "직원번호": "employee_id", "사원번호": "employee_id",
+    "귀속연월": "month", "급여연월": "month", "지급연월": "month", "연월": "month",
+    "환산인원": "weight", "가중치": "weight",
+    "청년여부": "youth", "청년등여부": "youth",
+    "생년월일": "birth_date", "입사일": "hire_date", "입사일자": "hire_date",
+    "병역개월": "military_months", "병역기간": "military_months", "병역이행개월": "military_months",
+}
+CANONICAL_COLUMNS = set(HEADER_ALIASES.values()) | set(HEADCOUNT_FIELDS)
+# 숫자로 저장돼 있어도 문자열로 읽을 열 (앞자리 0/코드 보존)
+TEXT_FIELDS = {"company", "industry_code", "industry_name", "company_size", "region", "employee_id"}
+HEADER_SCAN_ROWS = 10
+
+_STRIP = re.compile(r"[\s_\-·./()\[\]{}:]")
+_UNIT_SUFFIX = re.compile(r"(명|원|수)$")
+
+
+def normalize_header(text) -> str:
+    """"상시근로자 수(명)" → "상시근로자" (공백/기호 제거 후 끝의 단위 글자를 차례로 뗌)."""
+    if text is None:
+        return ""
+    s = _STRIP.sub("", str(text).strip().lower())
+    while True:
+        t = _UNIT_SUFFIX.sub("", s)
+        if t == s or not t:
+            return s
+        s = t
+
+
+# 별칭도 같은 규칙으로 정규화해서 조회 ("기업명"과 "기업"은 같은 키)
+_ALIASES: Dict[str, str] = {normalize_header(k): v for k, v in HEADER_ALIASES.items()}
+
+
+def map_header(text) -> Optional[str]:
+    """머리글 1칸 → 열 이름 (모르면 None)."""
+    if text is None:
+        return None
+    raw = str(text).strip()
+    if raw in CANONICAL_COLUMNS or raw.lower() in CANONICAL_COLUMNS:
+        return raw.lower()
+    return _ALIASES.get(normalize_header(raw))
+
+
+def map_headers(row: Sequence) -> Tuple[Dict[int, str], List[str]]:
+    """
+    머리글 행 → ({열 위치: 열 이름}, 매핑 못 한 머리글 목록)
+    모르는 머리글은 원래 이름으로 유지, 같은 이름이 두 번 나오면 먼저 나온 칸만 사용.
+    """
+    mapping: Dict[int, str] = {}
+    unmapped: List[str] = []
+    seen = set()
+    for i, cell in enumerate(row):
+        if cell is None or str(cell).strip() == "":
+            continue
+        name = map_header(cell)
+        if name is None:
+            name = str(cell).strip()
+            unmapped.append(name)
+        if name in seen:
+            continue
+        seen.add(name)
+        mapping[i] = name
+    return mapping, unmapped
+
+
+def _text(v):
+    if v is None:
+        return None
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v).strip()
+
+
+def _is_blank(row: Sequence) -> bool:
+    return all(v is None or (isinstance(v, str) and not v.strip()) for v in row)
+
+
+def iter_xlsx_chunks(
+    source,
+    chunksize: int = 5000,
+    sheet: Optional[str] = None,
+    header_row: Optional[int] = None,
+    text_columns: Optional[set] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    XLSX → chunksize 행씩 DataFrame (열 이름은 map_headers 결과)
+    - source: 경로 또는 파일 객체 (Streamlit 업로드 파일 포함)
+    - header_row: 머리글 행 번호(1부터). None이면 앞 HEADER_SCAN_ROWS행 중 매핑이 가장 많은 행
+    - 빈 행은 건너뜀
+    """
+    text_columns = TEXT_FIELDS if text_columns is None else text_columns
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+
+        head: List[tuple] = []
+        if header_row is None:
+            for _ in range(HEADER_SCAN_ROWS):
+                r = next(rows, None)
+                if r is None:
+                    break
+                head.append(r)
+            scores = [sum(map_header(c) is not None for c in r) for r in head]
+            if not head:
+                return
+            hi = max(range(len(head)), key=lambda i: scores[i])
+        else:
+            for _ in range(header_row):
+                r = next(rows, None)
+                if r is None:
+                    return
+                head.append(r)
+            hi = header_row - 1
+        mapping, _ = map_headers(head[hi])
+        pending = head[hi + 1:]  # 머리글 찾느라 미리 읽은 데이터 행
+
+        positions = list(mapping)
+        names = [mapping[i] for i in positions]
+        text_idx = [k for k, n in enumerate(names) if n in text_columns]
+        buf: List[list] = []
+
+        def _frame(data: List[list]) -> pd.DataFrame:
+            cols = list(zip(*data)) if data else [() for _ in names]
+            out = {}
+            for k, (n, col) in enumerate(zip(names, cols)):
+                out[n] = [_text(v) for v in col] if k in text_idx else list(col)
+            df = pd.DataFrame(out, columns=names)
+            for n in names:
+                if n not in text_columns and df[n].dtype == object:
+                    conv = pd.to_numeric(df[n], errors="coerce")
+                    if conv.notna().sum() == df[n].notna().sum():  # 전부 숫자면 숫자 열로
+                        df[n] = conv
+            return df
+
+        def _take(row) -> Optional[list]:
+            if _is_blank(row):
+                return None
+            width = len(row)
+            return [row[i] if i < width else None for i in positions]
+
+        for r in chain(pending, rows):
+            v = _take(r)
+            if v is None:
+                continue
+            buf.append(v)
+            if len(buf) >= chunksize:
+                yield _frame(buf)
+                buf = []
+        if buf:
+            yield _frame(buf)
+    finally:
+        wb.close()
+
+
+def read_xlsx_headers(source, sheet: Optional[str] = None) -> Tuple[Dict[int, str], List[str]]:
+    """머리글 매핑만 미리 확인 (업로드 화면 안내용)."""
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.worksheets[0]
+        head = [r for _, r in zip(range(HEADER_SCAN_ROWS), ws.iter_rows(values_only=True))]
+    finally:
+        wb.close()
+    if not head:
+        return {}, []
+    best = max(head, key=lambda r: sum(map_header(c) is not None for c in r))
+    return map_headers(best)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+엑셀 생성 백그라운드 작업 관리 (스레드 풀)
+
+- Streamlit 스크립트 스레드에서 엑셀을 직접 만들지 않고 작업만 제출 → 화면이 멈추지 않음
+- 작업은 내용 해시(content_key)로 식별: 같은 내용을 다시 요청하면 새로 만들지 않고 기존 작업에 합류
+  (생성일시처럼 내용과 무관한 값은 키에 넣지 않음 → 처음 제출한 작업의 값이 그대로 쓰임)
+- 동시에 실행되는 작업 수는 풀 크기(max_workers)로 제한, 끝난 결과는 최근 max_results개만 보관
+
+사용 예)
+    jobs = get_excel_jobs()
+    fut = jobs.submit(content_key(summary, inputs, last_calc, name, logo), render_report_xlsx, ...,
+                      created_at=datetime.now())
+    if fut.done(): data = fut.result()
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import json
+import threading
+
+
+def content_key(*parts: Any) -> str:
+    """보고서 입력 → 내용 해시 (bytes는 해시값으로, 나머지는 정렬된 JSON으로 직렬화)."""
+    h = hashlib.sha256()
+    for p in parts:
+        if isinstance(p, (bytes, bytearray)):
+            h.update(b"b:" + hashlib.sha256(p).digest())
+        else:
+            h.update(b"j:" + json.dumps(p, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class ExcelJobManager:
+    """내용 해시별 Future를 보관하는 작업 관리자 (프로세스 안의 모든 세션이 공유)."""
+
+    def __init__(self, max_workers: int = 2, max_results: int = 32):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="excel-job")
+        self._jobs: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_results = max_results
+
+    def submit(self, key: str, fn: Callable[..., bytes], *args, **kwargs) -> Future:
+        """key 작업이 이미 있으면(진행 중/완료) 그 Future를, 없으면 새로 제출한 Future를 반환."""
+        with self._lock:
+            fut = self._jobs.get(key)
+            if fut is not None and not (fut.done() and fut.exception() is not None):
+                self._jobs.move_to_end(key)
+                return fut
+            fut = self._pool.submit(fn, *args, **kwargs)
+            self._jobs[key] = fut
+            self._evict()
+            return fut
+
+    def get(self, key: str) -> Optional[Future]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _evict(self) -> None:
+        # 끝난 작업만 오래된 순으로 정리 (진행 중인 작업은 합류 대상이므로 유지)
+        excess = len(self._jobs) - self.max_results
+        if excess <= 0:
+            return
+        for k in [k for k, f in self._jobs.items() if f.done()][:excess]:
+            del self._jobs[k]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = sum(1 for f in self._jobs.values() if not f.done())
+            return {"jobs": len(self._jobs), "pending": pending, "done": len(self._jobs) - pending}
+
+
+_manager: Optional[ExcelJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_excel_jobs() -> ExcelJobManager:
+    """프로세스 전체에서 공유하는 작업 관리자."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ExcelJobManager()
+        return _manager
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+단건 보고서 엑셀 ("결과요약" + "사후관리 결과표") 생성
+
+app_streamlit_tax_credit._build_excel과 같은 서식을 st.session_state 없이 값만으로 만듭니다.
+(앱, 일괄 보고서 묶음(report_bundle) 등 어디서든 같은 결과)
+
+- prepare_logo(): 로고를 폭 420px 이하, 약 15% 불투명 워터마크 PNG로 변환 (한 번만 해 두고 재사용)
+- build_report_xlsx(): 요약/입력/사후관리 결과로 엑셀 bytes 생성
+- render_report_xlsx(): 같은 결과를 미리 만든 골격(ReportSkeleton)에 값만 채워 빠르게 생성
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import hashlib
+import io
+import re
+import zipfile
+
+from openpyxl import Workbook
+from openpyxl.drawing.image import Image as XLImage
+from openpyxl.styles import Font, PatternFill
+
+
+YELLOW = "FCE8A1"
+LOGO_MAX_WIDTH = 420
+LOGO_ALPHA = 0.15
+SCHEDULE_HEADERS = ["연차", "사후연도 상시", "사후연도 청년등", "추징세액"]
+
+
+def prepare_logo(png_bytes: Optional[bytes]) -> Optional[bytes]:
+    """로고 → 워터마크 PNG bytes (실패 시 None)."""
+    if not png_bytes:
+        return None
+    try:
+        from PIL import Image as PILImage
+        img = PILImage.open(io.BytesIO(png_bytes))
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+        if img.width > LOGO_MAX_WIDTH:
+            ratio = LOGO_MAX_WIDTH / float(img.width)
+            img = img.resize((int(img.width * ratio), int(img.height * ratio)))
+        # 매우 연하게(약 15% 불투명)
+        r, g, b, a = img.split()
+        a = a.point(lambda p: int(p * LOGO_ALPHA))
+        img = PILImage.merge("RGBA", (r, g, b, a))
+        out = io.BytesIO()
+        img.save(out, format="PNG")
+        return out.getvalue()
+    except Exception:
+        return None
+
+
+def summary_rows(
+    summary: Dict[str, Any],
+    inputs: Dict[str, Any],
+    last_calc: Dict[str, Any],
+    company_name: str,
+    created_at: Optional[datetime] = None,
+) -> List[tuple]:
+    """결과요약 시트의 (항목, 값) 목록."""
+    created_at = created_at or datetime.now()
+    return [
+        ("생성일시", created_at.strftime("%Y-%m-%d %H:%M:%S")),
+        ("회사/기관명", company_name or ""),
+        ("기업규모", summary.get("company_size", "")),
+        ("지역", summary.get("region", "")),
+        ("유지기간(년)", summary.get("retention_years", "")),
+        ("총공제액(최저한세/한도 전)", f"{summary.get('gross', 0):,}"),
+        ("적용 공제액(최저한세/한도 후)", f"{summary.get('applied', 0):,}"),
+        ("세전세액(입력)", f"{inputs.get('tax_before_credit', 0):,}"),
+        ("추징 방식", summary.get("clawback_method", inputs.get('clawback_method', ''))),
+        ("추징 합계", f"{last_calc.get('total_clawback', 0):,}"),
+        ("전년 상시/청년등", f"{inputs.get('prev_total', 0)}/{inputs.get('prev_youth', 0)}"),
+        ("당해 상시/청년등", f"{inputs.get('curr_total', 0)}/{inputs.get('curr_youth', 0)}"),
+        ("정규직 전환 / 육아휴직 복귀", f"{inputs.get('converted_regular', 0)} / {inputs.get('returned_parental', 0)}"),
+    ]
+
+
+def _has_number(v) -> bool:
+    if v is None:
+        return False
+    # 숫자 or 숫자 문자열 허용
+    try:
+        float(str(v).replace(',', '').strip())
+        return True
+    except Exception:
+        return False
+
+
+def build_report_xlsx(
+    summary: Optional[Dict[str, Any]],
+    inputs: Optional[Dict[str, Any]],
+    last_calc: Optional[Dict[str, Any]],
+    company_name: str = "",
+    logo_png: Optional[bytes] = None,
+    prepared_logo: Optional[bytes] = None,
+    created_at: Optional[datetime] = None,
+) -> bytes:
+    """
+    엑셀 보고서 bytes
+    - logo_png: 원본 로고 (prepared_logo가 없을 때만 prepare_logo로 변환)
+    - prepared_logo: prepare_logo() 결과 (여러 보고서에서 재사용 시 전달)
+    """
+    summary = summary or {}
+    inputs = inputs or {}
+    last_calc = last_calc or {}
+    if prepared_logo is None and logo_png:
+        prepared_logo = prepare_logo(logo_png)
+
+    wb = Workbook()
+
+    # ---- 시트1: 결과요약 ----
+    ws_sum = wb.active
+    ws_sum.title = "결과요약"
+
+    start_row = 1
+    if prepared_logo:
+        try:
+            ws_sum.add_image(XLImage(io.BytesIO(prepared_logo)), "A1")
+            start_row = 8
+            ws_sum.row_dimensions[1].height = 24
+        except Exception:
+            start_row = 1
+
+    header_row = start_row
+    ws_sum.cell(row=header_row, column=1, value="항목")
+    ws_sum.cell(row=header_row, column=2, value="값")
+    r = header_row + 1
+    for k, v in summary_rows(summary, inputs, last_calc, company_name, created_at):
+        ws_sum.cell(row=r, column=1, value=k)
+        ws_sum.cell(row=r, column=2, value=v)
+        r += 1
+
+    bold = Font(bold=True)
+    ws_sum.cell(row=header_row, column=1).font = bold
+    ws_sum.cell(row=header_row, column=2).font = bold
+    ws_sum.column_dimensions["A"].width = 28
+    ws_sum.column_dimensions["B"].width = 36
+
+    # ---- 시트2: 사후관리 결과표 ----
+    ws = wb.create_sheet(title="사후관리 결과표")
+    ws.append(SCHEDULE_HEADERS)
+    for row in last_calc.get("schedule_records") or []:
+        ws.append([row["연차"], row["사후연도 상시"], row.get("사후연도 청년등", 0), row["추징세액"]])
+
+    # 숫자 있는 첫 3칸 연한 노랑 (사후연도 상시 / 사후연도 청년등)
+    try:
+        yellow_fill = PatternFill(start_color=YELLOW, end_color=YELLOW, fill_type="solid")
+        for col in (2, 3):
+            filled = 0
+            for rr in range(2, ws.max_row + 1):
+                if filled >= 3:
+                    break
+                c = ws.cell(row=rr, column=col)
+                if _has_number(c.value):
+                    c.fill = yellow_fill
+                    filled += 1
+    except Exception:
+        # 색상 적용 실패 시에도 저장은 진행
+        pass
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+# -----------------------------
+# 미리 만든 보고서 골격(skeleton) 복제 방식
+# -----------------------------
+# 서식/열 폭/머리글/로고/스타일 표 등 값과 무관한 부분은 (로고, 레이아웃 버전)별로 한 번만 만들고,
+# 내보낼 때는 두 시트의 <sheetData>(값)만 새로 써서 나머지 파일은 그대로 ZIP에 복사합니다.
+# 기관명은 결과요약의 값 셀로만 들어가므로 골격 키에 넣지 않음 (일괄 생성 시 기업마다 골격을 새로 만들지 않도록)
+# build_report_xlsx를 바꾸면 LAYOUT_VERSION을 올려 기존 골격을 무효화하세요.
+
+LAYOUT_VERSION = 1
+_SKELETON_CACHE_SIZE = 16
+
+
+def _xml_escape(s: str) -> str:
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _xml_cell(ref: str, value, style: Optional[str] = None) -> str:
+    # openpyxl이 저장하는 형식과 동일 (숫자: t="n", 문자열: inlineStr)
+    if value is None:
+        return ""
+    s = f' s="{style}"' if style else ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"{s} t="n"><v>{value}</v></c>'
+    text = str(value)
+    if not text:
+        return f'<c r="{ref}"{s} t="inlineStr" />'
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t{space}>{_xml_escape(text)}</t></is></c>'
+
+
+class ReportSkeleton:
+    """값을 제외한 보고서 골격 (ZIP 항목 + 시트 XML 앞/뒤 조각 + 스타일 번호)."""
+
+    def __init__(self, prepared_logo: Optional[bytes]):
+        sample_last = {"schedule_records": [{"연차": 1, "사후연도 상시": 1, "사후연도 청년등": 1, "추징세액": 0}]}
+        data = build_report_xlsx({}, {}, sample_last, prepared_logo=prepared_logo)
+
+        self._entries: List[tuple] = []
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            for info in zf.infolist():
+                self._entries.append((info.filename, zf.read(info.filename)))
+        parts = dict(self._entries)
+        sum_xml = parts["xl/worksheets/sheet1.xml"].decode("utf-8")
+        sch_xml = parts["xl/worksheets/sheet2.xml"].decode("utf-8")
+
+        self.header_row = int(re.search(r'<dimension ref="A(\d+):', sum_xml).group(1))
+        m = re.search(rf'<c r="A{self.header_row}" s="(\d+)"', sum_xml)
+        self.bold_style = m.group(1) if m else None
+        m = re.search(r'<c r="B2" s="(\d+)"', sch_xml)
+        self.yellow_style = m.group(1) if m else None
+        m = re.search(r'<row r="1" [^>]*></row>', sum_xml) if self.header_row > 1 else None
+        self.logo_row = m.group(0) if m else ""
+
+        self._sum_head, self._sum_tail = self._split(sum_xml)
+        self._sch_head, self._sch_tail = self._split(sch_xml)
+
+    @staticmethod
+    def _split(xml: str) -> tuple:
+        i = xml.index("<sheetData>") + len("<sheetData>")
+        j = xml.index("</sheetData>")
+        return xml[:i], xml[j:]
+
+    @staticmethod
+    def _core_props(payload: bytes, created_at: Optional[datetime]) -> bytes:
+        # 문서 속성의 작성/수정 시각을 골격 생성 시각이 아닌 내보낸 시각으로
+        stamp = (created_at or datetime.utcnow()).strftime("%Y-%m-%dT%H:%M:%SZ")
+        xml = payload.decode("utf-8")
+        xml = re.sub(r"(<dcterms:(?:created|modified)[^>]*>)[^<]*(</dcterms:)", rf"\g<1>{stamp}\g<2>", xml)
+        return xml.encode("utf-8")
+
+    @staticmethod
+    def _with_dimension(head: str, ref: str) -> str:
+        return re.sub(r'<dimension ref="[^"]*" />', f'<dimension ref="{ref}" />', head, count=1)
+
+    def render(
+        self,
+        summary: Optional[Dict[str, Any]],
+        inputs: Optional[Dict[str, Any]],
+        last_calc: Optional[Dict[str, Any]],
+        company_name: str = "",
+        created_at: Optional[datetime] = None,
+    ) -> bytes:
+        summary = summary or {}
+        inputs = inputs or {}
+        last_calc = last_calc or {}
+
+        # 시트1: 결과요약
+        hr = self.header_row
+        rows = [self.logo_row,
+                f'<row r="{hr}">{_xml_cell(f"A{hr}", "항목", self.bold_style)}{_xml_cell(f"B{hr}", "값", self.bold_style)}</row>']
+        r = hr
+        for k, v in summary_rows(summary, inputs, last_calc, company_name, created_at):
+            r += 1
+            rows.append(f'<row r="{r}">{_xml_cell(f"A{r}", k)}{_xml_cell(f"B{r}", v)}</row>')
+        sheet1 = self._with_dimension(self._sum_head, f"A{hr}:B{r}") + "".join(rows) + self._sum_tail
+
+        # 시트2: 사후관리 결과표 (숫자 있는 첫 3칸 연한 노랑)
+        rows = ["<row r=\"1\">" + "".join(_xml_cell(f"{c}1", h) for c, h in zip("ABCD", SCHEDULE_HEADERS)) + "</row>"]
+        filled = {"B": 0, "C": 0}
+        r = 1
+        for rec in last_calc.get("schedule_records") or []:
+            r += 1
+            vals = [rec["연차"], rec["사후연도 상시"], rec.get("사후연도 청년등", 0), rec["추징세액"]]
+            cells = []
+            for col, v in zip("ABCD", vals):
+                style = None
+                if col in filled and filled[col] < 3 and _has_number(v):
+                    style = self.yellow_style
+                    filled[col] += 1
+                cells.append(_xml_cell(f"{col}{r}", v, style))
+            rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+        sheet2 = self._with_dimension(self._sch_head, f"A1:D{r}") + "".join(rows) + self._sch_tail
+
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            for name, payload in self._entries:
+                if name == "xl/worksheets/sheet1.xml":
+                    payload = sheet1.encode("utf-8")
+                elif name == "xl/worksheets/sheet2.xml":
+                    payload = sheet2.encode("utf-8")
+                elif name == "docProps/core.xml":
+                    payload = self._core_props(payload, created_at)
+                zf.writestr(name, payload)
+        return out.getvalue()
+
+
+_skeletons: "OrderedDict[tuple, ReportSkeleton]" = OrderedDict()
+_prepared_logos: "OrderedDict[str, Optional[bytes]]" = OrderedDict()
+_skeleton_lock = Lock()
+
+
+def _prepared_logo_cached(logo_png: Optional[bytes]) -> Optional[bytes]:
+    if not logo_png:
+        return None
+    digest = hashlib.sha256(logo_png).hexdigest()
+    with _skeleton_lock:
+        if digest in _prepared_logos:
+            _prepared_logos.move_to_end(digest)
+            return _prepared_logos[digest]
+    prepared = prepare_logo(logo_png)
+    with _skeleton_lock:
+        _prepared_logos[digest] = prepared
+        while len(_prepared_logos) > _SKELETON_CACHE_SIZE:
+            _prepared_logos.popitem(last=False)
+    return prepared
+
+
+def get_report_skeleton(prepared_logo: Optional[bytes]) -> ReportSkeleton:
+    """(로고, 레이아웃 버전)별 골격을 LRU로 보관."""
+    key = (hashlib.sha256(prepared_logo or b"").hexdigest(), LAYOUT_VERSION)
+    with _skeleton_lock:
+        sk = _skeletons.get(key)
+        if sk is not None:
+            _skeletons.move_to_end(key)
+            return sk
+    sk = ReportSkeleton(prepared_logo)
+    with _skeleton_lock:
+        _skeletons[key] = sk
+        while len(_skeletons) > _SKELETON_CACHE_SIZE:
+            _skeletons.popitem(last=False)
+    return sk
+
+
+def render_report_xlsx(
+    summary: Optional[Dict[str, Any]],
+    inputs: Optional[Dict[str, Any]],
+    last_calc: Optional[Dict[str, Any]],
+    company_name: str = "",
+    logo_png: Optional[bytes] = None,
+    prepared_logo: Optional[bytes] = None,
+    created_at: Optional[datetime] = None,
+) -> bytes:
+    """build_report_xlsx와 같은 결과를 골격 복제로 빠르게 생성."""
+    if prepared_logo is None and logo_png:
+        prepared_logo = _prepared_logo_cached(logo_png)
+    return get_report_skeleton(prepared_logo).render(summary, inputs, last_calc, company_name, created_at)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+포트폴리오 추징 노출 예측 — 기업 × 역년(calendar year) 행렬
+
+매년 공제를 받으면 공제연도마다 유지기간(retention_years)만큼 사후관리 기간이 생기고, 이 기간이 겹칩니다.
+calc_clawback을 (기업, 공제연도, 사후연도)마다 부르는 대신 배열로 한 번에 계산합니다.
+
+1) 노출액(at risk): 공제액 벡터(공제연도 축)를 유지기간 창 [1..r]과 합성곱
+       exposure[:, t] = Σ_{lag=1..r} applied[:, t - lag]
+   (기업·공제연도마다 r이 달라도 되도록 lag마다 창 안쪽만 더함 — 반복은 최대 유지기간 수만큼)
+2) 시나리오 추징액: 역년별 인원 경로(headcount path)를 사후 n년차 인원으로 보고
+   batch_engine.clawback_matrix(calc_clawback과 같은 규칙)로 (기업 × 공제연도 × 사후연차)를 한 번에 계산한 뒤
+   역년 축으로 모음
+   - 공제연도 범위 안의 인원은 입력(curr_total) 실적, 이후는 시나리오 연간 증감률로 연장
+
+CLI 예시)
+    python exposure.py --results history.csv --scenario 기준=0 --scenario 감원=-0.05 --out exposure.csv
+    (history.csv: company, tax_year, applied, curr_total, retention_years — batch 결과를 연도별로 모은 것)
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+import argparse
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from batch_engine import clawback_matrix
+
+
+@dataclass
+class ExposureForecast:
+    """
+    - years: 역년 (첫 공제연도 ~ 마지막 공제연도 + 최대 유지기간)
+    - exposure: (기업, 역년) 그해 사후관리 중인 공제액 합계 (추징될 수 있는 최대 금액)
+    - clawback: 시나리오 이름 → (기업, 역년) 예상 추징액
+    """
+    companies: List[str]
+    years: List[int]
+    exposure: np.ndarray
+    clawback: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def totals(self) -> pd.DataFrame:
+        """역년별 합계 [year, at_risk, clawback_<시나리오>…]."""
+        out = pd.DataFrame({"year": self.years, "at_risk": self.exposure.sum(axis=0)})
+        for name, m in self.clawback.items():
+            out[f"clawback_{name}"] = m.sum(axis=0)
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """긴 형식 [company, year, at_risk, clawback_<시나리오>…] (노출이 있는 칸만)."""
+        rows, cols = np.nonzero(self.exposure)
+        out = pd.DataFrame({
+            "company": np.asarray(self.companies, dtype=object)[rows],
+            "year": np.asarray(self.years, dtype=np.int64)[cols],
+            "at_risk": self.exposure[rows, cols],
+        })
+        for name, m in self.clawback.items():
+            out[f"clawback_{name}"] = m[rows, cols]
+        return out
+
+
+def _to_calendar(per_lag: np.ndarray, n_years: int, horizon: int) -> np.ndarray:
+    """(기업, 공제연도, 사후연차 1..k) → (기업, 역년): 공제연도 s의 lag년차는 역년 s + lag."""
+    n, _, k = per_lag.shape
+    out = np.zeros((n, horizon), dtype=np.int64)
+    for lag in range(1, k + 1):
+        out[:, lag:lag + n_years] += per_lag[:, :, lag - 1]
+    return out
+
+
+def exposure_matrix(applied: np.ndarray, retention: np.ndarray) -> np.ndarray:
+    """
+    applied: (기업, 공제연도) 적용 공제액, retention: (기업,) 또는 (기업, 공제연도) 유지기간
+    반환: (기업, 공제연도 수 + 최대 유지기간) 역년별 노출액
+    """
+    applied = np.asarray(applied, dtype=np.int64)
+    n, n_years = applied.shape
+    r = np.broadcast_to(np.asarray(retention, dtype=np.int64).reshape(n, -1), (n, n_years))
+    k = int(r.max()) if r.size else 0
+    lags = np.arange(1, k + 1)[None, None, :]
+    per_lag = np.where(lags <= r[:, :, None], applied[:, :, None], 0)
+    return _to_calendar(per_lag, n_years, n_years + k)
+
+
+def headcount_paths(
+    actual: np.ndarray,
+    horizon: int,
+    annual_change: Union[float, Sequence[float]] = 0.0,
+) -> np.ndarray:
+    """
+    역년별 연말 인원 경로 (기업, horizon)
+    - actual: (기업, 공제연도) 실적 인원 (NaN = 모름 → 앞 연도 값 이어 씀)
+    - annual_change: 마지막 실적 이후 연간 증감률 (목록이면 연도별, 모자라면 마지막 값 반복)
+    """
+    actual = np.asarray(actual, dtype=np.float64)
+    n, n_years = actual.shape
+    known = pd.DataFrame(actual).ffill(axis=1).to_numpy()
+    extra = horizon - n_years
+    rates = np.atleast_1d(np.asarray(annual_change, dtype=np.float64))
+    if extra > 0:
+        rates = np.concatenate([rates, np.repeat(rates[-1:], max(0, extra - len(rates)))])[:extra]
+        growth = np.cumprod(1.0 + rates)
+        last = known[:, -1:] if n_years else np.full((n, 1), np.nan)
+        return np.concatenate([known, last * growth[None, :]], axis=1)
+    return known[:, :horizon]
+
+
+def scenario_clawback(
+    applied: np.ndarray,
+    base: np.ndarray,
+    retention: np.ndarray,
+    paths: np.ndarray,
+    method: str = "proportional",
+    tiered_thresholds: Optional[Dict[str, float]] = None,
+) -> np.ndarray:
+    """
+    인원 경로 → (기업, 역년) 예상 추징액
+    - base: (기업, 공제연도) 공제연도 말 인원 (curr_total)
+    - paths: (기업, 공제연도 수 + 최대 유지기간) 역년별 연말 인원
+    """
+    applied = np.asarray(applied, dtype=np.int64)
+    n, n_years = applied.shape
+    r = np.broadcast_to(np.asarray(retention, dtype=np.int64).reshape(n, -1), (n, n_years))
+    k = int(r.max()) if r.size else 0
+    if k == 0:
+        return np.zeros((n, n_years), dtype=np.int64)
+    # 공제연도 s의 사후 1..k년차 인원 = paths[:, s+1 : s+1+k]
+    follow = sliding_window_view(np.asarray(paths, dtype=np.float64), k, axis=1)[:, 1:n_years + 1, :]
+    claw = clawback_matrix(
+        applied.reshape(-1),
+        np.asarray(base, dtype=np.float64).reshape(-1),
+        follow.reshape(n * n_years, k),
+        r.reshape(-1),
+        method,
+        tiered_thresholds,
+    )
+    return _to_calendar(claw.reshape(n, n_years, k), n_years, n_years + k)
+
+
+def forecast_exposure(
+    df: pd.DataFrame,
+    scenarios: Optional[Dict[str, Union[float, Sequence[float]]]] = None,
+    method: str = "proportional",
+    tiered_thresholds: Optional[Dict[str, float]] = None,
+) -> ExposureForecast:
+    """
+    긴 형식 [company, tax_year, applied, curr_total, retention_years] → 노출/시나리오 추징 예측
+    - scenarios: 이름 → 마지막 실적 이후 연간 인원 증감률 (예: {"기준": 0.0, "감원": -0.05})
+    """
+    company = df["company"].astype(str).to_numpy()
+    year = pd.to_numeric(df["tax_year"], errors="coerce").to_numpy(dtype=np.float64)
+    keep = ~np.isnan(year)
+    company, year = company[keep], year[keep].astype(np.int64)
+    codes, names = pd.factorize(company)
+    y0 = int(year.min()) if len(year) else 0
+    n_years = int(year.max()) - y0 + 1 if len(year) else 0
+    col = year - y0
+
+    def _pivot(name: str, fill: float) -> np.ndarray:
+        v = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)[keep]
+        m = np.full((len(names), n_years), fill, dtype=np.float64)
+        m[codes, col] = v
+        return m
+
+    applied = np.nan_to_num(_pivot("applied", 0.0)).astype(np.int64)
+    base = _pivot("curr_total", np.nan)
+    retention = np.nan_to_num(_pivot("retention_years", 0.0)).astype(np.int64)
+
+    exposure = exposure_matrix(applied, retention)
+    horizon = exposure.shape[1]
+    result = ExposureForecast(list(names), list(range(y0, y0 + horizon)), exposure)
+    for name, change in (scenarios or {}).items():
+        paths = headcount_paths(base, horizon, change)
+        result.clawback[name] = scenario_clawback(applied, np.nan_to_num(base), retention, paths,
+                                                  method, tiered_thresholds)
+    return result
+
+
+def _parse_scenario(text: str):
+    name, _, rates = text.partition("=")
+    values = [float(x) for x in rates.split(",") if x.strip()] or [0.0]
+    return name.strip(), values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="포트폴리오 추징 노출 예측 (기업 × 역년)")
+    parser.add_argument("--results", required=True, help="CSV: company, tax_year, applied, curr_total, retention_years")
+    parser.add_argument("--scenario", action="append", default=[],
+                        help="이름=연간 인원 증감률[,다음 해,...] (예: 감원=-0.05) — 여러 번 지정 가능")
+    parser.add_argument("--clawback-method", choices=["proportional", "all_or_nothing", "tiered"], default="proportional")
+    parser.add_argument("--out", default=None, help="기업 × 역년 결과 CSV 저장 (선택)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.results, encoding="utf-8-sig", dtype={"company": str})
+    scenarios = dict(_parse_scenario(s) for s in args.scenario) or {"기준": [0.0]}
+    fc = forecast_exposure(df, scenarios, args.clawback_method)
+    print(f"=== 추징 노출 예측: 기업 {len(fc.companies):,}곳 / {fc.years[0]}~{fc.years[-1]} ===")
+    print(fc.totals().to_string(index=False))
+    if args.out:
+        fc.to_frame().to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"- 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+기업집단 공동 공제한도 배분 (water-filling)
+
+max_credit_total은 계산 1건(기업 1곳)에 적용되지만, 계열사가 한도를 함께 쓰는 경우에는
+집단 한도 G를 계열사별로 나눠야 합니다.
+
+- 계열사별 최대 사용 가능액 u_i = min(gross_i, floor(최저한세 한도율 × tax_before_credit_i))
+  (세전세액이 없으면 최저한세 한도 미적용 → u_i = gross_i)
+- 한도 안에서 쓸 수 있는 총액은 min(G, Σu_i)가 최대이며, 이 최대치를 항상 달성하도록 배분
+- 배분 규칙: 수위(λ)를 올려 가며 채우는 water-filling → a_i = min(u_i, λ·w_i)
+  (w_i 기본 1 = 균등, 가중치를 주면 비례). 사용 가능액이 작은 계열사는 전액, 나머지는 같은 수위로
+- u_i / w_i 정렬 한 번 + 누적합 → O(n log n), 여러 집단도 한 번의 정렬로 동시에 계산
+- 원 단위 정수: 수위로 나눈 뒤 남는 몇 원은 소수부가 큰 순서로 1원씩
+
+CLI 예시)
+    python group_cap.py --params-json params.json --entities group.csv --group-cap 500000000 --out alloc.csv
+    (group.csv: group, company, gross, tax_before_credit[, weight])
+"""
+
+from __future__ import annotations
+from typing import Dict, Optional, Union
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from employment_tax_credit_calc import PolicyParameters
+
+
+def usable_credit(gross: np.ndarray, tax_before_credit: Optional[np.ndarray], min_tax_limit_rate: Optional[float]) -> np.ndarray:
+    """계열사별 최대 사용 가능액 (최저한세 한도까지)."""
+    gross = np.maximum(np.asarray(gross, dtype=np.int64), 0)
+    if min_tax_limit_rate is None or tax_before_credit is None:
+        return gross
+    tax = np.asarray(tax_before_credit, dtype=np.float64)
+    limit = np.floor(float(min_tax_limit_rate) * np.nan_to_num(tax, nan=0.0)).astype(np.int64)
+    return np.where(np.isnan(tax), gross, np.minimum(gross, np.maximum(limit, 0)))
+
+
+def water_fill(
+    usable: np.ndarray,
+    caps: Union[int, np.ndarray],
+    groups: Optional[np.ndarray] = None,
+    weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    집단별 한도 배분
+    - usable: (n,) 계열사별 최대 사용 가능액
+    - caps: 집단 한도 (groups가 없으면 정수 1개, 있으면 집단 번호별 배열; 음수 = 한도 없음)
+    - groups: (n,) 0부터 시작하는 집단 번호 (None이면 전체가 한 집단)
+    - weights: (n,) 배분 가중치 (양수, 기본 1)
+    반환: (n,) int64 배분액 (a_i ≤ u_i, 집단 합계 = min(한도, Σu))
+    """
+    u = np.maximum(np.asarray(usable, dtype=np.int64), 0)
+    n = len(u)
+    g = np.zeros(n, dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+    cap = np.atleast_1d(np.asarray(caps, dtype=np.int64))
+    w = np.ones(n, dtype=np.float64) if weights is None else np.asarray(weights, dtype=np.float64)
+    if n == 0:
+        return u
+    if (w <= 0).any():
+        raise ValueError("weights는 양수여야 합니다.")
+
+    # 집단 → 수위 기준값(u/w) 오름차순 정렬
+    key = u / w
+    order = np.lexsort((key, g))
+    gs, us, ws, ks = g[order], u[order], w[order], key[order]
+    starts = np.flatnonzero(np.r_[True, gs[1:] != gs[:-1]])
+    sizes = np.diff(np.r_[starts, n])
+    gid = np.repeat(np.arange(len(starts)), sizes)
+    cap_s = cap[gs[starts]] if groups is not None else np.repeat(cap[:1], len(starts))
+
+    # 수위를 ks[j]까지 올렸을 때 집단 합계 S_j = Σ_{i≤j} u_i + ks[j] · Σ_{i>j} w_i  (j에 대해 증가)
+    cu = np.cumsum(us)
+    cw = np.cumsum(ws)
+    base_u = np.r_[0, cu][starts][gid]
+    base_w = np.r_[0.0, cw][starts][gid]
+    grp_w = np.add.reduceat(ws, starts)[gid]
+    u_upto = cu - base_u                    # Σ_{i≤j} u_i (집단 안)
+    w_after = grp_w - (cw - base_w)          # Σ_{i>j} w_i
+    s = u_upto + ks * w_after
+
+    limited = cap_s >= 0
+    reach = s >= cap_s[gid]
+    first = np.add.reduceat((~reach).astype(np.int64), starts)  # 집단 안에서 처음 한도에 닿는 위치
+    saturated_all = first == sizes                                # Σu ≤ 한도 → 전액
+
+    # 수위 λ = (G - Σ_{i<j} u_i) / Σ_{i≥j} w_i
+    j = starts + np.minimum(first, sizes - 1)
+    u_before = (u_upto - us)[j]
+    w_from = (w_after + ws)[j]
+    lam = np.where(saturated_all | ~limited, np.inf, (cap_s - u_before) / np.where(w_from > 0, w_from, 1.0))
+
+    level = lam[gid] * ws
+    alloc = np.where(np.isinf(level), us, np.minimum(us, np.floor(np.minimum(level, us)))).astype(np.int64)
+
+    # 정수로 버린 나머지(집단마다 계열사 수 미만) → 소수부가 큰 미포화 계열사에 1원씩
+    target = np.where(saturated_all | ~limited, np.add.reduceat(us, starts), cap_s)
+    short = target - np.add.reduceat(alloc, starts)
+    if (short > 0).any():
+        frac = np.where(alloc < us, level - np.floor(np.minimum(level, us)), -1.0)
+        frac = np.where(np.isinf(frac), -1.0, frac)
+        order2 = np.lexsort((-frac, gid))
+        rank = np.arange(n) - starts[gid[order2]]
+        bump = (rank < short[gid[order2]]) & (frac[order2] >= 0)
+        alloc[order2[bump]] += 1
+
+    out = np.empty(n, dtype=np.int64)
+    out[order] = alloc
+    return out
+
+
+def allocate_group_caps(
+    df: pd.DataFrame,
+    params: PolicyParameters,
+    group_caps: Union[int, Dict[str, int], None] = None,
+    group_col: str = "group",
+) -> pd.DataFrame:
+    """
+    [group, company, gross, tax_before_credit[, weight]] → usable, applied 열 추가
+    - group_caps: 집단별 한도 dict 또는 공통 한도 (None이면 params.max_credit_total, 그것도 없으면 한도 없음)
+    """
+    out = df.copy()
+    groups = out[group_col].astype(str) if group_col in out.columns else pd.Series("", index=out.index)
+    codes, names = pd.factorize(groups)
+    gross = pd.to_numeric(out["gross"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    tax = (pd.to_numeric(out["tax_before_credit"], errors="coerce").to_numpy(dtype=np.float64)
+           if "tax_before_credit" in out.columns else None)
+    weights = pd.to_numeric(out["weight"], errors="coerce").fillna(1.0).to_numpy() if "weight" in out.columns else None
+
+    default = params.max_credit_total if group_caps is None else group_caps
+    if isinstance(default, dict):
+        caps = np.array([int(default[k]) if default.get(k) is not None else -1 for k in names], dtype=np.int64)
+    else:
+        caps = np.full(len(names), -1 if default is None else int(default), dtype=np.int64)
+
+    usable = usable_credit(gross, tax, params.min_tax_limit_rate)
+    out["usable"] = usable
+    out["applied"] = water_fill(usable, caps, codes, weights)
+    return out
+
+
+def main():
+    from employment_tax_credit_calc import load_params_from_json
+
+    parser = argparse.ArgumentParser(description="기업집단 공동 공제한도 배분 (water-filling)")
+    parser.add_argument("--params-json", required=True, help="법령 단가·기간 설정 JSON 경로")
+    parser.add_argument("--entities", required=True, help="CSV: group, company, gross, tax_before_credit[, weight]")
+    parser.add_argument("--group-cap", type=int, default=None, help="집단 공통 한도 (없으면 max_credit_total)")
+    parser.add_argument("--out", default=None, help="배분 결과 CSV 저장 (선택)")
+    args = parser.parse_args()
+
+    params = load_params_from_json(args.params_json)
+    df = pd.read_csv(args.entities, encoding="utf-8-sig", dtype={"group": str, "company": str})
+    res = allocate_group_caps(df, params, args.group_cap)
+    print("=== 집단 한도 배분 ===")
+    summary = res.groupby("group" if "group" in res.columns else lambda _: "", sort=True)[["gross", "usable", "applied"]].sum()
+    for g, r in summary.iterrows():
+        print(f"- {g or '(전체)'}: 총공제 {int(r.gross):,} / 사용 가능 {int(r.usable):,} / 배분 {int(r.applied):,}")
+    if args.out:
+        res.to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"- 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
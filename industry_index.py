@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+제외업종 색인 (KSIC 한국표준산업분류 코드 앞자리 일치)
+
+PolicyParameters.excluded_industries 항목 형식
+- "5621"               : KSIC 코드 앞자리 (5621로 시작하는 모든 세분류 제외)
+- "5621:유흥주점업"     : 앞자리 + 표시용 업종명
+- "유흥주점업"          : 숫자가 없으면 업종명 자체 (industry_name과 정확히 일치할 때 제외)
+
+- 앞자리 길이별 dict로 컴파일 → 코드 1개는 길이 수(최대 5)만큼 조회, 가장 긴 앞자리 우선
+- 일괄 분류는 길이별로 열 전체를 잘라 한 번에 매핑 (pandas 문자열 연산)
+- 결과는 사유 문자열 (해당 없으면 "")
+
+사용 예)
+    index = compile_exclusions(params.excluded_industries)
+    index.match("56211")                     # "제외업종: 유흥주점업 (KSIC 5621)"
+    reasons = index.classify(df["industry_code"], df.get("industry_name"))
+"""
+
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+import numpy as np
+import pandas as pd
+
+
+_CODE = re.compile(r"^\s*([A-Za-z]?\d+)\s*(?::\s*(.*))?$")
+
+
+def _normalize_code(code) -> str:
+    """KSIC 코드 정규화: 공백/하이픈/점 제거, 대분류 문자(A~U)는 대문자."""
+    if code is None or (isinstance(code, float) and code != code):
+        return ""
+    s = str(code).strip().upper()
+    if s.endswith(".0"):  # 엑셀/CSV에서 숫자로 읽힌 코드
+        s = s[:-2]
+    return re.sub(r"[\s\-.]", "", s)
+
+
+class ExclusionIndex:
+    """제외업종 앞자리 색인 (앞자리 길이별 dict + 업종명 dict)."""
+
+    def __init__(self, entries: Optional[Iterable[str]] = None):
+        self._by_len: Dict[int, Dict[str, str]] = {}
+        self._names: Dict[str, str] = {}
+        for e in entries or []:
+            self.add(e)
+
+    def add(self, entry: str) -> None:
+        text = str(entry).strip()
+        if not text:
+            return
+        m = _CODE.match(text)
+        if m:
+            prefix = _normalize_code(m.group(1))
+            label = (m.group(2) or "").strip()
+            reason = f"제외업종: {label} (KSIC {prefix})" if label else f"제외업종: KSIC {prefix}"
+            self._by_len.setdefault(len(prefix), {})[prefix] = reason
+        else:
+            self._names[text] = f"제외업종: {text}"
+
+    @property
+    def lengths(self) -> List[int]:
+        """앞자리 길이 (긴 것부터)."""
+        return sorted(self._by_len, reverse=True)
+
+    def __bool__(self) -> bool:
+        return bool(self._by_len or self._names)
+
+    def match(self, code=None, name: Optional[str] = None) -> str:
+        """코드 1개 분류 → 사유 ("" = 해당 없음)."""
+        c = _normalize_code(code)
+        for n in self.lengths:
+            if len(c) >= n:
+                reason = self._by_len[n].get(c[:n])
+                if reason:
+                    return reason
+        if name is not None and self._names:
+            return self._names.get(str(name).strip(), "")
+        return ""
+
+    def classify(self, codes: Optional[pd.Series], names: Optional[pd.Series] = None) -> np.ndarray:
+        """열 전체 분류 → 행별 사유 배열 (object, "" = 해당 없음)."""
+        n = len(codes) if codes is not None else (len(names) if names is not None else 0)
+        out = pd.Series("", index=range(n), dtype=object)
+        undecided = np.ones(n, dtype=bool)
+        if codes is not None and self._by_len:
+            c = pd.Series(codes).reset_index(drop=True).map(_normalize_code)
+            for length in self.lengths:
+                hit = c.str.slice(0, length).map(self._by_len[length])
+                hit = hit.where(c.str.len() >= length)
+                mask = undecided & hit.notna().to_numpy()
+                out[mask] = hit[mask]
+                undecided &= ~mask
+        if names is not None and self._names:
+            hit = pd.Series(names).reset_index(drop=True).astype(str).str.strip().map(self._names)
+            mask = undecided & hit.notna().to_numpy()
+            out[mask] = hit[mask]
+        return out.to_numpy(dtype=object)
+
+    def entries(self) -> List[Tuple[str, str]]:
+        """(앞자리 또는 업종명, 사유) 목록."""
+        rows = [(p, r) for n in self.lengths for p, r in sorted(self._by_len[n].items())]
+        return rows + sorted(self._names.items())
+
+
+def compile_exclusions(excluded_industries: Optional[Iterable[str]]) -> ExclusionIndex:
+    return ExclusionIndex(excluded_industries)
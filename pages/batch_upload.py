@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""여러 기업 일괄 계산 페이지 (CSV/XLSX 업로드 → batch_engine)."""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import streamlit as st
+
+from employment_tax_credit_calc import PolicyParameters
+from params_schema import ParamsValidationError, parse_params_dict
+from batch_engine import (
+    read_companies_chunked, run_batch_to_arrow, open_arrow_result, arrow_result_page,
+    arrow_result_to_csv, template_csv_bytes,
+)
+from excel_export import arrow_to_xlsx
+from policy_registry import load_registry
+from session_store import get_session_store
+
+st.set_page_config(page_title="통합고용세액공제 일괄 계산", layout="wide")
+st.title("여러 기업 일괄 계산")
+st.caption("CSV/XLSX로 여러 기업의 인원·세전세액·사후연도 인원을 올리면 공제액/한도/추징 일정을 한 번에 계산합니다")
+
+CHUNK_ROWS = 5000
+PAGE_SIZE = 50
+ROOT = Path(__file__).resolve().parent.parent
+# 결과 파일은 세션 디렉터리에 만들어 세션이 끝나면 함께 삭제
+session_files = get_session_store(st.session_state)
+
+# =====================
+# 파라미터: 메인 화면에서 불러온 값 재사용, 없으면 여기서 업로드
+# =====================
+params: PolicyParameters = st.session_state.get("policy_params")
+with st.sidebar:
+    st.header("시행령 파라미터")
+    uploaded_params = st.file_uploader("시행령 JSON 업로드 (선택)", type=["json"], accept_multiple_files=False, key="batch_params")
+    if uploaded_params is not None:
+        try:
+            params = parse_params_dict(json.load(uploaded_params))
+            st.success("업로드한 파라미터를 사용합니다.")
+        except ParamsValidationError as e:
+            st.error("파라미터 검증 실패 ({}건)\n\n".format(len(e.errors)) + "\n".join(f"- `{x.path}` {x.message}" for x in e.errors))
+        except Exception as e:
+            st.error(f"파라미터 로딩 실패: {e}")
+    elif params is not None:
+        st.caption("메인 화면에서 불러온 파라미터를 사용합니다.")
+
+    clawback_options = {
+        "비례 추징 (감소율만큼)": "proportional",
+        "전액 추징 (감소 발생 시 전체)": "all_or_nothing",
+        "구간 추징 (감소율 구간별 단계)": "tiered",
+    }
+    method_label = st.selectbox("추징 방식", list(clawback_options.keys()), index=0, key="batch_clawback_method")
+    clawback_method = clawback_options[method_label]
+
+    # 과세연도가 섞인 목록: 행마다 tax_year 열의 시행령(policies/ 레지스트리)으로 한 번에 계산
+    by_year = st.checkbox("과세연도별 시행령 적용 (tax_year 열)", value=False, key="batch_by_year")
+    registry = None
+    default_year = None
+    if by_year:
+        try:
+            registry = load_registry(str(ROOT / "policies"), str(ROOT / ".app_cache" / "policy_snapshot.npz"))
+            st.caption("등록된 시행령: " + ", ".join(f"{y}년~" for y in registry.years))
+        except Exception as e:
+            st.error(f"시행령 레지스트리 로딩 실패: {e}")
+        default_year = st.number_input("tax_year가 빈 행의 과세연도", min_value=2000, max_value=2100,
+                                       value=datetime.now().year - 1, step=1, key="batch_default_year")
+
+st.download_button(
+    label="입력 서식(CSV) 다운로드",
+    data=template_csv_bytes(),
+    file_name="batch_companies_template.csv",
+    mime="text/csv",
+)
+
+companies_file = st.file_uploader("기업 목록 (CSV/XLSX)", type=["csv", "xlsx"], accept_multiple_files=False, key="batch_companies")
+
+ready = registry is not None if by_year else params is not None
+run = st.button("일괄 계산하기", type="primary", disabled=(not ready or companies_file is None))
+if not ready and not by_year:
+    st.info("시행령 파라미터를 먼저 불러오세요. (메인 화면 또는 사이드바 업로드)")
+
+if run:
+    # 결과는 임시 Arrow 파일로만 저장하고, 세션에는 경로/요약만 보관
+    old = st.session_state.get("batch_result")
+    for key in ("path", "csv_path", "xlsx_path"):
+        if old and old.get(key) and os.path.exists(old[key]):
+            try:
+                os.remove(old[key])
+            except OSError:
+                pass
+    out_path = session_files.new_file(prefix="batch_result_", suffix=".arrow")
+
+    progress = st.progress(0.0, text="계산 중…")
+    size = getattr(companies_file, "size", 0) or 0
+
+    def _on_chunk(rows_done: int):
+        # 행 수를 미리 알 수 없으므로 읽은 바이트 기준 근사치 (XLSX는 청크 단위 표시)
+        pos = companies_file.tell() if hasattr(companies_file, "tell") else 0
+        frac = min(1.0, pos / size) if size else 0.0
+        progress.progress(frac, text=f"{rows_done:,}개 기업 계산 완료")
+
+    try:
+        totals = run_batch_to_arrow(
+            read_companies_chunked(companies_file, companies_file.name, chunksize=CHUNK_ROWS),
+            params,
+            out_path,
+            method=clawback_method,
+            on_chunk=_on_chunk,
+            registry=registry,
+            tax_year=int(default_year) if default_year is not None else None,
+        )
+        progress.progress(1.0, text=f"{totals['rows']:,}개 기업 계산 완료")
+        st.session_state.batch_result = {"path": out_path, "totals": totals, "page": 0}
+    except Exception as e:
+        progress.empty()
+        st.error(f"일괄 계산 실패: {e}")
+
+result = st.session_state.get("batch_result")
+if result and os.path.exists(result["path"]):
+    totals = result["totals"]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("기업 수", f"{totals['rows']:,}")
+    c2.metric("총공제액 합계", f"{totals['gross']:,} 원")
+    c3.metric("적용 공제액 합계", f"{totals['applied']:,} 원")
+    c4.metric("추징세액 합계", f"{totals['total_clawback']:,} 원")
+    if totals.get("errors"):
+        st.warning(f"입력 오류 {totals['errors']:,}건 (error 열 확인)")
+    if totals.get("excluded"):
+        st.info(f"제외업종 {totals['excluded']:,}건은 계산에서 제외 (excluded 열에 사유)")
+
+    # memory map으로 열어 보이는 페이지만 잘라 표시 (pandas 변환/전체 복사 없음)
+    table = open_arrow_result(result["path"])
+    n_pages = max(1, (table.num_rows + PAGE_SIZE - 1) // PAGE_SIZE)
+    page = st.number_input(f"페이지 (1~{n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key="batch_page")
+    st.dataframe(arrow_result_page(table, int(page) - 1, PAGE_SIZE), use_container_width=True)
+
+    # 내려받기 버튼은 "준비" 버튼을 누른 실행에서만 그림 → 파일 bytes는 그 한 번만 읽고, 다음 재실행에서 버튼과 함께 사라짐
+    # (파일을 버튼에 계속 붙여 두면 위젯을 건드릴 때마다 전체 결과를 서버 메모리로 다시 읽음)
+    # CSV/엑셀 파일은 처음 요청할 때 한 번만 만들고 세션 동안 재사용 (엑셀은 write-only 스트리밍)
+    exports = {
+        "csv": ("CSV", "text/csv",
+                arrow_result_to_csv),
+        "xlsx": ("엑셀", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                 lambda src, dst: arrow_to_xlsx(src, dst, highlight_columns=["followup_1", "followup_2", "followup_3"])),
+    }
+    for col, (ext, (label, mime, build)) in zip(st.columns(len(exports)), exports.items()):
+        with col:
+            if not st.button(f"{label} 다운로드 준비 (.{ext})", key=f"batch_prepare_{ext}"):
+                continue
+            path = result.get(f"{ext}_path")
+            if not (path and os.path.exists(path)):
+                path = session_files.new_file(prefix="batch_result_", suffix=f".{ext}")
+                with st.spinner(f"{label} 생성 중…"):
+                    build(result["path"], path)
+                result[f"{ext}_path"] = path
+            st.download_button(
+                label=f"전체 결과 다운로드 (.{ext})",
+                data=Path(path).read_bytes(),
+                file_name=f"tax_credit_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}",
+                mime=mime,
+                key=f"batch_download_{ext}",
+            )
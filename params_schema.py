@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+시행령 파라미터 JSON 검증 (스키마를 한 번 컴파일해 두고 설정 전체를 한 번에 검사)
+
+- 키 이름(오타/누락), 기업규모/지역 라벨, 금액(0 이상 정수), 비율(0~1), 유지기간 범위,
+  구간 추징 임계값 순서(none ≤ half ≤ full), 구간추징표(하한 순증가, 추징률 비감소), 청년 연령 구간(하한 ≤ 상한)을 한 번의 순회로 모두 검사
+- 첫 오류에서 멈추지 않고 모든 오류를 JSON 경로와 함께 반환
+    예) $.per_head_basic.중소기업.수도권: 0 이상의 정수여야 합니다 (입력값: -1000)
+- 스키마는 모듈 로드 시 검사 함수(클로저) 트리로 한 번만 컴파일 → 업로드/자동 재적용마다 호출해도 부담 없음
+
+사용 예)
+    errors = validate_params_dict(cfg)
+    params = parse_params_dict(cfg)         # 오류가 있으면 ParamsValidationError (errors 전체 포함)
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import json
+
+from employment_tax_credit_calc import CompanySize, Region, PolicyParameters, params_from_dict
+
+
+SIZE_LABELS = [s.value for s in CompanySize]
+REGION_LABELS = [r.value for r in Region]
+MAX_RETENTION_YEARS = 10
+MAX_MILITARY_EXTENSION_YEARS = 10
+MAX_CARRYFORWARD_YEARS = 15
+YOUTH_AGE_BASES = ("month_end", "hire")
+
+
+@dataclass
+class SchemaError:
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+class ParamsValidationError(ValueError):
+    """파라미터 검증 실패 (errors에 모든 오류)."""
+
+    def __init__(self, errors: List[SchemaError]):
+        self.errors = list(errors)
+        super().__init__("파라미터 검증 실패 ({}건)\n".format(len(self.errors)) + "\n".join(f"- {e}" for e in self.errors))
+
+
+# 검사 함수: (값, 경로, 오류 목록) -> None
+Check = Callable[[Any, str, List[SchemaError]], None]
+
+
+def _show(v: Any) -> str:
+    s = json.dumps(v, ensure_ascii=False) if not isinstance(v, str) else repr(v)
+    return s if len(s) <= 40 else s[:37] + "..."
+
+
+# -----------------------------
+# 스키마 구성 요소 (compile 시 한 번 호출되어 검사 함수를 만듦)
+# -----------------------------
+
+def integer(min_value: Optional[int] = None, max_value: Optional[int] = None, nullable: bool = False) -> Check:
+    lo = "" if min_value is None else f"{min_value} 이상"
+    hi = "" if max_value is None else f"{max_value} 이하"
+    desc = " ".join(x for x in (lo, hi) if x)
+    msg = f"{desc}의 정수여야 합니다" if desc else "정수여야 합니다"
+
+    def check(v, path, errors):
+        if v is None and nullable:
+            return
+        ok = isinstance(v, int) and not isinstance(v, bool) or (isinstance(v, float) and v.is_integer())
+        if not ok or (min_value is not None and v < min_value) or (max_value is not None and v > max_value):
+            errors.append(SchemaError(path, f"{msg} (입력값: {_show(v)})"))
+    return check
+
+
+def number(min_value: float, max_value: float, nullable: bool = False) -> Check:
+    msg = f"{min_value}~{max_value} 사이의 숫자여야 합니다"
+
+    def check(v, path, errors):
+        if v is None and nullable:
+            return
+        if isinstance(v, bool) or not isinstance(v, (int, float)) or not (min_value <= v <= max_value):
+            errors.append(SchemaError(path, f"{msg} (입력값: {_show(v)})"))
+    return check
+
+
+def string(nullable: bool = False) -> Check:
+    def check(v, path, errors):
+        if v is None and nullable:
+            return
+        if not isinstance(v, str):
+            errors.append(SchemaError(path, f"문자열이어야 합니다 (입력값: {_show(v)})"))
+    return check
+
+
+def choice(values: Sequence[str]) -> Check:
+    allowed = tuple(values)
+
+    def check(v, path, errors):
+        if v not in allowed:
+            errors.append(SchemaError(path, f"{' / '.join(allowed)} 중 하나여야 합니다 (입력값: {_show(v)})"))
+    return check
+
+
+def age_band() -> Check:
+    """[하한, 상한] 연령 구간 (상한 null = 제한 없음)."""
+    bound = integer(0, 150)
+
+    def check(v, path, errors):
+        if not isinstance(v, list) or len(v) != 2:
+            errors.append(SchemaError(path, f"[하한, 상한] 형식이어야 합니다 (입력값: {_show(v)})"))
+            return
+        lo, hi = v
+        n = len(errors)
+        bound(lo, f"{path}[0]", errors)
+        if hi is not None:
+            bound(hi, f"{path}[1]", errors)
+            if len(errors) == n and lo > hi:
+                errors.append(SchemaError(path, f"하한({lo}) ≤ 상한({hi}) 순서여야 합니다"))
+    return check
+
+
+def tier_table(nullable: bool = False) -> Check:
+    """구간추징표 [[감소율 하한, 추징률], ...] (하한은 순증가, 추징률은 줄어들지 않음)."""
+    ratio = number(0.0, 1.0)
+
+    def check(v, path, errors):
+        if v is None and nullable:
+            return
+        if not isinstance(v, list) or not v:
+            errors.append(SchemaError(path, f"[[하한, 추징률], ...] 형식의 비어 있지 않은 목록이어야 합니다 (입력값: {_show(v)})"))
+            return
+        prev = None
+        for i, row in enumerate(v):
+            p = f"{path}[{i}]"
+            if not isinstance(row, list) or len(row) != 2:
+                errors.append(SchemaError(p, f"[하한, 추징률] 형식이어야 합니다 (입력값: {_show(row)})"))
+                prev = None
+                continue
+            n = len(errors)
+            ratio(row[0], f"{p}[0]", errors)
+            ratio(row[1], f"{p}[1]", errors)
+            if len(errors) > n:
+                prev = None
+                continue
+            if prev is not None:
+                if row[0] <= prev[0]:
+                    errors.append(SchemaError(p, f"하한은 앞 구간({prev[0]})보다 커야 합니다 (입력값: {row[0]})"))
+                elif row[1] < prev[1]:
+                    errors.append(SchemaError(p, f"추징률은 앞 구간({prev[1]})보다 작을 수 없습니다 (입력값: {row[1]})"))
+            prev = row
+    return check
+
+
+def array_of(item: Check, nullable: bool = False) -> Check:
+    def check(v, path, errors):
+        if v is None and nullable:
+            return
+        if not isinstance(v, list):
+            errors.append(SchemaError(path, f"목록(배열)이어야 합니다 (입력값: {_show(v)})"))
+            return
+        for i, x in enumerate(v):
+            item(x, f"{path}[{i}]", errors)
+    return check
+
+
+def enum_map(labels: Sequence[str], value: Check, what: str, require_all: bool = True) -> Check:
+    """라벨(기업규모/지역) → 값 dict."""
+    allowed = frozenset(labels)
+    ordered = list(labels)
+
+    def check(v, path, errors):
+        if not isinstance(v, dict):
+            errors.append(SchemaError(path, f"{what}별 객체여야 합니다 (입력값: {_show(v)})"))
+            return
+        for k, x in v.items():
+            if k not in allowed:
+                errors.append(SchemaError(f"{path}.{k}", f"알 수 없는 {what} 라벨입니다 (허용: {', '.join(ordered)})"))
+                continue
+            value(x, f"{path}.{k}", errors)
+        if require_all:
+            for k in ordered:
+                if k not in v:
+                    errors.append(SchemaError(f"{path}.{k}", f"{what} 값이 없습니다"))
+    return check
+
+
+def obj(fields: Dict[str, Check], required: Sequence[str] = (), allow_extra: bool = False,
+        rules: Sequence[Callable[[dict, str, List[SchemaError]], None]] = ()) -> Check:
+    """고정 키 객체 (rules: 여러 키를 함께 보는 검사, 예: 임계값 순서)."""
+    known = frozenset(fields)
+    required = tuple(required)
+
+    def check(v, path, errors):
+        if not isinstance(v, dict):
+            errors.append(SchemaError(path, f"객체여야 합니다 (입력값: {_show(v)})"))
+            return
+        for k, x in v.items():
+            f = fields.get(k)
+            if f is not None:
+                f(x, f"{path}.{k}", errors)
+            elif not allow_extra:
+                errors.append(SchemaError(f"{path}.{k}", "알 수 없는 키입니다 (오타 확인)"))
+        for k in required:
+            if k not in v:
+                errors.append(SchemaError(f"{path}.{k}", "필수 키가 없습니다"))
+        for rule in rules:
+            rule(v, path, errors)
+    return check
+
+
+def ordered_keys(keys: Sequence[str]) -> Callable[[dict, str, List[SchemaError]], None]:
+    """숫자 값이 keys 순서대로 커지지 않으면 오류 (값이 숫자가 아닌 경우는 개별 검사에서 보고)."""
+    def rule(v, path, errors):
+        present = [(k, v[k]) for k in keys if isinstance(v.get(k), (int, float)) and not isinstance(v.get(k), bool)]
+        for (k1, a), (k2, b) in zip(present, present[1:]):
+            if a > b:
+                errors.append(SchemaError(path, f"{k1}({a}) ≤ {k2}({b}) 순서여야 합니다"))
+    return rule
+
+
+# -----------------------------
+# 시행령 파라미터 스키마
+# -----------------------------
+
+def compile_params_schema() -> Check:
+    amount = integer(min_value=0)
+    per_head = enum_map(SIZE_LABELS, enum_map(REGION_LABELS, amount, "지역"), "기업규모")
+    tiers = obj(
+        {"none": number(0.0, 1.0), "half": number(0.0, 1.0), "full": number(0.0, 1.0)},
+        rules=[ordered_keys(["none", "half", "full"])],
+    )
+    return obj(
+        {
+            "per_head_basic": per_head,
+            "per_head_youth": per_head,
+            "per_head_conversion": amount,
+            "per_head_return_from_parental": amount,
+            "retention_years": enum_map(SIZE_LABELS, integer(1, MAX_RETENTION_YEARS), "기업규모"),
+            "max_credit_total": integer(min_value=0, nullable=True),
+            "min_tax_limit_rate": number(0.0, 1.0, nullable=True),
+            "excluded_industries": array_of(string(), nullable=True),
+            "tiered_thresholds": tiers,
+            "clawback_tiers": tier_table(nullable=True),
+            "youth_age_bands": array_of(age_band(), nullable=True),
+            "youth_military_extension_years": integer(0, MAX_MILITARY_EXTENSION_YEARS),
+            "youth_age_basis": choice(YOUTH_AGE_BASES),
+            "carryforward_years": integer(0, MAX_CARRYFORWARD_YEARS),
+            # 시행령 레지스트리(policies/*.json)용
+            "effective_year": integer(1900, 2100),
+            "name": string(nullable=True),
+        },
+        required=("per_head_basic", "per_head_youth", "retention_years"),
+    )
+
+
+_PARAMS_CHECK: Check = compile_params_schema()
+
+
+def validate_params_dict(cfg: Any) -> List[SchemaError]:
+    """설정 전체를 검사해 모든 오류를 반환 (정상은 빈 목록)."""
+    errors: List[SchemaError] = []
+    _PARAMS_CHECK(cfg, "$", errors)
+    return errors
+
+
+def parse_params_dict(cfg: Any) -> PolicyParameters:
+    """검증 후 PolicyParameters로 변환 (오류가 있으면 ParamsValidationError)."""
+    errors = validate_params_dict(cfg)
+    if errors:
+        raise ParamsValidationError(errors)
+    return params_from_dict(cfg)
+
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+파라미터 JSON 변경 감시 + 자동 재적용 (장시간 실행 서비스용)
+
+- 변경 감지: inotify(inotify_simple 설치 시) 또는 수정시각/크기 폴링
+- 변경되면 백그라운드 스레드에서 다시 읽고 검증/컴파일(PolicyArrays)까지 끝낸 뒤 교체
+  · 읽기/검증에 실패하면 기존 버전을 그대로 사용하고 last_error에 기록 (성공할 때까지 다음 확인에서 다시 읽음)
+  · 내용이 같으면(해시 동일) 새 버전을 만들지 않음
+- 교체는 참조 하나를 바꾸는 방식: 계산 중인 쪽은 이미 받은 스냅샷(이전 버전)으로 끝나고,
+  새 계산부터 새 버전 사용
+- 이전 버전은 버전 번호/해시로 보관 (재현용, archive_dir를 주면 해시별 JSON으로도 저장)
+
+사용 예)
+    watcher = ParamsWatcher("params.json").start()
+    snap = watcher.current          # 계산 1건 동안 이 스냅샷만 사용
+    res = compute_batch(df, snap.params, arrays=snap.arrays)
+
+CLI 예시)
+    python params_watcher.py --params-json params.json --poll-interval 1
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import json
+import threading
+import time
+
+from batch_engine import PolicyArrays, compile_policy_arrays
+from employment_tax_credit_calc import PolicyParameters, load_params_from_json, params_to_dict
+from scenario_store import params_fingerprint
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags  # Linux, 선택 설치
+except ImportError:
+    INotify = None
+    inotify_flags = None
+
+
+@dataclass(frozen=True)
+class ParamsSnapshot:
+    """불러온 파라미터 1개 버전 (교체 후에도 변하지 않음)."""
+    version: int
+    params: PolicyParameters
+    arrays: PolicyArrays
+    fingerprint: str
+    loaded_at: str
+    source: str
+
+
+class ParamsWatcher:
+    """
+    파라미터 파일 감시자
+    - loader: 경로 → PolicyParameters (검증 실패 시 예외). 기본 load_params_from_json
+    - keep_versions: 메모리에 보관할 버전 수 (None이면 전부)
+    - on_reload(snapshot) / on_error(exc): 백그라운드 스레드에서 호출되는 콜백
+    """
+
+    def __init__(
+        self,
+        path: str,
+        poll_interval: float = 1.0,
+        loader: Callable[[str], PolicyParameters] = load_params_from_json,
+        keep_versions: Optional[int] = 50,
+        archive_dir: Optional[str] = None,
+        on_reload: Optional[Callable[[ParamsSnapshot], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        self.path = Path(path)
+        self.poll_interval = float(poll_interval)
+        self.loader = loader
+        self.keep_versions = keep_versions
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.on_reload = on_reload
+        self.on_error = on_error
+        self.last_error: Optional[Exception] = None
+
+        self._lock = threading.Lock()
+        self._versions: "OrderedDict[int, ParamsSnapshot]" = OrderedDict()
+        self._current: Optional[ParamsSnapshot] = None
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._error_signature: Optional[Tuple[int, int, int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 처음 한 번은 호출한 스레드에서 읽음 (실패하면 예외 그대로)
+        self._signature = self._stat()
+        self._install(self._load())
+
+    # ---- 조회 ----
+    @property
+    def current(self) -> ParamsSnapshot:
+        """현재 버전 (참조 읽기 한 번이라 잠금 없이 일관된 스냅샷)."""
+        return self._current
+
+    def get(self, version: int) -> Optional[ParamsSnapshot]:
+        with self._lock:
+            return self._versions.get(int(version))
+
+    def find(self, fingerprint: str) -> Optional[ParamsSnapshot]:
+        with self._lock:
+            for snap in reversed(self._versions.values()):
+                if snap.fingerprint == fingerprint:
+                    return snap
+        return None
+
+    def history(self) -> List[ParamsSnapshot]:
+        with self._lock:
+            return list(self._versions.values())
+
+    # ---- 감시 ----
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _load(self) -> ParamsSnapshot:
+        params = self.loader(str(self.path))
+        arrays = compile_policy_arrays(params)
+        prev = self._current
+        return ParamsSnapshot(
+            version=(prev.version + 1) if prev else 1,
+            params=params,
+            arrays=arrays,
+            fingerprint=params_fingerprint(params),
+            loaded_at=datetime.now().isoformat(timespec="seconds"),
+            source=str(self.path),
+        )
+
+    def _install(self, snap: ParamsSnapshot) -> None:
+        if self.archive_dir is not None:
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            target = self.archive_dir / f"{snap.fingerprint}.json"
+            if not target.exists():
+                target.write_text(json.dumps(params_to_dict(snap.params), ensure_ascii=False, indent=2), encoding="utf-8")
+        with self._lock:
+            self._versions[snap.version] = snap
+            if self.keep_versions is not None:
+                while len(self._versions) > max(1, self.keep_versions):
+                    self._versions.popitem(last=False)
+            self._current = snap  # 교체 (이후 current를 읽는 계산부터 새 버전)
+
+    def check(self) -> bool:
+        """파일이 바뀌었으면 다시 읽어 교체. 반환: 새 버전 설치 여부."""
+        sig = self._stat()
+        if sig is None or sig == self._signature:
+            return False
+        try:
+            snap = self._load()
+        except Exception as e:  # 잘못된 JSON/검증 실패 → 이전 버전 유지
+            # 서명은 갱신하지 않음: 저장 도중 읽은 경우 다음 확인에서 다시 읽도록 (알림은 같은 파일 상태당 한 번)
+            self.last_error = e
+            if self.on_error is not None and sig != self._error_signature:
+                self.on_error(e)
+            self._error_signature = sig
+            return False
+        self.last_error = None
+        self._error_signature = None
+        self._signature = sig
+        if snap.fingerprint == self._current.fingerprint:
+            return False  # 저장만 다시 한 경우
+        self._install(snap)
+        if self.on_reload is not None:
+            self.on_reload(snap)
+        return True
+
+    def _run(self) -> None:
+        ino = None
+        if INotify is not None:
+            try:
+                ino = INotify()
+                # 원자적 교체(os.replace)도 잡도록 파일이 아니라 디렉터리를 감시
+                ino.add_watch(str(self.path.parent.resolve()),
+                              inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE)
+            except OSError:
+                ino = None
+        try:
+            while not self._stop.is_set():
+                if ino is not None:
+                    ino.read(timeout=int(self.poll_interval * 1000))
+                else:
+                    self._stop.wait(self.poll_interval)
+                if not self._stop.is_set():
+                    self.check()
+        finally:
+            if ino is not None:
+                ino.close()
+
+    def start(self) -> "ParamsWatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="params-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1.0)
+            self._thread = None
+
+    def __enter__(self) -> "ParamsWatcher":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if INotify is not None else "polling"
+
+
+_watchers: Dict[str, ParamsWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_params_watcher(path: str, **kw) -> ParamsWatcher:
+    """프로세스 전체에서 경로별로 공유하는 감시자 (처음 호출 시 시작)."""
+    key = str(Path(path).resolve())
+    with _watchers_lock:
+        w = _watchers.get(key)
+        if w is None:
+            w = _watchers[key] = ParamsWatcher(path, **kw).start()
+        return w
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파라미터 JSON 변경 감시 (변경 시 자동 재적용)")
+    parser.add_argument("--params-json", required=True, help="법령 단가·기간 설정 JSON 경로")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="폴링/대기 간격(초)")
+    parser.add_argument("--archive-dir", default=None, help="버전별 파라미터 JSON 보관 디렉터리 (선택)")
+    args = parser.parse_args()
+
+    def _on_reload(snap: ParamsSnapshot):
+        print(f"[{snap.loaded_at}] v{snap.version} 적용 (파라미터 {snap.fingerprint})", flush=True)
+
+    def _on_error(e: Exception):
+        print(f"[{datetime.now().isoformat(timespec='seconds')}] 다시 읽기 실패, 이전 버전 유지: {e}", flush=True)
+
+    watcher = ParamsWatcher(args.params_json, args.poll_interval, archive_dir=args.archive_dir,
+                            on_reload=_on_reload, on_error=_on_error)
+    print(f"=== 파라미터 감시 시작 ({watcher.mode}) ===")
+    _on_reload(watcher.current)
+    watcher.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        print(f"=== 감시 종료: 버전 {len(watcher.history())}개 보관 ===")
+
+
+if __name__ == "__main__":
+    main()
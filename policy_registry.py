@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+과세연도별 시행령 레지스트리
+
+- 시행령 버전 여러 개를 시행 과세연도(effective_year) 기준으로 보관
+  · 과세연도 Y에는 effective_year <= Y 인 버전 중 가장 최근 버전 적용
+- 디렉터리의 JSON(load_params_from_json 형식 + "effective_year", "name")을 읽어 등록
+  · effective_year가 없으면 파일명 앞 4자리(예: 2024_개정.json)를 사용
+- 컴파일 결과(연도축 단가 텐서 + 원본 JSON)를 .npz 스냅샷으로 저장
+  · 원본 파일 서명(이름/수정시각/크기)이 같으면 JSON 파싱 없이 스냅샷만 읽음 → 수 ms 시작
+- 일괄 계산: 행마다 tax_year로 버전을 골라 batch_engine.compute_batch_by_year로 한 번에 계산
+
+사용 예)
+    reg = load_registry("policies", snapshot_path=".app_cache/policy_snapshot.npz")
+    params = reg.params_for_year(2024)
+    res = reg.compute(df, method="proportional")
+"""
+
+from __future__ import annotations
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+
+from batch_engine import PolicyTensor, TierTable, compute_batch_by_year, stack_policy_arrays
+from employment_tax_credit_calc import PolicyParameters, params_from_dict, params_to_dict
+from params_schema import parse_params_dict
+from industry_index import ExclusionIndex, compile_exclusions
+
+
+SNAPSHOT_VERSION = 2
+_YEAR_PREFIX = re.compile(r"^(\d{4})")
+
+
+@dataclass
+class PolicyVersion:
+    """시행령 버전 1개 (effective_year부터 적용)."""
+    effective_year: int
+    name: str
+    params: PolicyParameters
+
+
+class PolicyRegistry:
+    """시행 과세연도순 시행령 버전 목록 + 연도축 단가 텐서."""
+
+    def __init__(self, versions: Optional[List[PolicyVersion]] = None):
+        self._years: List[int] = []
+        self._names: List[str] = []
+        self._raw: List[str] = []  # 버전별 JSON (스냅샷에서 읽은 경우 params는 필요할 때만 변환)
+        self._params: Dict[int, PolicyParameters] = {}
+        self._tensor: Optional[PolicyTensor] = None
+        self._exclusions: Optional[List[ExclusionIndex]] = None
+        for v in versions or []:
+            self.register(v.effective_year, v.params, v.name)
+
+    # ---- 등록/조회 ----
+    def register(self, effective_year: int, params: PolicyParameters, name: str = "") -> None:
+        """버전 추가 (같은 시행연도가 있으면 교체)."""
+        year = int(effective_year)
+        raw = json.dumps(params_to_dict(params), ensure_ascii=False, sort_keys=True)
+        i = bisect_right(self._years, year)
+        if i > 0 and self._years[i - 1] == year:
+            i -= 1
+            self._names[i], self._raw[i] = name or str(year), raw
+        else:
+            self._years.insert(i, year)
+            self._names.insert(i, name or str(year))
+            self._raw.insert(i, raw)
+        self._params[year] = params
+        self._tensor = None
+        self._exclusions = None
+
+    @property
+    def years(self) -> List[int]:
+        return list(self._years)
+
+    def __len__(self) -> int:
+        return len(self._years)
+
+    def version_for_year(self, tax_year: int) -> PolicyVersion:
+        """과세연도에 적용할 버전 (없으면 KeyError)."""
+        i = bisect_right(self._years, int(tax_year)) - 1
+        if i < 0:
+            raise KeyError(f"{tax_year}년에 적용할 시행령이 없습니다.")
+        year = self._years[i]
+        params = self._params.get(year)
+        if params is None:
+            params = self._params[year] = params_from_dict(json.loads(self._raw[i]))
+        return PolicyVersion(year, self._names[i], params)
+
+    def params_for_year(self, tax_year: int) -> PolicyParameters:
+        return self.version_for_year(tax_year).params
+
+    def versions(self) -> List[PolicyVersion]:
+        return [self.version_for_year(y) for y in self._years]
+
+    # ---- 일괄 계산 ----
+    @property
+    def tensor(self) -> PolicyTensor:
+        if self._tensor is None:
+            self._tensor = stack_policy_arrays(self._years, [self.params_for_year(y) for y in self._years])
+        return self._tensor
+
+    def compute(self, df, method: str = "proportional", tiered_thresholds=None, tax_year: Optional[int] = None):
+        """행별 tax_year(없으면 인자 tax_year)의 시행령으로 일괄 계산."""
+        return compute_batch_by_year(df, self.tensor, method, tiered_thresholds, tax_year=tax_year,
+                                     exclusions=self.exclusions)
+
+    @property
+    def exclusions(self) -> List[ExclusionIndex]:
+        """버전별 제외업종 색인 (years 순서)."""
+        if self._exclusions is None:
+            self._exclusions = [compile_exclusions(self.params_for_year(y).excluded_industries) for y in self._years]
+        return self._exclusions
+
+    # ---- 스냅샷 ----
+    def save_snapshot(self, path: str, signature: str = "") -> None:
+        """텐서 + 원본 JSON을 .npz로 저장 (임시파일에 쓴 뒤 교체)."""
+        t = self.tensor
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=target.name + ".", suffix=".tmp", dir=str(target.parent))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    snapshot_version=np.array(SNAPSHOT_VERSION),
+                    signature=np.array(signature),
+                    names=np.array(self._names, dtype=str),
+                    raw=np.array(self._raw, dtype=str),
+                    years=t.years, basic=t.basic, youth=t.youth, conversion=t.conversion, parental=t.parental,
+                    retention=t.retention, max_credit_total=t.max_credit_total, min_tax_limit_rate=t.min_tax_limit_rate,
+                    tier_keys=t.clawback_tiers.keys, tier_rates=t.clawback_tiers.rates, tier_starts=t.clawback_tiers.starts,
+                )
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load_snapshot(cls, path: str, signature: Optional[str] = None) -> Optional["PolicyRegistry"]:
+        """스냅샷 읽기 (없거나 형식/서명이 다르면 None)."""
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                if int(z["snapshot_version"]) != SNAPSHOT_VERSION:
+                    return None
+                if signature is not None and str(z["signature"]) != signature:
+                    return None
+                reg = cls()
+                reg._years = [int(y) for y in z["years"]]
+                reg._names = [str(s) for s in z["names"]]
+                reg._raw = [str(s) for s in z["raw"]]
+                reg._tensor = PolicyTensor(**{k: z[k] for k in (
+                    "years", "basic", "youth", "conversion", "parental",
+                    "retention", "max_credit_total", "min_tax_limit_rate",
+                )}, clawback_tiers=TierTable(z["tier_keys"], z["tier_rates"], z["tier_starts"]))
+                return reg
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def _source_files(policy_dir: str) -> List[Path]:
+    d = Path(policy_dir)
+    return sorted(p for p in d.glob("*.json") if p.is_file()) if d.is_dir() else []
+
+
+def source_signature(files: List[Path]) -> str:
+    """원본 JSON 목록의 서명 (이름/수정시각/크기)."""
+    h = hashlib.sha256()
+    for p in files:
+        st = p.stat()
+        h.update(f"{p.name}\0{st.st_mtime_ns}\0{st.st_size}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def read_policy_file(path: Path) -> Tuple[int, str, PolicyParameters]:
+    """JSON 1개 → (시행연도, 이름, 파라미터)."""
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    year = cfg.get("effective_year")
+    if year is None:
+        m = _YEAR_PREFIX.match(path.stem)
+        if not m:
+            raise ValueError(f"{path.name}: effective_year가 없고 파일명도 연도(YYYY)로 시작하지 않습니다.")
+        year = m.group(1)
+    return int(year), str(cfg.get("name") or path.stem), parse_params_dict(cfg)
+
+
+def load_registry(policy_dir: str, snapshot_path: Optional[str] = None) -> PolicyRegistry:
+    """
+    디렉터리의 시행령 JSON → 레지스트리
+    snapshot_path가 있으면 원본 서명이 같을 때 스냅샷을 읽고, 다르면 다시 컴파일해 저장
+    """
+    files = _source_files(policy_dir)
+    signature = source_signature(files)
+    if snapshot_path:
+        reg = PolicyRegistry.load_snapshot(snapshot_path, signature)
+        if reg is not None:
+            return reg
+    reg = PolicyRegistry()
+    for p in files:
+        year, name, params = read_policy_file(p)
+        reg.register(year, params, name)
+    if snapshot_path:
+        try:
+            reg.save_snapshot(snapshot_path, signature)
+        except OSError:
+            pass  # 읽기 전용 환경: 스냅샷 없이 사용
+    return reg
+
+
+def main():
+    parser = argparse.ArgumentParser(description="과세연도별 시행령 레지스트리 컴파일/조회")
+    parser.add_argument("--policy-dir", required=True, help="시행령 JSON 디렉터리")
+    parser.add_argument("--snapshot", default=None, help="스냅샷(.npz) 경로")
+    parser.add_argument("--tax-year", type=int, default=None, help="적용 버전을 확인할 과세연도")
+    args = parser.parse_args()
+
+    reg = load_registry(args.policy_dir, args.snapshot)
+    print("=== 시행령 레지스트리 ===")
+    for v in reg.versions():
+        print(f"- {v.effective_year}년~: {v.name}")
+    if args.tax_year is not None:
+        try:
+            v = reg.version_for_year(args.tax_year)
+            print(f"\n- {args.tax_year}년 적용: {v.name} ({v.effective_year}년 시행)")
+        except KeyError as e:
+            print(f"\n- {e}")
+
+
+if __name__ == "__main__":
+    main()
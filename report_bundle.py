@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+기업별 보고서("결과요약" + "사후관리 결과표") 일괄 생성 → 하나의 ZIP
+
+- 기업별 엑셀은 프로세스 풀에서 병렬 생성 (excel_report 골격 복제 방식, _build_excel과 같은 서식)
+- 로고는 메인 프로세스에서 한 번만 워터마크로 변환하고, 워커 초기화 때 한 번만 전달
+- 완성된 파일은 끝나는 순서대로 바로 ZIP에 기록하고 버림 (동시에 메모리에 있는 파일 수 = 작업 창 크기)
+- 처리량(files/sec)과 파일별 소요시간을 반환
+- 입력 오류(error)가 있거나 업종 제외(excluded)된 행은 보고서를 만들지 않고 ZIP 안의 skipped.csv(행 번호, 기업, 사유)에 기록
+
+CLI 예시)
+    python report_bundle.py --params-json params.json --companies companies.csv --out reports.zip --logo logo.png
+"""
+
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import csv
+import io
+import os
+import re
+import time
+import zipfile
+
+from excel_report import prepare_logo, render_report_xlsx
+
+
+# (파일명, summary, inputs, last_calc, 기관명)
+ReportPayload = Tuple[str, Dict[str, Any], Dict[str, Any], Dict[str, Any], str]
+# (행 번호, 기관명, 건너뛴 사유)
+SkippedRow = Tuple[int, str, str]
+SKIPPED_MANIFEST = "skipped.csv"
+
+_worker_logo: Optional[bytes] = None
+
+
+def _init_worker(prepared_logo: Optional[bytes]) -> None:
+    global _worker_logo
+    _worker_logo = prepared_logo
+
+
+def _render(payload: ReportPayload) -> Tuple[str, bytes, float]:
+    name, summary, inputs, last_calc, company_name = payload
+    t0 = time.perf_counter()
+    # 워커별로 로고 골격을 한 번 만들고 값만 채움
+    data = render_report_xlsx(summary, inputs, last_calc, company_name=company_name, prepared_logo=_worker_logo)
+    return name, data, time.perf_counter() - t0
+
+
+def safe_filename(name: str, index: int) -> str:
+    base = re.sub(r'[\\/:*?"<>|\s]+', "_", str(name or "").strip()) or "company"
+    return f"{index:05d}_{base[:60]}.xlsx"
+
+
+def payloads_from_batch(
+    df,
+    method: str = "proportional",
+    start_index: int = 0,
+    skipped: Optional[List[SkippedRow]] = None,
+) -> Iterator[ReportPayload]:
+    """
+    batch_engine.compute_batch 결과 DataFrame → 기업별 보고서 입력
+    - error가 있거나 excluded(업종 제외)인 행은 건너뛰고 skipped 목록(주어진 경우)에 (행 번호, 기관명, 사유) 추가
+    """
+    from batch_engine import CLAWBACK_PREFIX, FOLLOWUP_PREFIX, followup_columns
+
+    fcols = followup_columns(df)
+    for i, row in enumerate(df.to_dict(orient="records"), start=start_index):
+        company = "" if _is_missing(row.get("company")) else str(row["company"])
+        reason = _skip_reason(row)
+        if reason:
+            if skipped is not None:
+                skipped.append((i, company, reason))
+            continue
+        summary = {
+            "gross": int(row["gross"]),
+            "applied": int(row["applied"]),
+            "retention_years": int(row["retention_years"]),
+            "company_size": row.get("company_size", ""),
+            "region": row.get("region", ""),
+            "base_headcount": int(row.get("curr_total") or 0),
+            "clawback_method": method,
+        }
+        inputs = {
+            "tax_before_credit": _as_int(row.get("tax_before_credit")),
+            "clawback_method": method,
+            "prev_total": _as_int(row.get("prev_total")),
+            "prev_youth": _as_int(row.get("prev_youth")),
+            "curr_total": _as_int(row.get("curr_total")),
+            "curr_youth": _as_int(row.get("curr_youth")),
+            "converted_regular": _as_int(row.get("converted_regular")),
+            "returned_parental": _as_int(row.get("returned_from_parental_leave")),
+        }
+        records = []
+        for c in fcols:
+            if _is_missing(row.get(c)):
+                continue
+            y = int(str(c)[len(FOLLOWUP_PREFIX):])
+            records.append({
+                "연차": y,
+                "사후연도 상시": int(row[c]),
+                "사후연도 청년등": 0,
+                "추징세액": int(row.get(f"{CLAWBACK_PREFIX}{y}", 0)),
+            })
+        last_calc = {**summary, "schedule_records": records, "total_clawback": int(row.get("total_clawback", 0))}
+        yield safe_filename(company, i), summary, inputs, last_calc, company
+
+
+def _skip_reason(row: Dict[str, Any]) -> str:
+    """보고서를 만들지 않는 사유 (입력 오류 / 업종 제외, 없으면 "")."""
+    error, excluded = row.get("error"), row.get("excluded")
+    if not _is_missing(error) and str(error) != "":
+        return str(error)
+    if not _is_missing(excluded) and str(excluded) != "":
+        return f"업종 제외: {excluded}"
+    return ""
+
+
+def _is_missing(v) -> bool:
+    return v is None or (isinstance(v, float) and v != v)
+
+
+def _as_int(v) -> int:
+    return 0 if _is_missing(v) or v == "" else int(v)
+
+
+def build_report_bundle(
+    payloads: Iterable[ReportPayload],
+    out,
+    logo_png: Optional[bytes] = None,
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    on_file=None,
+    skipped: Optional[List[SkippedRow]] = None,
+) -> Dict[str, Any]:
+    """
+    기업별 보고서를 병렬 생성해 ZIP(out: 경로 또는 바이너리 파일 객체)에 기록
+    - max_in_flight: 동시에 제출해 두는 작업 수 (기본 workers*2) → 메모리 상한
+    - on_file(done_count, name, seconds): 진행 콜백
+    - skipped: payloads_from_batch에 넘긴 것과 같은 목록 → 다 만든 뒤 비어 있지 않으면 skipped.csv로 기록
+    반환: {"files", "bytes", "seconds", "files_per_sec", "skipped", "per_file": [(name, seconds), ...]}
+    """
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+    max_in_flight = max_in_flight or workers * 2
+    prepared = prepare_logo(logo_png)
+
+    stats: Dict[str, Any] = {"files": 0, "bytes": 0, "seconds": 0.0, "files_per_sec": 0.0, "per_file": []}
+    t0 = time.perf_counter()
+    it = iter(payloads)
+
+    # xlsx는 이미 압축된 형식이라 ZIP에서는 무압축(STORED)으로 빠르게 기록
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(prepared,)) as pool:
+        pending = set()
+
+        def _fill():
+            while len(pending) < max_in_flight:
+                try:
+                    payload = next(it)
+                except StopIteration:
+                    return
+                pending.add(pool.submit(_render, payload))
+
+        _fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                pending.discard(fut)
+                name, data, secs = fut.result()
+                zf.writestr(name, data)
+                stats["files"] += 1
+                stats["bytes"] += len(data)
+                stats["per_file"].append((name, secs))
+                if on_file is not None:
+                    on_file(stats["files"], name, secs)
+            _fill()
+
+        if skipped:
+            zf.writestr(SKIPPED_MANIFEST, _skipped_csv(skipped))
+
+    stats["skipped"] = len(skipped or [])
+    stats["seconds"] = time.perf_counter() - t0
+    stats["files_per_sec"] = stats["files"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
+
+
+def _skipped_csv(skipped: List[SkippedRow]) -> bytes:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(["row", "company", "error"])
+    w.writerows(skipped)
+    return buf.getvalue().encode("utf-8-sig")
+
+
+def main():
+    from employment_tax_credit_calc import load_params_from_json
+    from batch_engine import compile_policy_arrays, compute_batch, read_companies_chunked
+
+    parser = argparse.ArgumentParser(description="기업별 통합고용세액공제 보고서 일괄 생성 (ZIP)")
+    parser.add_argument("--params-json", required=True, help="법령 단가·기간 설정 JSON 경로")
+    parser.add_argument("--companies", required=True, help="기업 목록 CSV/XLSX (batch_engine 입력 형식)")
+    parser.add_argument("--out", required=True, help="출력 ZIP 경로")
+    parser.add_argument("--logo", default=None, help="로고 PNG 경로 (선택)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--clawback-method", choices=["proportional", "all_or_nothing", "tiered"], default="proportional")
+    args = parser.parse_args()
+
+    params = load_params_from_json(args.params_json)
+    arrays = compile_policy_arrays(params)
+    logo = Path(args.logo).read_bytes() if args.logo else None
+    skipped: List[SkippedRow] = []
+
+    def _payloads():
+        offset = 0
+        for chunk in read_companies_chunked(args.companies, args.companies):
+            res = compute_batch(chunk, params, args.clawback_method, arrays=arrays)
+            yield from payloads_from_batch(res, args.clawback_method, start_index=offset, skipped=skipped)
+            offset += len(res)
+
+    stats = build_report_bundle(_payloads(), args.out, logo_png=logo, workers=args.workers, skipped=skipped)
+    slowest = sorted(stats["per_file"], key=lambda x: x[1], reverse=True)[:5]
+    print("=== 보고서 일괄 생성 결과 ===")
+    print(f"- 생성 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"- 파일 수: {stats['files']:,}개 / 용량: {stats['bytes']:,} bytes")
+    if stats["skipped"]:
+        print(f"- 입력 오류/업종 제외로 건너뜀: {stats['skipped']:,}건 (ZIP 안 {SKIPPED_MANIFEST})")
+    print(f"- 소요 시간: {stats['seconds']:.2f}초 ({stats['files_per_sec']:.1f} files/sec)")
+    if stats["per_file"]:
+        avg = sum(s for _, s in stats["per_file"]) / len(stats["per_file"])
+        print(f"- 파일당 평균: {avg * 1000:.1f}ms")
+        for name, secs in slowest:
+            print(f"  · {name}: {secs * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
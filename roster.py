@@ -0,0 +1,518 @@
+# -*- coding: utf-8 -*-
+"""
+급여대장(직원×월) → 기업·과세연도별 상시근로자 / 청년등 상시근로자 수 (월평균)
+
+입력 열 (CSV/XLSX, 한 행 = 직원 1명의 1개월 급여 기록)
+- company: 기업 식별자/이름
+- employee_id: 직원 식별자
+- month: 귀속 연월 ("2024-03", "202403", "2024-03-31" 등)
+- weight (선택): 상시근로자 환산 인원 (기본 1, 단시간근로자 0.5/0.75 등, 0이면 제외)
+- youth (선택): 청년등 해당 여부 (1/0, True/False)
+- birth_date / hire_date / military_months (선택): youth 열이 없으면 생년월일로 청년등 판정
+  (PolicyParameters의 연령 구간·병역 가산·판단 시점 사용, classify_youth 참고) — 둘 다 없으면 0
+
+집계 규칙
+- 월별 인원 = 그 달 직원별 weight 합
+  · 같은 (기업, 직원, 연월) 행이 여러 개(상여금/정정 행 등)면 한 번만 셈 — weight·청년 인원은 최대값
+  · 청크를 넘나드는 중복도 EmployeeMonthIndex(연월별 직원 해시 정렬 배열)로 처리 → 청크 크기와 무관한 결과
+  · 색인은 가장 최근 연월과 직전 dedupe_window개월치만 유지 (급여대장은 연월 순이어야 함, 아니면 ValueError)
+    연월 순이 아닌 입력은 dedupe_window=None (전체 고유 직원·월 × 24바이트 메모리)
+  · employee_id가 비어 있는 행은 중복 판단 없이 각각 셈
+- 연 상시근로자 수 = 해당 과세연도 월별 인원 합 ÷ 12 (months="observed"면 기록이 있는 개월 수)
+  → 소수점 셋째 자리 이하 버림
+- 직전 연도 기록이 없는 기업은 prev_total/prev_youth = NaN (0으로 채우면 전 인원이 증가로 잡힘)
+  → batch_engine.compute_batch가 error 열로 보고
+- 청크 단위로 읽어 (기업, 연월)별 부분합 + 최근 몇 개월의 직원·월 색인(고유 직원·월 1건당 24바이트)만 유지
+  (중복이 없다고 확실한 입력은 dedupe=False로 색인 없이 "기업 수 × 개월 수" 메모리만 사용)
+
+CLI 예시)
+    python roster.py --roster payroll.csv --tax-year 2024 --out companies_heads.csv
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from employment_tax_credit_calc import HeadcountInputs, PolicyParameters
+
+
+ROSTER_COLUMNS = ["company", "employee_id", "month", "weight", "youth", "birth_date", "hire_date", "military_months"]
+DEFAULT_CHUNK_ROWS = 500_000
+DEFAULT_DEDUPE_WINDOW = 1  # 중복 색인을 유지하는 기간: 가장 최근 연월과 그 이전 n개월
+
+
+def parse_year_month(values: pd.Series) -> np.ndarray:
+    """연월 문자열/날짜 → YYYYMM 정수 배열 (해석 불가는 -1)."""
+    s = values.astype(str).str.strip()
+    digits = s.str.replace(r"[^0-9]", "", regex=True)
+    ym = pd.to_numeric(digits.str.slice(0, 6), errors="coerce")
+    ok = digits.str.len() >= 6
+    ym = ym.where(ok)
+    month = ym % 100
+    ym = ym.where((month >= 1) & (month <= 12))
+    return ym.fillna(-1).to_numpy(dtype=np.int64)
+
+
+_TRUE_TEXT = {"1": 1.0, "true": 1.0, "y": 1.0, "yes": 1.0, "예": 1.0, "o": 1.0}
+
+
+def _bool_column(chunk: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in chunk.columns:
+        return np.zeros(len(chunk), dtype=np.float64)
+    v = chunk[name]
+    # 문자열 열: pandas 2의 object, pandas 3의 StringDtype 모두 (엑셀 텍스트 셀은 숫자와 섞인 object)
+    if pd.api.types.is_string_dtype(v) or pd.api.types.is_object_dtype(v):
+        text = v.astype("string").str.strip().str.lower()
+        flag = text.map(_TRUE_TEXT).astype("float64")
+        return flag.fillna(pd.to_numeric(v, errors="coerce")).fillna(0).to_numpy(dtype=np.float64)
+    return pd.to_numeric(v, errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+
+
+# -----------------------------
+# 청년등 판정 (datetime64 배열 연산)
+# -----------------------------
+
+@dataclass(frozen=True)
+class YouthRule:
+    """
+    청년등 연령 기준
+    - bands: (하한, 상한) 구간들 — 만 나이가 어느 한 구간에 들면 청년등 (상한 None = 제한 없음)
+    - military_cap_years: 병역 이행 기간을 나이에서 빼 주는 최대 연수 (상한이 있는 구간에만 적용)
+    - basis: "month_end"(매월 말일 기준) 또는 "hire"(입사일 기준, 입사일이 없으면 말일)
+    """
+    bands: Tuple[Tuple[int, Optional[int]], ...] = ((15, 34),)
+    military_cap_years: int = 6
+    basis: str = "month_end"
+
+    @classmethod
+    def from_params(cls, params: PolicyParameters) -> "YouthRule":
+        bands = params.youth_age_bands or [[15, 34]]
+        return cls(
+            bands=tuple((int(lo), None if hi is None else int(hi)) for lo, hi in bands),
+            military_cap_years=int(params.youth_military_extension_years),
+            basis=params.youth_age_basis or "month_end",
+        )
+
+
+def to_datetime64(values) -> np.ndarray:
+    """날짜 열 → datetime64[D] 배열 (해석 불가는 NaT)."""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values.astype("datetime64[D]", copy=False)
+    return pd.to_datetime(pd.Series(values), errors="coerce").to_numpy().astype("datetime64[D]")
+
+
+# datetime64의 단위 변환(astype "M8[M]")은 원소별 달력 계산이라 수천만 건에서는 느림 →
+# 배열에 실제로 나오는 날짜 범위(수만 일)만 한 번 변환해 표로 만들고, 원소는 표 조회(take)로 처리
+
+_TABLE_SPAN_LIMIT = 1 << 20  # 이보다 넓은 범위(잘못 입력된 먼 날짜 등)는 직접 변환
+
+
+def _month_day(d: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """datetime64[D] → (1970-01부터의 월 번호, 일-1) 정수 배열 (NaT 값은 의미 없음 — 호출 쪽에서 제외)."""
+    days = d.view(np.int64)
+    ok = ~np.isnat(d)
+    if not ok.any():
+        return np.zeros(len(d), dtype=np.int64), np.zeros(len(d), dtype=np.int64)
+    lo, hi = days[ok].min(), days[ok].max()
+    if hi - lo >= _TABLE_SPAN_LIMIT:
+        m = d.astype("datetime64[M]")
+        return m.astype(np.int64), (d - m.astype("datetime64[D]")).astype(np.int64)
+    span = np.arange(lo, hi + 1, dtype=np.int64).view("datetime64[D]")
+    span_m = span.astype("datetime64[M]")
+    idx = np.where(ok, days - lo, 0)
+    return (span_m.astype(np.int64).take(idx),
+            (span - span_m.astype("datetime64[D]")).astype(np.int64).take(idx))
+
+
+def month_end(ym: np.ndarray) -> np.ndarray:
+    """YYYYMM 정수 배열 → 그 달 말일 datetime64[D] (ym ≤ 0은 NaT)."""
+    ym = np.asarray(ym, dtype=np.int64)
+    ok = ym > 0
+    months = (ym // 100 - 1970) * 12 + ym % 100 - 1
+    if not ok.any():
+        return np.full(len(ym), np.datetime64("NaT"), dtype="datetime64[D]")
+    lo, hi = months[ok].min(), months[ok].max()
+    span = np.arange(lo, hi + 1, dtype=np.int64).view("datetime64[M]")
+    ends = ((span + 1).astype("datetime64[D]") - np.timedelta64(1, "D")).view(np.int64)
+    out = ends.take(np.where(ok, months - lo, 0))
+    out[~ok] = np.iinfo(np.int64).min  # NaT
+    return out.view("datetime64[D]")
+
+
+def age_in_months(birth: np.ndarray, ref: np.ndarray) -> np.ndarray:
+    """기준일 현재 만 나이(개월 수). 생일 '일'이 아직 안 지났으면 한 달 덜 찬 것으로 봄."""
+    bm, bd = _month_day(birth)
+    rm, rd = _month_day(ref)
+    return rm - bm - (rd < bd)
+
+
+def classify_youth(
+    birth,
+    ref,
+    rule: YouthRule = YouthRule(),
+    military_months=None,
+    hire=None,
+) -> np.ndarray:
+    """
+    청년등 여부 (bool 배열)
+    - birth: 생년월일, ref: 판단 기준일(보통 month_end(ym)), hire: 입사일 (rule.basis == "hire"일 때 기준일)
+    - military_months: 병역 이행 개월 수 → min(개월 수, 상한×12)만큼 나이에서 빼고 상한과 비교
+    - 생년월일/기준일이 없으면 False
+    """
+    birth = to_datetime64(birth)
+    ref = to_datetime64(ref)
+    if rule.basis == "hire" and hire is not None:
+        hire = to_datetime64(hire)
+        ref = np.where(np.isnat(hire), ref, hire)
+    valid = ~(np.isnat(birth) | np.isnat(ref))
+    months = age_in_months(birth, ref)
+    age = months // 12
+    if military_months is not None:
+        served = np.clip(np.nan_to_num(np.asarray(military_months, dtype=np.float64)), 0, rule.military_cap_years * 12)
+        age_ext = (months - served.astype(np.int64)) // 12
+    else:
+        age_ext = age
+    hit = np.zeros(len(age), dtype=bool)
+    for lo, hi in rule.bands:
+        band = age >= lo
+        if hi is not None:
+            band &= age_ext <= hi
+        hit |= band
+    return hit & valid
+
+
+def _youth_flags(chunk: pd.DataFrame, ym: np.ndarray, youth_rule: Optional[YouthRule]) -> np.ndarray:
+    if "youth" in chunk.columns or youth_rule is None or "birth_date" not in chunk.columns:
+        return _bool_column(chunk, "youth")
+    military = (pd.to_numeric(chunk["military_months"], errors="coerce").to_numpy(dtype=np.float64)
+                if "military_months" in chunk.columns else None)
+    return classify_youth(chunk["birth_date"], month_end(ym), youth_rule, military_months=military,
+                          hire=chunk["hire_date"] if "hire_date" in chunk.columns else None).astype(np.float64)
+
+
+def month_number(ym: np.ndarray) -> np.ndarray:
+    """YYYYMM → 연속 월 번호 (연 × 12 + 월 - 1)."""
+    ym = np.asarray(ym, dtype=np.int64)
+    return (ym // 100) * 12 + ym % 100 - 1
+
+
+class EmployeeMonthIndex:
+    """
+    (기업, 직원, 연월) 중복 제거 색인 — 연월별 파티션 (키 = 64비트 해시 오름차순, weight / 청년 인원 최대값)
+    - update()는 새로 늘어난 만큼(최대값 - 기존값)만 돌려주므로 청크를 어떻게 나눠도 합계가 같음
+    - 새 키는 해당 연월 파티션에만 끼워 넣음 (색인 전체를 복사하지 않음)
+    - window: 지금까지 본 가장 최근 연월보다 window개월 넘게 이전인 파티션은 버림
+      → 연월 순으로 정렬된 급여대장이면 메모리 = 약 (window + 1)개월치 직원 수 × 24바이트
+      버린 연월의 행이 다시 나오면(연월 순이 아닌 입력) ValueError
+      window=None이면 버리지 않음 (입력 순서와 무관, 메모리 = 전체 고유 직원·월 수 × 24바이트)
+    """
+
+    def __init__(self, window: Optional[int] = None):
+        if window is not None and window < 0:
+            raise ValueError("window는 0 이상이어야 합니다.")
+        self.window = window
+        self._parts: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self.newest: Optional[int] = None         # 지금까지 본 가장 최근 월 번호
+        self.sealed_before: Optional[int] = None  # 이보다 이전 월 번호의 파티션은 버림
+
+    def __len__(self) -> int:
+        return sum(len(p[0]) for p in self._parts.values())
+
+    def update(self, keys: np.ndarray, ym: np.ndarray, total: np.ndarray,
+               youth: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """청크 안에서 키가 고유한 (키, 연월, weight, 청년 인원) → 부분합에 더할 증가분 (d_total, d_youth)."""
+        mn = month_number(ym)
+        if self.sealed_before is not None and (mn < self.sealed_before).any():
+            late = int(np.asarray(ym)[mn < self.sealed_before].min())
+            raise ValueError(
+                f"급여대장이 연월 순으로 정렬되어 있지 않습니다: 이미 중복 색인을 정리한 {late} 행이 뒤에 나왔습니다. "
+                "연월 순으로 정렬하거나 중복 색인 기간 제한 없이(dedupe_window=None, --dedupe-window -1) 집계하세요."
+            )
+        d_total = np.zeros(len(keys))
+        d_youth = np.zeros(len(keys))
+        for m in np.unique(mn):
+            sel = mn == m
+            d_total[sel], d_youth[sel] = self._update_part(int(m), keys[sel], total[sel], youth[sel])
+        if len(mn):
+            self._seal(int(mn.max()))
+        return d_total, d_youth
+
+    def _update_part(self, m: int, keys: np.ndarray, total: np.ndarray,
+                     youth: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        pk, pt, py = self._parts.get(m, (np.zeros(0, dtype=np.uint64), np.zeros(0), np.zeros(0)))
+        pos = np.searchsorted(pk, keys)
+        if len(pk):
+            at = np.minimum(pos, len(pk) - 1)
+            seen = pk[at] == keys
+            old_t = np.where(seen, pt[at], 0.0)
+            old_y = np.where(seen, py[at], 0.0)
+        else:
+            at = pos
+            seen = np.zeros(len(keys), dtype=bool)
+            old_t = old_y = np.zeros(len(keys))
+        new_t = np.maximum(old_t, total)
+        new_y = np.maximum(old_y, youth)
+        pt[at[seen]] = new_t[seen]
+        py[at[seen]] = new_y[seen]
+        new = ~seen
+        if new.any():
+            order = np.argsort(keys[new], kind="stable")
+            where = pos[new][order]
+            pk = np.insert(pk, where, keys[new][order])
+            pt = np.insert(pt, where, new_t[new][order])
+            py = np.insert(py, where, new_y[new][order])
+        self._parts[m] = (pk, pt, py)
+        return new_t - old_t, new_y - old_y
+
+    def _seal(self, newest: int) -> None:
+        self.newest = newest if self.newest is None else max(self.newest, newest)
+        if self.window is None:
+            return
+        cutoff = self.newest - self.window
+        for m in [m for m in self._parts if m < cutoff]:
+            del self._parts[m]
+        self.sealed_before = cutoff if self.sealed_before is None else max(self.sealed_before, cutoff)
+
+
+def employee_keys(company: np.ndarray, employee: pd.Series) -> np.ndarray:
+    """(기업, 직원) → 64비트 해시 (employee_id가 비어 있으면 0 = 중복 판단 안 함)."""
+    emp = employee.astype(str).str.strip()
+    has = (employee.notna() & (emp != "")).to_numpy()
+    keys = pd.util.hash_pandas_object(
+        pd.DataFrame({"company": np.asarray(company, dtype=object), "employee": emp.to_numpy()}), index=False,
+    ).to_numpy(dtype=np.uint64, copy=True)
+    keys[keys == 0] = 1
+    return np.where(has, keys, np.uint64(0))
+
+
+def employee_month_keys(emp: np.ndarray, ym: np.ndarray) -> np.ndarray:
+    """(직원 키, 연월) → 64비트 해시."""
+    frame = pd.DataFrame({"emp": np.asarray(emp, dtype=np.uint64), "ym": np.asarray(ym, dtype=np.int64)})
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype=np.uint64)
+
+
+def dedupe_increments(emp: np.ndarray, ym: np.ndarray, total: np.ndarray, youth: np.ndarray,
+                      index: EmployeeMonthIndex) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    직원 키가 있는 행 → (대표 행 위치, d_total, d_youth)
+    청크 안의 같은 (직원, 연월)은 최대값으로 합친 뒤 index로 이전 청크와 비교 (roster / roster_columnar 공통)
+    """
+    keys, first, inv = np.unique(employee_month_keys(emp, ym), return_index=True, return_inverse=True)
+    t = np.zeros(len(keys))
+    y = np.zeros(len(keys))
+    np.maximum.at(t, inv, total)
+    np.maximum.at(y, inv, youth)
+    d_total, d_youth = index.update(keys, np.asarray(ym)[first], t, y)
+    return first, d_total, d_youth
+
+
+def monthly_counts(chunk: pd.DataFrame, youth_rule: Optional[YouthRule] = None,
+                   index: Optional[EmployeeMonthIndex] = None) -> pd.DataFrame:
+    """
+    급여대장 청크 → (company, ym)별 인원 부분합 [company, ym, total, youth]
+    index가 있으면 (기업, 직원, 연월) 중복을 한 번만 셈 (이전 청크에서 센 것 포함)
+    """
+    ym = parse_year_month(chunk["month"])
+    weight = (pd.to_numeric(chunk["weight"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+              if "weight" in chunk.columns else np.ones(len(chunk)))
+    youth = _youth_flags(chunk, ym, youth_rule)
+    df = pd.DataFrame({
+        "company": chunk["company"].astype(str).to_numpy(),
+        "ym": ym,
+        "total": weight,
+        "youth": weight * (youth > 0),
+    })
+    keep = ((df["ym"] > 0) & (df["total"] > 0)).to_numpy()
+    if index is not None and "employee_id" in chunk.columns:
+        emp = employee_keys(df["company"].to_numpy(), chunk["employee_id"])
+        dup = keep & (emp != 0)
+        if dup.any():
+            first, d_total, d_youth = dedupe_increments(emp[dup], ym[dup], df["total"].to_numpy()[dup],
+                                                        df["youth"].to_numpy()[dup], index)
+            g = pd.DataFrame({"company": df["company"].to_numpy()[dup][first], "ym": ym[dup][first],
+                              "total": d_total, "youth": d_youth})
+            df = pd.concat([df[keep & (emp == 0)], g[d_total + d_youth > 0]], ignore_index=True)
+            return df.groupby(["company", "ym"], sort=False, as_index=False)[["total", "youth"]].sum()
+    df = df[keep]
+    return df.groupby(["company", "ym"], sort=False, as_index=False)[["total", "youth"]].sum()
+
+
+def _truncate2(x: np.ndarray) -> np.ndarray:
+    # 부동소수 오차(예: 10.5799999)로 한 자리 더 버려지지 않도록 작은 여유를 둔 뒤 버림
+    return np.floor(np.asarray(x, dtype=np.float64) * 100 + 1e-9) / 100
+
+
+class HeadcountAccumulator:
+    """
+    (기업, 연월)별 월 인원 누적기
+    - add(chunk): 급여대장 청크 반영 (부분합만 보관, pending_limit행이 넘으면 다시 합침)
+    - yearly(): 기업·연도별 월평균 상시근로자 / 청년등 수
+    - heads(company, tax_year): 직전/당해 연도 → HeadcountInputs
+    - youth_rule: youth 열이 없을 때 생년월일로 청년등을 판정할 기준 (YouthRule.from_params)
+    - dedupe: 같은 (기업, 직원, 연월)을 한 번만 셈 (EmployeeMonthIndex, 기본 True)
+    - dedupe_window: 색인 유지 개월 수 (기본 1 → 연월 순 입력이 아니면 ValueError, None이면 제한 없음)
+    """
+
+    def __init__(self, months: str = "calendar", pending_limit: int = 200_000,
+                 youth_rule: Optional[YouthRule] = None, dedupe: bool = True,
+                 dedupe_window: Optional[int] = DEFAULT_DEDUPE_WINDOW):
+        if months not in ("calendar", "observed"):
+            raise ValueError("months는 'calendar' 또는 'observed'")
+        self.months = months
+        self.youth_rule = youth_rule
+        self.index: Optional[EmployeeMonthIndex] = EmployeeMonthIndex(dedupe_window) if dedupe else None
+        self.pending_limit = pending_limit
+        self._parts: List[pd.DataFrame] = []
+        self._pending_rows = 0
+        self._monthly: Optional[pd.DataFrame] = None
+        self.rows_read = 0
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        self.rows_read += len(chunk)
+        part = monthly_counts(chunk, self.youth_rule, self.index)
+        self._parts.append(part)
+        self._pending_rows += len(part)
+        self._monthly = None
+        if self._pending_rows > self.pending_limit:
+            self._compact()
+
+    def add_monthly(self, part: pd.DataFrame) -> None:
+        """이미 월별로 집계된 부분합 [company, ym, total, youth] 반영."""
+        self._parts.append(part[["company", "ym", "total", "youth"]])
+        self._pending_rows += len(part)
+        self._monthly = None
+
+    def _compact(self) -> None:
+        if len(self._parts) > 1:
+            merged = pd.concat(self._parts, ignore_index=True)
+            self._parts = [merged.groupby(["company", "ym"], sort=False, as_index=False)[["total", "youth"]].sum()]
+        self._pending_rows = len(self._parts[0]) if self._parts else 0
+
+    def monthly(self) -> pd.DataFrame:
+        """(company, ym)별 월 인원 [company, ym, total, youth] (ym = YYYYMM)."""
+        if self._monthly is None:
+            self._compact()
+            self._monthly = (self._parts[0].sort_values(["company", "ym"]).reset_index(drop=True)
+                             if self._parts else pd.DataFrame(columns=["company", "ym", "total", "youth"]))
+        return self._monthly
+
+    def yearly(self) -> pd.DataFrame:
+        """기업·연도별 [company, year, months, avg_total, avg_youth]."""
+        m = self.monthly()
+        if m.empty:
+            return pd.DataFrame(columns=["company", "year", "months", "avg_total", "avg_youth"])
+        g = m.assign(year=m["ym"] // 100).groupby(["company", "year"], sort=True)
+        out = g[["total", "youth"]].sum()
+        out["months"] = g.size()
+        div = 12.0 if self.months == "calendar" else out["months"].to_numpy(dtype=np.float64)
+        out["avg_total"] = _truncate2(out["total"].to_numpy() / div)
+        out["avg_youth"] = _truncate2(out["youth"].to_numpy() / div)
+        return out.reset_index()[["company", "year", "months", "avg_total", "avg_youth"]]
+
+    def heads_frame(self, tax_year: int) -> pd.DataFrame:
+        """
+        batch_engine 입력 형식 [company, prev_total, curr_total, prev_youth, curr_youth] (해당 연도 기록이 있는 기업)
+        직전 연도 기록이 없으면 prev_total/prev_youth = NaN (compute_batch가 오류 행으로 보고)
+        """
+        y = self.yearly()
+        cur = y[y["year"] == int(tax_year)].set_index("company")
+        prev = y[y["year"] == int(tax_year) - 1].set_index("company")
+        out = pd.DataFrame(index=cur.index)
+        out["prev_total"] = prev["avg_total"].reindex(cur.index)
+        out["curr_total"] = cur["avg_total"]
+        out["prev_youth"] = prev["avg_youth"].reindex(cur.index)
+        out["curr_youth"] = cur["avg_youth"]
+        return out.reset_index()
+
+    def heads(self, company: str, tax_year: int) -> HeadcountInputs:
+        """기업 1곳의 HeadcountInputs (정규직 전환/육아휴직 복귀는 0 — 별도 입력)."""
+        f = self.heads_frame(tax_year)
+        row = f[f["company"] == str(company)]
+        if row.empty:
+            raise KeyError(f"{company}: {tax_year}년 급여 기록이 없습니다.")
+        r = row.iloc[0]
+        if pd.isna(r["prev_total"]):
+            raise KeyError(f"{company}: 직전 연도({int(tax_year) - 1}년) 급여 기록이 없습니다.")
+        return HeadcountInputs(
+            prev_total=float(r["prev_total"]),
+            curr_total=float(r["curr_total"]),
+            prev_youth=float(r["prev_youth"]),
+            curr_youth=float(r["curr_youth"]),
+        )
+
+    def heads_inputs(self, tax_year: int) -> Dict[str, HeadcountInputs]:
+        """해당 연도와 직전 연도 기록이 모두 있는 기업의 HeadcountInputs."""
+        f = self.heads_frame(tax_year).dropna(subset=["prev_total"])
+        return {
+            r.company: HeadcountInputs(prev_total=r.prev_total, curr_total=r.curr_total,
+                                       prev_youth=r.prev_youth, curr_youth=r.curr_youth)
+            for r in f.itertuples(index=False)
+        }
+
+
+def read_roster_chunked(source, filename: str = "", chunksize: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """급여대장 CSV/XLSX를 chunksize 행씩 읽기 (필요한 열만, 식별자는 문자열, .xls는 ValueError)."""
+    name = (filename or getattr(source, "name", "") or str(source)).lower()
+    dtype = {"company": str, "employee_id": str, "month": str, "birth_date": str, "hire_date": str}
+    if name.endswith((".xlsx", ".xlsm")):
+        from excel_import import iter_xlsx_chunks
+        yield from iter_xlsx_chunks(source, chunksize=chunksize)
+        return
+    if name.endswith(".xls"):
+        # 구형 .xls는 스트리밍 읽기가 안 되어 시트 전체를 메모리에 올리므로 받지 않음
+        raise ValueError(".xls 파일은 지원하지 않습니다. .xlsx 또는 CSV로 저장해 주세요.")
+    for chunk in pd.read_csv(source, chunksize=chunksize, encoding="utf-8-sig", dtype=dtype,
+                             usecols=lambda c: c in ROSTER_COLUMNS):
+        yield chunk
+
+
+def aggregate_roster(chunks: Iterable[pd.DataFrame], months: str = "calendar", on_chunk=None,
+                     youth_rule: Optional[YouthRule] = None, dedupe: bool = True,
+                     dedupe_window: Optional[int] = DEFAULT_DEDUPE_WINDOW) -> HeadcountAccumulator:
+    acc = HeadcountAccumulator(months=months, youth_rule=youth_rule, dedupe=dedupe, dedupe_window=dedupe_window)
+    for chunk in chunks:
+        acc.add(chunk)
+        if on_chunk is not None:
+            on_chunk(acc.rows_read)
+    return acc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="급여대장 → 기업별 월평균 상시근로자/청년등 수")
+    parser.add_argument("--roster", required=True, help="급여대장 CSV/XLSX (company, employee_id, month[, weight, youth])")
+    parser.add_argument("--tax-year", type=int, required=True, help="당해 과세연도 (직전 연도도 함께 집계)")
+    parser.add_argument("--months", choices=["calendar", "observed"], default="calendar",
+                        help="연평균 분모: 12개월(calendar) 또는 기록이 있는 개월 수(observed)")
+    parser.add_argument("--params-json", default=None,
+                        help="youth 열 대신 생년월일로 청년등을 판정할 때 쓸 시행령 설정 JSON (선택)")
+    parser.add_argument("--out", default=None, help="batch_engine 입력 형식 CSV로 저장 (선택)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="같은 (기업, 직원, 연월) 행을 합치지 않음 (중복 없는 입력에서 메모리 절약)")
+    parser.add_argument("--dedupe-window", type=int, default=DEFAULT_DEDUPE_WINDOW,
+                        help="중복 색인 유지 개월 수 (연월 순 입력 기준, 음수면 제한 없음 — 입력 순서 무관, 메모리 증가)")
+    args = parser.parse_args()
+
+    youth_rule = None
+    if args.params_json:
+        from employment_tax_credit_calc import load_params_from_json
+        youth_rule = YouthRule.from_params(load_params_from_json(args.params_json))
+    acc = aggregate_roster(read_roster_chunked(args.roster, args.roster, args.chunksize), months=args.months,
+                           youth_rule=youth_rule, dedupe=not args.no_dedupe,
+                           dedupe_window=None if args.dedupe_window < 0 else args.dedupe_window)
+    frame = acc.heads_frame(args.tax_year)
+    print("=== 급여대장 집계 결과 ===")
+    print(f"- 읽은 행: {acc.rows_read:,} / 기업 수: {len(frame):,} ({args.tax_year}년 기준)")
+    for r in frame.head(20).itertuples(index=False):
+        print(f"- {r.company}: 상시 {r.prev_total:g} -> {r.curr_total:g}, 청년등 {r.prev_youth:g} -> {r.curr_youth:g}")
+    if args.out:
+        frame.to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"- 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
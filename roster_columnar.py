@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+급여대장 열 기반 이진 형식 (np.memmap) — 같은 급여대장으로 여러 번 분석할 때 CSV/XLSX 재해석 생략
+
+디렉터리 구성 (열마다 고정 폭 배열 파일 1개, 행 순서 동일)
+    meta.json         행 수, 열 목록/타입, 기업 사전(id → 이름), 원본 파일 서명
+    company.u4        기업 id (uint32, meta.json의 companies 순번)
+    employee.u8       직원 키 (uint64, roster.employee_keys — (기업, employee_id) 해시, employee_id가 없으면 0)
+    month.i4          연월 (int32, 1970-01부터의 월 번호 = datetime64[M] 정수값)
+    weight.f4         상시근로자 환산 인원 (float32, 집계 시 소수 넷째 자리로 반올림)
+    youth.u1          청년등 여부 (uint8, 원본에 youth 열이 없으면 255 = 미정)
+    birth.i4          생년월일 (int32, 1970-01-01부터의 일수, 없으면 int32 최솟값)
+    hire.i4           입사일 (birth와 같은 형식)
+    military.u2       병역 이행 개월 수 (uint16)
+
+- 변환은 한 번만 (read_roster_chunked로 청크씩 읽어 파일에 이어 씀)
+- 열기는 np.memmap(mode="r") → 집계는 배열 그대로 np.bincount (복사/재해석 없음)
+- 생년월일을 같이 저장하므로 (youth 열이 없는 급여대장은) 청년 연령 기준(YouthRule)을 바꿔 가며 다시 집계 가능
+- 같은 (기업, 직원, 연월) 행은 집계 때 roster.aggregate_roster와 같은 규칙(최대 weight, 연월별 색인)으로 한 번만 셈
+
+CLI 예시)
+    python roster_columnar.py convert --roster payroll.csv --out roster_bin/
+    python roster_columnar.py summary --data roster_bin/ --tax-year 2024 --params-json params.json
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from roster import (
+    DEFAULT_CHUNK_ROWS, DEFAULT_DEDUPE_WINDOW, EmployeeMonthIndex, HeadcountAccumulator, YouthRule, _bool_column,
+    classify_youth, dedupe_increments, employee_keys, parse_year_month, read_roster_chunked, to_datetime64,
+)
+
+
+FORMAT_VERSION = 2  # 2: employee 열 추가 (이전 버전 디렉터리는 convert_roster_file이 다시 변환)
+META_FILE = "meta.json"
+COLUMNS: Dict[str, str] = {
+    "company": "u4",
+    "employee": "u8",
+    "month": "i4",
+    "weight": "f4",
+    "youth": "u1",
+    "birth": "i4",
+    "hire": "i4",
+    "military": "u2",
+}
+YOUTH_UNKNOWN = 255
+DATE_MISSING = np.iinfo(np.int32).min
+BLOCK_ROWS = 4_000_000  # 생년월일로 청년등을 다시 판정할 때 한 번에 처리할 행 수
+
+
+def source_signature(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _days32(values) -> np.ndarray:
+    d = to_datetime64(values)
+    out = d.view(np.int64).copy()
+    out[np.isnat(d)] = DATE_MISSING
+    return out.astype(np.int32)
+
+
+def _encode_chunk(chunk: pd.DataFrame, companies: Dict[str, int]) -> Dict[str, np.ndarray]:
+    ym = parse_year_month(chunk["month"])
+    keep = ym > 0
+    chunk = chunk[keep]
+    ym = ym[keep]
+    names = chunk["company"].astype(str).to_numpy()
+    codes, uniques = pd.factorize(names)
+    lookup = np.array([companies.setdefault(u, len(companies)) for u in uniques], dtype=np.uint32)
+    n = len(chunk)
+    weight = (pd.to_numeric(chunk["weight"], errors="coerce").fillna(0).to_numpy(dtype=np.float32)
+              if "weight" in chunk.columns else np.ones(n, dtype=np.float32))
+    youth = ((_bool_column(chunk, "youth") > 0).astype(np.uint8) if "youth" in chunk.columns
+             else np.full(n, YOUTH_UNKNOWN, dtype=np.uint8))
+    missing = np.full(n, DATE_MISSING, dtype=np.int32)
+    military = (pd.to_numeric(chunk["military_months"], errors="coerce").fillna(0).clip(0, 65535).to_numpy(dtype=np.uint16)
+                if "military_months" in chunk.columns else np.zeros(n, dtype=np.uint16))
+    employee = (employee_keys(names, chunk["employee_id"]) if "employee_id" in chunk.columns
+                else np.zeros(n, dtype=np.uint64))
+    return {
+        "company": lookup[codes] if n else np.zeros(0, dtype=np.uint32),
+        "employee": employee,
+        "month": ((ym // 100 - 1970) * 12 + ym % 100 - 1).astype(np.int32),
+        "weight": weight,
+        "youth": youth,
+        "birth": _days32(chunk["birth_date"]) if "birth_date" in chunk.columns else missing,
+        "hire": _days32(chunk["hire_date"]) if "hire_date" in chunk.columns else missing,
+        "military": military,
+    }
+
+
+def convert_roster(
+    chunks: Iterable[pd.DataFrame],
+    out_dir: str,
+    source: Optional[str] = None,
+    on_chunk=None,
+) -> "ColumnarRoster":
+    """급여대장 청크 → 열 기반 이진 디렉터리 (meta.json은 마지막에 기록 → 중간에 실패하면 열리지 않음)."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    meta_path = out / META_FILE
+    if meta_path.exists():
+        meta_path.unlink()
+    companies: Dict[str, int] = {}
+    files = {name: open(out / f"{name}.{dt}", "wb") for name, dt in COLUMNS.items()}
+    rows = 0
+    has_youth = has_birth = False
+    try:
+        for chunk in chunks:
+            has_youth |= "youth" in chunk.columns
+            has_birth |= "birth_date" in chunk.columns
+            enc = _encode_chunk(chunk, companies)
+            for name, arr in enc.items():
+                np.asarray(arr, dtype=COLUMNS[name]).tofile(files[name])
+            rows += len(enc["month"])
+            if on_chunk is not None:
+                on_chunk(rows)
+    finally:
+        for f in files.values():
+            f.close()
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "rows": rows,
+        "columns": COLUMNS,
+        "companies": list(companies),  # dict 삽입 순서 = id 순서
+        "has_youth": has_youth,
+        "has_birth": has_birth,
+        "source": source,
+        "source_signature": source_signature(source) if source and os.path.exists(source) else None,
+    }
+    meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    return ColumnarRoster(out_dir)
+
+
+def convert_roster_file(path: str, out_dir: str, chunksize: int = DEFAULT_CHUNK_ROWS, force: bool = False) -> "ColumnarRoster":
+    """CSV/XLSX 급여대장 → 열 기반 디렉터리 (원본 크기/수정시각이 같으면 기존 변환 재사용)."""
+    if not force:
+        try:
+            existing = ColumnarRoster(out_dir)
+            if existing.meta.get("source_signature") == source_signature(path):
+                return existing
+        except (FileNotFoundError, ValueError):
+            pass
+    return convert_roster(read_roster_chunked(path, path, chunksize), out_dir, source=path)
+
+
+class ColumnarRoster:
+    """열 기반 급여대장 (열마다 np.memmap, 읽기 전용)."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        meta_path = self.path / META_FILE
+        if not meta_path.exists():
+            raise FileNotFoundError(f"{meta_path}: 변환이 끝난 급여대장 디렉터리가 아닙니다.")
+        self.meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 형식 버전: {self.meta.get('format_version')}")
+        self.rows = int(self.meta["rows"])
+        self.companies: List[str] = self.meta["companies"]
+        self._cols: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> np.ndarray:
+        arr = self._cols.get(name)
+        if arr is None:
+            dt = np.dtype(COLUMNS[name])
+            if self.rows == 0:
+                arr = np.zeros(0, dtype=dt)
+            else:
+                arr = np.memmap(self.path / f"{name}.{COLUMNS[name]}", dtype=dt, mode="r", shape=(self.rows,))
+            self._cols[name] = arr
+        return arr
+
+    def company_id(self, name: str) -> int:
+        return self.companies.index(str(name))
+
+    def youth_flags(self, youth_rule: Optional[YouthRule] = None, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        행별 청년등 여부 (bool) — roster.monthly_counts와 같은 규칙:
+        원본에 youth 열이 없고 생년월일이 있으면 youth_rule로 판정, 아니면 저장된 youth 값
+        """
+        stop = self.rows if stop is None else stop
+        if youth_rule is not None and self.meta.get("has_birth") and not self.meta.get("has_youth"):
+            birth = self.column("birth")[start:stop].astype(np.int64)
+            hire = self.column("hire")[start:stop].astype(np.int64)
+            birth[birth == DATE_MISSING] = np.iinfo(np.int64).min
+            hire[hire == DATE_MISSING] = np.iinfo(np.int64).min
+            months = self.column("month")[start:stop].astype(np.int64)
+            ref = ((months + 1).view("datetime64[M]").astype("datetime64[D]") - np.timedelta64(1, "D"))
+            return classify_youth(birth.view("datetime64[D]"), ref, youth_rule,
+                                  military_months=self.column("military")[start:stop],
+                                  hire=hire.view("datetime64[D]"))
+        return self.column("youth")[start:stop] == 1
+
+    def monthly_counts(self, youth_rule: Optional[YouthRule] = None, dedupe: bool = True,
+                       dedupe_window: Optional[int] = DEFAULT_DEDUPE_WINDOW) -> pd.DataFrame:
+        """
+        (company, ym)별 월 인원 [company, ym, total, youth] — 기업 id × 월 번호 키로 np.bincount
+        dedupe: 같은 (기업, 직원, 연월)을 한 번만 셈 (roster.HeadcountAccumulator와 같은 색인/기간 제한)
+        """
+        if self.rows == 0:
+            return pd.DataFrame(columns=["company", "ym", "total", "youth"])
+        company = self.column("company")
+        employee = self.column("employee")
+        month = self.column("month")
+        weight = self.column("weight")
+        m0, m1 = int(month.min()), int(month.max())
+        span = m1 - m0 + 1
+        size = len(self.companies) * span
+        total = np.zeros(size, dtype=np.float64)
+        youth = np.zeros(size, dtype=np.float64)
+        index = EmployeeMonthIndex(dedupe_window) if dedupe else None
+        for start in range(0, self.rows, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, self.rows)
+            months = month[start:stop].astype(np.int64)
+            key = company[start:stop].astype(np.int64) * span + (months - m0)
+            w = np.round(weight[start:stop].astype(np.float64), 4)  # float32 표현 오차 제거 (환산 인원은 0.25 단위 등)
+            w = np.where(w > 0, w, 0.0)  # roster.monthly_counts와 같이 weight 0 이하 행은 제외
+            yw = w * self.youth_flags(youth_rule, start, stop)
+            if index is not None:
+                dup = (employee[start:stop] != 0) & (w > 0)
+                if dup.any():
+                    ym = (months[dup] // 12 + 1970) * 100 + months[dup] % 12 + 1
+                    first, d_total, d_youth = dedupe_increments(employee[start:stop][dup], ym, w[dup], yw[dup], index)
+                    total += np.bincount(key[dup][first], weights=d_total, minlength=size)
+                    youth += np.bincount(key[dup][first], weights=d_youth, minlength=size)
+                    w = np.where(dup, 0.0, w)
+                    yw = np.where(dup, 0.0, yw)
+            total += np.bincount(key, weights=w, minlength=size)
+            youth += np.bincount(key, weights=yw, minlength=size)
+        hit = np.flatnonzero(total > 0)
+        cid, mi = np.divmod(hit, span)
+        months = mi + m0
+        return pd.DataFrame({
+            "company": np.asarray(self.companies, dtype=object)[cid],
+            "ym": (months // 12 + 1970) * 100 + months % 12 + 1,
+            "total": total[hit],
+            "youth": youth[hit],
+        })
+
+    def accumulator(self, months: str = "calendar", youth_rule: Optional[YouthRule] = None, dedupe: bool = True,
+                    dedupe_window: Optional[int] = DEFAULT_DEDUPE_WINDOW) -> HeadcountAccumulator:
+        """roster.HeadcountAccumulator로 변환 (yearly / heads_frame / heads 그대로 사용)."""
+        acc = HeadcountAccumulator(months=months, youth_rule=youth_rule, dedupe=False)
+        acc.add_monthly(self.monthly_counts(youth_rule, dedupe, dedupe_window))
+        acc.rows_read = self.rows
+        return acc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="급여대장 열 기반 이진 형식 (변환/집계)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_c = sub.add_parser("convert", help="CSV/XLSX 급여대장 → 열 기반 디렉터리")
+    p_c.add_argument("--roster", required=True)
+    p_c.add_argument("--out", required=True)
+    p_c.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_ROWS)
+    p_c.add_argument("--force", action="store_true", help="원본이 같아도 다시 변환")
+
+    p_s = sub.add_parser("summary", help="열 기반 디렉터리 → 기업별 월평균 인원")
+    p_s.add_argument("--data", required=True)
+    p_s.add_argument("--tax-year", type=int, required=True)
+    p_s.add_argument("--params-json", default=None, help="주면 그 시행령의 청년 연령 기준으로 다시 판정")
+    p_s.add_argument("--months", choices=["calendar", "observed"], default="calendar")
+    p_s.add_argument("--out", default=None, help="batch_engine 입력 형식 CSV로 저장 (선택)")
+    p_s.add_argument("--no-dedupe", action="store_true", help="같은 (기업, 직원, 연월) 행을 합치지 않음")
+    p_s.add_argument("--dedupe-window", type=int, default=DEFAULT_DEDUPE_WINDOW,
+                     help="중복 색인 유지 개월 수 (연월 순 입력 기준, 음수면 제한 없음)")
+
+    args = parser.parse_args()
+    if args.command == "convert":
+        table = convert_roster_file(args.roster, args.out, args.chunksize, force=args.force)
+        print(f"=== 변환 완료: {len(table):,}행 / 기업 {len(table.companies):,}곳 → {args.out} ===")
+        return
+
+    table = ColumnarRoster(args.data)
+    youth_rule = None
+    if args.params_json:
+        from employment_tax_credit_calc import load_params_from_json
+        youth_rule = YouthRule.from_params(load_params_from_json(args.params_json))
+    frame = table.accumulator(args.months, youth_rule, dedupe=not args.no_dedupe,
+                              dedupe_window=None if args.dedupe_window < 0 else args.dedupe_window).heads_frame(args.tax_year)
+    print(f"=== {args.tax_year}년: {len(frame):,}곳 ({len(table):,}행) ===")
+    print(frame.head(20).to_string(index=False))
+    if args.out:
+        frame.to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"- 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+월별 인원 누적 저장소 (SQLite, WAL 모드) — 급여대장 월 단위 증분 반영
+
+- (기업, 연월)별 월 인원(상시/청년등)을 디스크에 보관 → 매달 전체 급여대장을 다시 읽지 않음
+- 새 달의 급여대장(델타)은 델타에 나오는 (기업, 연월)만 교체:
+    · 해당 칸의 기존 값을 새 부분합으로 바꿈 (같은 달을 다시 넣어도 결과 동일, 다른 기업의 같은 달은 그대로)
+    · 영향받는 기업 = 델타에 나오는 기업
+- 영향받는 기업·연도의 월평균(yearly_heads)만 다시 계산
+- 공제액(credits)도 영향받는 기업 × 과세연도(해당 연도, 다음 연도의 직전 연도분)만 다시 계산
+  (기업규모/지역/업종/세전세액은 companies 표에 한 번 등록)
+
+CLI 예시)
+    python roster_store.py --db heads.db companies --companies companies.csv
+    python roster_store.py --db heads.db apply --roster payroll_2024_07.csv --params-json params.json
+    python roster_store.py --db heads.db show --tax-year 2024
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+import argparse
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from employment_tax_credit_calc import HeadcountInputs, PolicyParameters
+from roster import HeadcountAccumulator, YouthRule, _truncate2
+
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS monthly_heads (
+    company TEXT NOT NULL,
+    ym      INTEGER NOT NULL,
+    total   REAL NOT NULL,
+    youth   REAL NOT NULL,
+    PRIMARY KEY (company, ym)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_monthly_ym ON monthly_heads(ym);
+CREATE TABLE IF NOT EXISTS yearly_heads (
+    company   TEXT NOT NULL,
+    year      INTEGER NOT NULL,
+    months    INTEGER NOT NULL,
+    avg_total REAL NOT NULL,
+    avg_youth REAL NOT NULL,
+    PRIMARY KEY (company, year)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS companies (
+    company           TEXT PRIMARY KEY,
+    company_size      TEXT,
+    region            TEXT,
+    industry_code     TEXT,
+    tax_before_credit INTEGER
+);
+CREATE TABLE IF NOT EXISTS credits (
+    company     TEXT NOT NULL,
+    tax_year    INTEGER NOT NULL,
+    prev_total  REAL,
+    curr_total  REAL NOT NULL,
+    prev_youth  REAL,
+    curr_youth  REAL NOT NULL,
+    gross       INTEGER NOT NULL,
+    applied     INTEGER NOT NULL,
+    error       TEXT,
+    params_hash TEXT,
+    updated_at  TEXT NOT NULL,
+    PRIMARY KEY (company, tax_year)
+) WITHOUT ROWID;
+"""
+
+COMPANY_COLUMNS = ("company", "company_size", "region", "industry_code", "tax_before_credit")
+
+
+@dataclass
+class DeltaResult:
+    """델타 1건 반영 결과."""
+    months: List[int]
+    companies: List[str]
+    years: List[int]
+    rows: int = 0
+    credits: Optional[pd.DataFrame] = None
+
+
+class HeadcountStore:
+    """
+    SQLite 월별 인원 저장소 (연결 1개를 스레드 간 공유, 쓰기는 Lock으로 직렬화)
+    - months: 연평균 분모 "calendar"(12개월) 또는 "observed"(기록이 있는 개월 수) — roster.HeadcountAccumulator와 같음
+    """
+
+    def __init__(self, path: str, months: str = "calendar"):
+        if months not in ("calendar", "observed"):
+            raise ValueError("months는 'calendar' 또는 'observed'")
+        self.path = str(path)
+        self.months = months
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._lock = Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version = int(self._conn.execute("PRAGMA user_version").fetchone()[0])
+            if 0 < version < 2:
+                # v1 credits는 직전 연도가 없으면 0으로 채워 계산한 값 → 버리고 다음 갱신 때 다시 계산
+                self._conn.execute("DROP TABLE IF EXISTS credits")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- 쓰기 ----
+    def set_companies(self, df: pd.DataFrame) -> int:
+        """기업 속성 등록/갱신 (company, company_size, region[, industry_code, tax_before_credit])."""
+        cols = [c for c in COMPANY_COLUMNS if c in df.columns]
+        rows = [tuple(_cell(v) for v in r) for r in df[cols].itertuples(index=False, name=None)]
+        updates = ", ".join(f"{c}=excluded.{c}" for c in cols if c != "company")
+        sql = (f"INSERT INTO companies ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+               f"ON CONFLICT(company) DO UPDATE SET {updates}")
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def apply_monthly(self, part: pd.DataFrame) -> DeltaResult:
+        """
+        월별 부분합 [company, ym, total, youth] 반영 (part에 나오는 (기업, 연월)만 교체, 다른 기업의 같은 달은 유지).
+        같은 (기업, 연월)이 여러 행이면 합산. 델타에 나온 기업·연도의 월평균까지 다시 계산.
+        """
+        part = part.groupby(["company", "ym"], sort=False, as_index=False)[["total", "youth"]].sum()
+        months = sorted(int(m) for m in part["ym"].unique())
+        years = sorted({m // 100 for m in months})
+        if not months:
+            return DeltaResult(months=[], companies=[], years=[])
+        rows = [(str(c), int(m), float(t), float(y))
+                for c, m, t, y in part[["company", "ym", "total", "youth"]].itertuples(index=False, name=None)]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # 기본키 (company, ym) → 델타에 있는 칸만 교체
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO monthly_heads (company, ym, total, youth) VALUES (?, ?, ?, ?)", rows)
+                companies = sorted(set(part["company"].astype(str)))
+                self._refresh_yearly(companies, years)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return DeltaResult(months=months, companies=companies, years=years, rows=len(rows))
+
+    def apply_roster(self, chunks: Iterable[pd.DataFrame], youth_rule: Optional[YouthRule] = None) -> DeltaResult:
+        """급여대장(델타) 청크들 → 월별로 모아서 한 번에 반영 (달이 청크 경계에 걸려도 안전)."""
+        acc = HeadcountAccumulator(months=self.months, youth_rule=youth_rule)
+        for chunk in chunks:
+            acc.add(chunk)
+        res = self.apply_monthly(acc.monthly())
+        res.rows = acc.rows_read
+        return res
+
+    def _with_companies(self, companies: Sequence[str]) -> None:
+        """영향받는 기업 목록을 임시 표(_affected)에 올림 (IN 절 변수 개수 제한 회피)."""
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS _affected (company TEXT PRIMARY KEY)")
+        self._conn.execute("DELETE FROM _affected")
+        self._conn.executemany("INSERT OR IGNORE INTO _affected VALUES (?)", [(c,) for c in companies])
+
+    def _refresh_yearly(self, companies: Sequence[str], years: Sequence[int]) -> None:
+        self._with_companies(companies)
+        for year in years:
+            agg = pd.DataFrame(self._conn.execute(
+                "SELECT m.company, COUNT(*), SUM(m.total), SUM(m.youth) FROM monthly_heads m "
+                "JOIN _affected a ON a.company = m.company WHERE m.ym BETWEEN ? AND ? GROUP BY m.company",
+                (year * 100 + 1, year * 100 + 12)).fetchall(), columns=["company", "months", "total", "youth"])
+            self._conn.execute(
+                "DELETE FROM yearly_heads WHERE year = ? AND company IN (SELECT company FROM _affected)", (year,))
+            if agg.empty:
+                continue
+            div = 12.0 if self.months == "calendar" else agg["months"].to_numpy(dtype=np.float64)
+            avg_total = _truncate2(agg["total"].to_numpy(dtype=np.float64) / div)
+            avg_youth = _truncate2(agg["youth"].to_numpy(dtype=np.float64) / div)
+            self._conn.executemany(
+                "INSERT INTO yearly_heads (company, year, months, avg_total, avg_youth) VALUES (?, ?, ?, ?, ?)",
+                [(c, year, int(n), float(t), float(y))
+                 for c, n, t, y in zip(agg["company"], agg["months"], avg_total, avg_youth)])
+
+    def refresh_credits(
+        self,
+        params: PolicyParameters,
+        tax_year: int,
+        companies: Optional[Sequence[str]] = None,
+        method: str = "proportional",
+    ) -> pd.DataFrame:
+        """해당 과세연도 공제액을 (companies만 / None이면 전체) 다시 계산해 credits에 저장하고 결과 반환."""
+        from batch_engine import compute_batch
+        from scenario_store import params_fingerprint
+
+        frame = self.heads_frame(tax_year, companies)
+        if frame.empty:
+            return frame
+        attrs = self.companies(frame["company"].tolist())
+        frame = frame.merge(attrs, on="company", how="left")
+        res = compute_batch(frame, params, method)
+        h = params_fingerprint(params)
+        now = datetime.now().isoformat(timespec="seconds")
+        rows = [(c, int(tax_year), _cell(float(pt)), float(ct), _cell(float(py)), float(cy), int(g), int(a), e or None, h, now)
+                for c, pt, ct, py, cy, g, a, e in res[["company", "prev_total", "curr_total", "prev_youth", "curr_youth",
+                                                        "gross", "applied", "error"]].itertuples(index=False, name=None)]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO credits (company, tax_year, prev_total, curr_total, prev_youth, curr_youth, "
+                "gross, applied, error, params_hash, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return res
+
+    def update(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        params: Optional[PolicyParameters] = None,
+        youth_rule: Optional[YouthRule] = None,
+        method: str = "proportional",
+    ) -> DeltaResult:
+        """델타 반영 + (params가 있으면) 영향받는 기업의 공제액만 다시 계산 (해당 연도 + 다음 연도)."""
+        res = self.apply_roster(chunks, youth_rule)
+        if params is not None and res.companies:
+            parts = []
+            for tax_year in sorted(set(res.years) | {y + 1 for y in res.years}):
+                parts.append(self.refresh_credits(params, tax_year, res.companies, method))
+            parts = [p for p in parts if not p.empty]
+            res.credits = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        return res
+
+    # ---- 조회 ----
+    def heads_frame(self, tax_year: int, companies: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        [company, prev_total, curr_total, prev_youth, curr_youth] (해당 연도 기록이 있는 기업)
+        직전 연도 기록이 없으면 prev_total/prev_youth = NaN (compute_batch가 오류 행으로 보고)
+        """
+        sql = ("SELECT c.company, p.avg_total, c.avg_total, p.avg_youth, c.avg_youth "
+               "FROM yearly_heads c LEFT JOIN yearly_heads p ON p.company = c.company AND p.year = c.year - 1 "
+               "WHERE c.year = ?")
+        with self._lock:
+            if companies is not None:
+                self._with_companies(companies)
+                sql += " AND c.company IN (SELECT company FROM _affected)"
+            rows = self._conn.execute(sql + " ORDER BY c.company", (int(tax_year),)).fetchall()
+        out = pd.DataFrame(rows, columns=["company", "prev_total", "curr_total", "prev_youth", "curr_youth"])
+        for c in ("prev_total", "curr_total", "prev_youth", "curr_youth"):
+            out[c] = pd.to_numeric(out[c], errors="coerce").astype(np.float64)
+        return out
+
+    def heads(self, company: str, tax_year: int) -> HeadcountInputs:
+        f = self.heads_frame(tax_year, [str(company)])
+        if f.empty:
+            raise KeyError(f"{company}: {tax_year}년 급여 기록이 없습니다.")
+        r = f.iloc[0]
+        if pd.isna(r["prev_total"]):
+            raise KeyError(f"{company}: 직전 연도({int(tax_year) - 1}년) 급여 기록이 없습니다.")
+        return HeadcountInputs(prev_total=float(r["prev_total"]), curr_total=float(r["curr_total"]),
+                               prev_youth=float(r["prev_youth"]), curr_youth=float(r["curr_youth"]))
+
+    def companies(self, names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        sql = f"SELECT {', '.join(COMPANY_COLUMNS)} FROM companies"
+        with self._lock:
+            if names is not None:
+                self._with_companies(names)
+                sql += " WHERE company IN (SELECT company FROM _affected)"
+            rows = self._conn.execute(sql).fetchall()
+        return pd.DataFrame(rows, columns=list(COMPANY_COLUMNS))
+
+    def credits(self, tax_year: int) -> pd.DataFrame:
+        with self._lock:
+            cur = self._conn.execute("SELECT * FROM credits WHERE tax_year = ? ORDER BY company", (int(tax_year),))
+            cols = [d[0] for d in cur.description]
+            return pd.DataFrame(cur.fetchall(), columns=cols)
+
+    def monthly(self, company: str) -> pd.DataFrame:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ym, total, youth FROM monthly_heads WHERE company = ? ORDER BY ym", (str(company),)).fetchall()
+        return pd.DataFrame(rows, columns=["ym", "total", "youth"])
+
+
+def _cell(v):
+    if v is None or (isinstance(v, float) and v != v):
+        return None
+    return v.item() if hasattr(v, "item") else v
+
+
+_stores: Dict[str, HeadcountStore] = {}
+_stores_lock = Lock()
+
+
+def get_headcount_store(path: str) -> HeadcountStore:
+    """프로세스 전체에서 경로별로 공유하는 저장소."""
+    with _stores_lock:
+        store = _stores.get(str(path))
+        if store is None:
+            store = _stores[str(path)] = HeadcountStore(path)
+        return store
+
+
+def main():
+    from roster import DEFAULT_CHUNK_ROWS, read_roster_chunked
+
+    parser = argparse.ArgumentParser(description="급여대장 월별 인원 저장소 (증분 반영)")
+    parser.add_argument("--db", required=True, help="SQLite 파일 경로")
+    parser.add_argument("--months", choices=["calendar", "observed"], default="calendar")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_c = sub.add_parser("companies", help="기업 속성 등록 (company, company_size, region[, industry_code, tax_before_credit])")
+    p_c.add_argument("--companies", required=True)
+
+    p_a = sub.add_parser("apply", help="급여대장(전체 또는 새 달) 반영")
+    p_a.add_argument("--roster", required=True)
+    p_a.add_argument("--params-json", default=None, help="주면 영향받는 기업의 공제액까지 다시 계산")
+    p_a.add_argument("--clawback-method", choices=["proportional", "all_or_nothing", "tiered"], default="proportional")
+    p_a.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_ROWS)
+
+    p_s = sub.add_parser("show", help="과세연도별 인원/공제액 조회")
+    p_s.add_argument("--tax-year", type=int, required=True)
+    p_s.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+    store = HeadcountStore(args.db, months=args.months)
+
+    if args.command == "companies":
+        df = pd.read_csv(args.companies, encoding="utf-8-sig", dtype={"company": str, "industry_code": str})
+        print(f"=== 기업 속성 등록: {store.set_companies(df):,}건 ===")
+        return
+
+    if args.command == "apply":
+        params = None
+        youth_rule = None
+        if args.params_json:
+            from employment_tax_credit_calc import load_params_from_json
+            params = load_params_from_json(args.params_json)
+            youth_rule = YouthRule.from_params(params)
+        res = store.update(read_roster_chunked(args.roster, args.roster, args.chunksize), params,
+                           youth_rule=youth_rule, method=args.clawback_method)
+        print("=== 급여대장 반영 ===")
+        print(f"- 읽은 행: {res.rows:,} / 연월: {', '.join(map(str, res.months))}")
+        print(f"- 영향받은 기업: {len(res.companies):,}곳 / 연도: {', '.join(map(str, res.years))}")
+        if res.credits is not None:
+            print(f"- 공제액 재계산: {len(res.credits):,}건")
+        return
+
+    credits = store.credits(args.tax_year)
+    frame = credits if not credits.empty else store.heads_frame(args.tax_year)
+    print(f"=== {args.tax_year}년: {len(frame):,}곳 ===")
+    print(frame.head(args.limit).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+"""
+계산 시나리오/이력 저장소 (SQLite, WAL 모드)
+
+- 시나리오 1건 = 입력값 + 파라미터 버전(해시) + 결과(공제액/적용액/유지기간/추징 합계) + 연차별 추징 일정
+- 파라미터는 내용 해시(params_hash)로 한 번만 저장하고 시나리오는 해시로 참조
+- 대량 입력은 한 트랜잭션 + executemany로 기록 (batch_engine 결과 DataFrame 그대로 가능)
+- 시나리오마다 테넌트(tenant)를 기록하고, 조회는 항상 테넌트 단위 (다른 기관의 이력은 보이지 않음)
+- 테넌트+기업 / 과세연도 / 파라미터 버전 / 추징 비율(total_clawback ÷ applied)에 인덱스
+  예) "추징액이 적용 공제액의 50%를 넘는 시나리오" → clawback_ratio > 0.5 (인덱스 범위 검색)
+- WAL 모드라 Streamlit 여러 세션/CLI가 동시에 읽어도 쓰기를 막지 않음
+
+CLI 예시)
+    python scenario_store.py --db scenarios.db --tenant default import --params-json params.json --companies companies.csv --tax-year 2024
+    python scenario_store.py --db scenarios.db --tenant default query --min-clawback-ratio 0.5
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+import argparse
+import hashlib
+import json
+import sqlite3
+
+from employment_tax_credit_calc import PolicyParameters, params_to_dict
+
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (
+    params_hash TEXT PRIMARY KEY,
+    params_json TEXT NOT NULL,
+    created_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    id              INTEGER PRIMARY KEY,
+    created_at      TEXT NOT NULL,
+    tenant          TEXT NOT NULL DEFAULT '',
+    label           TEXT,
+    company         TEXT,
+    tax_year        INTEGER,
+    params_hash     TEXT REFERENCES params(params_hash),
+    company_size    TEXT,
+    region          TEXT,
+    clawback_method TEXT,
+    inputs_json     TEXT NOT NULL,
+    gross           INTEGER NOT NULL,
+    applied         INTEGER NOT NULL,
+    retention_years INTEGER NOT NULL,
+    total_clawback  INTEGER NOT NULL,
+    clawback_ratio  REAL
+);
+CREATE TABLE IF NOT EXISTS clawback_schedule (
+    scenario_id    INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    year_index     INTEGER NOT NULL,
+    followup_total INTEGER,
+    followup_youth INTEGER,
+    clawback       INTEGER NOT NULL,
+    PRIMARY KEY (scenario_id, year_index)
+) WITHOUT ROWID;
+"""
+
+# 테넌트 열을 쓰는 인덱스 (v1 DB는 열을 추가한 뒤 생성)
+_INDEXES = """
+DROP INDEX IF EXISTS ix_scenarios_company;
+DROP INDEX IF EXISTS ix_scenarios_tax_year;
+CREATE INDEX IF NOT EXISTS ix_scenarios_tenant ON scenarios(tenant, company, tax_year);
+CREATE INDEX IF NOT EXISTS ix_scenarios_tenant_year ON scenarios(tenant, tax_year);
+CREATE INDEX IF NOT EXISTS ix_scenarios_params ON scenarios(params_hash, tax_year);
+CREATE INDEX IF NOT EXISTS ix_scenarios_ratio ON scenarios(clawback_ratio);
+"""
+
+_SCENARIO_COLUMNS = (
+    "created_at", "tenant", "label", "company", "tax_year", "params_hash", "company_size", "region",
+    "clawback_method", "inputs_json", "gross", "applied", "retention_years", "total_clawback", "clawback_ratio",
+)
+
+
+def params_fingerprint(params: PolicyParameters) -> str:
+    """파라미터 내용 해시 (키 정렬 JSON의 SHA-256 앞 16자리) = 파라미터 버전."""
+    raw = json.dumps(params_to_dict(params), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class ScenarioRecord:
+    """
+    저장 단위 (시나리오 1건)
+    - inputs: 계산 입력값 (앱의 current_inputs 또는 배치 입력 행)
+    - schedule: [{"연차", "사후연도 상시", "사후연도 청년등", "추징세액"}, ...] (CalcGraph.schedule_records 형식)
+    - tenant: 기록한 테넌트 (조회는 테넌트별로만 가능)
+    """
+    gross: int
+    applied: int
+    retention_years: int
+    total_clawback: int = 0
+    company: Optional[str] = None
+    tax_year: Optional[int] = None
+    params_hash: Optional[str] = None
+    company_size: Optional[str] = None
+    region: Optional[str] = None
+    clawback_method: Optional[str] = None
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    schedule: List[Dict[str, Any]] = field(default_factory=list)
+    label: Optional[str] = None
+    tenant: str = ""
+
+    @classmethod
+    def from_last_calc(cls, last_calc: Dict[str, Any], inputs: Optional[Dict[str, Any]] = None, **kw) -> "ScenarioRecord":
+        """앱의 last_calc(요약 + schedule_records) → ScenarioRecord."""
+        return cls(
+            gross=int(last_calc.get("gross", 0)),
+            applied=int(last_calc.get("applied", 0)),
+            retention_years=int(last_calc.get("retention_years", 0)),
+            total_clawback=int(last_calc.get("total_clawback", 0)),
+            company_size=last_calc.get("company_size"),
+            region=last_calc.get("region"),
+            clawback_method=last_calc.get("clawback_method"),
+            inputs=dict(inputs or {}),
+            schedule=list(last_calc.get("schedule_records") or []),
+            **kw,
+        )
+
+
+class ScenarioStore:
+    """SQLite 시나리오 저장소 (연결 1개를 스레드 간 공유, 쓰기는 Lock으로 직렬화)."""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+            cols = {r[1] for r in self._conn.execute("PRAGMA table_info(scenarios)")}
+            if "tenant" not in cols:
+                # v1: 테넌트 없이 기록된 이력은 "" (어느 테넌트 조회에도 나오지 않음)
+                self._conn.execute("ALTER TABLE scenarios ADD COLUMN tenant TEXT NOT NULL DEFAULT ''")
+            self._conn.executescript(_INDEXES)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- 쓰기 ----
+    def save_params(self, params: PolicyParameters) -> str:
+        """파라미터를 (없을 때만) 저장하고 params_hash 반환."""
+        h = params_fingerprint(params)
+        raw = json.dumps(params_to_dict(params), ensure_ascii=False, sort_keys=True)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO params(params_hash, params_json, created_at) VALUES (?, ?, ?)",
+                (h, raw, _now()),
+            )
+        return h
+
+    def add_scenario(self, record: ScenarioRecord) -> int:
+        return self.add_scenarios([record])[0]
+
+    def add_scenarios(self, records: Iterable[ScenarioRecord]) -> List[int]:
+        """여러 건을 한 트랜잭션으로 기록. 반환: 새 시나리오 id 목록."""
+        records = list(records)
+        if not records:
+            return []
+        now = _now()
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                row = cur.execute("SELECT COALESCE(MAX(id), 0) FROM scenarios").fetchone()
+                first_id = int(row[0]) + 1
+                ids = list(range(first_id, first_id + len(records)))
+                cur.executemany(
+                    f"INSERT INTO scenarios(id, {', '.join(_SCENARIO_COLUMNS)}) "
+                    f"VALUES (?, {', '.join('?' * len(_SCENARIO_COLUMNS))})",
+                    (_scenario_row(i, r, now) for i, r in zip(ids, records)),
+                )
+                cur.executemany(
+                    "INSERT INTO clawback_schedule(scenario_id, year_index, followup_total, followup_youth, clawback) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (i, int(s["연차"]), _opt_int(s.get("사후연도 상시")), _opt_int(s.get("사후연도 청년등")),
+                         int(s.get("추징세액", 0)))
+                        for i, r in zip(ids, records) for s in r.schedule
+                    ),
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return ids
+
+    def add_batch(self, res, params_hash: Optional[str] = None, tax_year: Optional[int] = None,
+                  method: Optional[str] = None, label: Optional[str] = None, tenant: str = "") -> List[int]:
+        """batch_engine.compute_batch 결과 DataFrame을 그대로 기록 (행마다 tax_year 열이 있으면 우선)."""
+        from batch_engine import CLAWBACK_PREFIX, FOLLOWUP_PREFIX, followup_columns
+
+        fcols = followup_columns(res)
+        input_cols = [c for c in res.columns
+                      if c not in ("gross", "applied", "retention_years", "total_clawback", "error", "excluded")
+                      and not str(c).startswith(CLAWBACK_PREFIX)]
+
+        def _records():
+            for row in res.to_dict(orient="records"):
+                schedule = []
+                for c in fcols:
+                    y = int(str(c)[len(FOLLOWUP_PREFIX):])
+                    if _is_missing(row.get(c)):
+                        continue
+                    schedule.append({"연차": y, "사후연도 상시": row[c], "추징세액": row.get(f"{CLAWBACK_PREFIX}{y}", 0)})
+                company = row.get("company")
+                year = row.get("tax_year")
+                yield ScenarioRecord(
+                    gross=int(row["gross"]),
+                    applied=int(row["applied"]),
+                    retention_years=int(row["retention_years"]),
+                    total_clawback=int(row.get("total_clawback", 0)),
+                    company=None if _is_missing(company) else str(company),
+                    tax_year=tax_year if _is_missing(year) else int(year),
+                    params_hash=params_hash,
+                    company_size=None if _is_missing(row.get("company_size")) else str(row["company_size"]),
+                    region=None if _is_missing(row.get("region")) else str(row["region"]),
+                    clawback_method=method,
+                    inputs={c: (None if _is_missing(row.get(c)) else row.get(c)) for c in input_cols},
+                    schedule=schedule,
+                    label=label,
+                    tenant=tenant,
+                )
+
+        return self.add_scenarios(_records())
+
+    def delete(self, scenario_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM scenarios WHERE id = ?", (int(scenario_id),))
+
+    # ---- 조회 ----
+    def query(
+        self,
+        tenant: str,
+        company: Optional[str] = None,
+        tax_year: Optional[int] = None,
+        params_hash: Optional[str] = None,
+        min_clawback_ratio: Optional[float] = None,
+        limit: Optional[int] = 100,
+        newest_first: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        테넌트의 시나리오 중 조건에 맞는 요약 목록
+        - tenant: 필수 (다른 테넌트의 이력은 반환하지 않음)
+        - min_clawback_ratio: total_clawback > applied × 비율 (예: 0.5)
+        """
+        if tenant is None:
+            raise ValueError("tenant는 필수입니다.")
+        where, args = ["tenant = ?"], [str(tenant)]
+        if company is not None:
+            where.append("company = ?")
+            args.append(company)
+        if tax_year is not None:
+            where.append("tax_year = ?")
+            args.append(int(tax_year))
+        if params_hash is not None:
+            where.append("params_hash = ?")
+            args.append(params_hash)
+        if min_clawback_ratio is not None:
+            where.append("clawback_ratio > ?")
+            args.append(float(min_clawback_ratio))
+        sql = "SELECT * FROM scenarios WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC" if newest_first else " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [_row_dict(r) for r in rows]
+
+    def get(self, scenario_id: int) -> Optional[Dict[str, Any]]:
+        """시나리오 1건 + 연차별 추징 일정 (schedule_records 형식)."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM scenarios WHERE id = ?", (int(scenario_id),)).fetchone()
+            if row is None:
+                return None
+            sched = self._conn.execute(
+                "SELECT year_index, followup_total, followup_youth, clawback FROM clawback_schedule "
+                "WHERE scenario_id = ? ORDER BY year_index", (int(scenario_id),),
+            ).fetchall()
+        out = _row_dict(row)
+        out["schedule_records"] = [
+            {"연차": s["year_index"], "사후연도 상시": s["followup_total"],
+             "사후연도 청년등": s["followup_youth"], "추징세액": s["clawback"]}
+            for s in sched
+        ]
+        return out
+
+    def get_params(self, params_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT params_json FROM params WHERE params_hash = ?", (params_hash,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0])
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _is_missing(v) -> bool:
+    return v is None or (isinstance(v, float) and v != v)
+
+
+def _opt_int(v) -> Optional[int]:
+    return None if _is_missing(v) else int(v)
+
+
+def _json_default(v):
+    # numpy 정수/실수 등
+    return v.item() if hasattr(v, "item") else str(v)
+
+
+def _scenario_row(scenario_id: int, r: ScenarioRecord, now: str) -> tuple:
+    ratio = (r.total_clawback / r.applied) if r.applied > 0 else None
+    return (
+        scenario_id, now, str(r.tenant or ""), r.label, r.company, _opt_int(r.tax_year), r.params_hash, r.company_size, r.region,
+        r.clawback_method, json.dumps(r.inputs, ensure_ascii=False, default=_json_default),
+        int(r.gross), int(r.applied), int(r.retention_years), int(r.total_clawback), ratio,
+    )
+
+
+def _row_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    out = dict(row)
+    out["inputs"] = json.loads(out.pop("inputs_json") or "{}")
+    return out
+
+
+_stores: Dict[str, ScenarioStore] = {}
+_stores_lock = Lock()
+
+
+def get_scenario_store(path: str) -> ScenarioStore:
+    """프로세스 전체에서 경로별로 공유하는 저장소 (Streamlit 세션 간 공유)."""
+    with _stores_lock:
+        store = _stores.get(str(path))
+        if store is None:
+            store = _stores[str(path)] = ScenarioStore(path)
+        return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="통합고용세액공제 계산 시나리오 저장소 (SQLite)")
+    parser.add_argument("--db", required=True, help="SQLite 파일 경로")
+    parser.add_argument("--tenant", default="default", help="테넌트 id (기본 default, employment_tax_credit_calc.py --tenant와 같은 값)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_imp = sub.add_parser("import", help="기업 목록을 일괄 계산해 시나리오로 저장")
+    p_imp.add_argument("--params-json", required=True, help="법령 단가·기간 설정 JSON 경로")
+    p_imp.add_argument("--companies", required=True, help="기업 목록 CSV/XLSX (batch_engine 입력 형식)")
+    p_imp.add_argument("--tax-year", type=int, default=None, help="tax_year 열이 없을 때 쓸 과세연도")
+    p_imp.add_argument("--clawback-method", choices=["proportional", "all_or_nothing", "tiered"], default="proportional")
+    p_imp.add_argument("--label", default=None)
+
+    p_q = sub.add_parser("query", help="시나리오 조회")
+    p_q.add_argument("--company", default=None)
+    p_q.add_argument("--tax-year", type=int, default=None)
+    p_q.add_argument("--params-hash", default=None)
+    p_q.add_argument("--min-clawback-ratio", type=float, default=None, help="추징액 > 적용 공제액 × 비율")
+    p_q.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+    store = ScenarioStore(args.db)
+
+    if args.command == "import":
+        from employment_tax_credit_calc import load_params_from_json
+        from batch_engine import compile_policy_arrays, compute_batch, read_companies_chunked
+
+        params = load_params_from_json(args.params_json)
+        arrays = compile_policy_arrays(params)
+        h = store.save_params(params)
+        n = 0
+        for chunk in read_companies_chunked(args.companies, args.companies):
+            res = compute_batch(chunk, params, args.clawback_method, arrays=arrays)
+            n += len(store.add_batch(res, params_hash=h, tax_year=args.tax_year, method=args.clawback_method,
+                                     label=args.label, tenant=args.tenant))
+        print(f"=== 시나리오 저장: {n:,}건 (파라미터 버전 {h}) / 전체 {store.count():,}건 ===")
+        return
+
+    rows = store.query(args.tenant, args.company, args.tax_year, args.params_hash, args.min_clawback_ratio, args.limit)
+    print(f"=== 시나리오 조회: {len(rows):,}건 ===")
+    for r in rows:
+        print(f"- #{r['id']} {r['company'] or '-'} / {r['tax_year'] or '-'}년 / {r['company_size']} {r['region']}"
+              f" / 적용 {r['applied']:,}원 / 추징 {r['total_clawback']:,}원 (파라미터 {r['params_hash'] or '-'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+세션별 용량 제한(바이트 예산) + LRU 축출(eviction) 세션 저장소
+
+st.session_state에 쌓이는 큰 값(chat_history, followup_table, last_calc, 로고/엑셀 bytes)을
+세션당 예산 안에서 관리합니다.
+
+- 값 저장 시 크기를 추정해 기록하고, 세션 합계가 예산을 넘으면
+  최근에 가장 덜 쓰인(LRU) 큰 값부터 압축 파일(pickle + zlib)로 디스크에 내립니다(spill).
+- 내려간 값은 다시 get() 할 때 자동으로 메모리로 올라옵니다.
+- report_usage()로 전체 세션의 메모리/디스크 사용량을 확인할 수 있습니다.
+- new_file()로 만든 임시 파일(일괄 계산 결과 등)도 같은 디렉터리에 두어 세션이 끝나면 함께 삭제됩니다.
+
+사용 예)
+    store = get_session_store(st.session_state)
+    store.set("saved_logo_png", png_bytes)
+    logo = store.get("saved_logo_png")
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, List, MutableMapping, Optional
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import uuid
+import weakref
+import zlib
+
+
+DEFAULT_BUDGET_BYTES = 8 * 1024 * 1024      # 세션당 메모리 예산 (8MB)
+DEFAULT_LARGE_THRESHOLD = 32 * 1024         # 이 크기 이상만 축출 대상 (32KB)
+_STORE_KEY = "_session_store"
+
+# 세션 id -> SessionStore (세션 종료 시 자동 제거)
+_registry: "weakref.WeakValueDictionary[str, SessionStore]" = weakref.WeakValueDictionary()
+
+
+class _Spilled:
+    """디스크로 내려간 값의 자리표시자."""
+    __slots__ = ("path", "nbytes", "disk_bytes")
+
+    def __init__(self, path: str, nbytes: int, disk_bytes: int):
+        self.path = path
+        self.nbytes = nbytes
+        self.disk_bytes = disk_bytes
+
+
+def estimate_size(value: Any) -> int:
+    """값의 대략적인 메모리 크기(바이트)."""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    mem = getattr(value, "memory_usage", None)  # pandas DataFrame
+    if callable(mem):
+        try:
+            usage = mem(deep=True)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except Exception:
+            pass
+    if isinstance(value, (list, tuple, dict)):
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            pass
+    return sys.getsizeof(value)
+
+
+class SessionStore:
+    """
+    한 세션의 큰 값을 관리하는 저장소
+
+    - backing: 실제 값이 저장되는 매핑 (보통 st.session_state)
+    - budget_bytes: 세션 메모리 예산
+    - large_threshold: 축출 대상이 되는 최소 크기
+    - spill_dir: 디스크 계층 경로 (기본: 임시폴더/tax_credit_spill/<session_id>)
+    """
+
+    def __init__(
+        self,
+        backing: MutableMapping,
+        session_id: Optional[str] = None,
+        budget_bytes: int = DEFAULT_BUDGET_BYTES,
+        large_threshold: int = DEFAULT_LARGE_THRESHOLD,
+        spill_dir: Optional[str] = None,
+    ):
+        self.backing = backing
+        self.session_id = session_id or uuid.uuid4().hex
+        self.budget_bytes = int(budget_bytes)
+        self.large_threshold = int(large_threshold)
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), "tax_credit_spill", self.session_id)
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()  # 메모리 상주 값 (LRU 순서)
+        self._spilled: Dict[str, _Spilled] = {}               # 디스크로 내려간 값
+        self.evictions = 0
+        _registry[self.session_id] = self
+        weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+
+    # ---- 기본 연산 ----
+    def set(self, key: str, value: Any) -> None:
+        old = self._spilled.pop(key, None)
+        if old is not None:
+            self._remove_file(old)
+        self.backing[key] = value
+        self._sizes[key] = estimate_size(value)
+        self._sizes.move_to_end(key)
+        self._enforce_budget(keep=key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.backing:
+            return default
+        value = self.backing[key]
+        if isinstance(value, _Spilled):
+            value = self._load(key, value)
+        elif key in self._sizes:
+            self._sizes.move_to_end(key)
+        return value
+
+    def touch(self, key: str) -> None:
+        """제자리 수정 후 크기 재측정 (값 전체를 다시 측정하므로 목록에 항목을 더할 때는 append 사용)."""
+        if key in self.backing and not isinstance(self.backing[key], _Spilled):
+            self.set(key, self.backing[key])
+
+    def append(self, key: str, item: Any) -> None:
+        """목록 값에 항목 추가 (크기는 추가한 항목만 측정해 더함, 없으면 새 목록)."""
+        items = self.get(key)
+        if items is None:
+            self.set(key, [item])
+            return
+        items.append(item)
+        self._sizes[key] = self._sizes.get(key, 0) + estimate_size(item)
+        self._sizes.move_to_end(key)
+        self._enforce_budget(keep=key)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self.get(key, default)
+        self.backing.pop(key, None)
+        self._sizes.pop(key, None)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.backing
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.backing:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def new_file(self, prefix: str = "", suffix: str = "") -> str:
+        """세션 디렉터리에 빈 임시 파일을 만들어 경로 반환 (세션 종료 시 spill 파일과 함께 삭제)."""
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix=prefix, suffix=suffix, dir=self.spill_dir)
+        os.close(fd)
+        return path
+
+    # ---- 축출 / 디스크 계층 ----
+    def _enforce_budget(self, keep: Optional[str] = None) -> None:
+        total = sum(self._sizes.values())
+        if total <= self.budget_bytes:
+            return
+        for key in list(self._sizes.keys()):
+            if total <= self.budget_bytes:
+                break
+            size = self._sizes[key]
+            if key == keep or size < self.large_threshold:
+                continue
+            if self._spill(key):
+                total -= size
+
+    def _spill(self, key: str) -> bool:
+        value = self.backing.get(key)
+        try:
+            data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 6)
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = os.path.join(self.spill_dir, f"{uuid.uuid4().hex}.pkl.z")
+            with open(path, "wb") as f:
+                f.write(data)
+        except Exception:
+            return False
+        marker = _Spilled(path, self._sizes.pop(key), len(data))
+        self.backing[key] = marker
+        self._spilled[key] = marker
+        self.evictions += 1
+        return True
+
+    def _load(self, key: str, marker: _Spilled) -> Any:
+        with open(marker.path, "rb") as f:
+            value = pickle.loads(zlib.decompress(f.read()))
+        self._remove_file(marker)
+        self._spilled.pop(key, None)
+        self.backing[key] = value
+        self._sizes[key] = marker.nbytes
+        self._sizes.move_to_end(key)
+        self._enforce_budget(keep=key)
+        return value
+
+    @staticmethod
+    def _remove_file(marker: _Spilled) -> None:
+        try:
+            os.remove(marker.path)
+        except OSError:
+            pass
+
+    # ---- 사용량 ----
+    def usage(self) -> Dict[str, Any]:
+        # backing(st.session_state 프록시)는 다른 세션에서 읽으면 안 되므로 자체 기록만 사용
+        spilled = dict(self._spilled)
+        return {
+            "session_id": self.session_id,
+            "memory_bytes": sum(self._sizes.values()),
+            "disk_bytes": sum(m.disk_bytes for m in spilled.values()),
+            "budget_bytes": self.budget_bytes,
+            "evictions": self.evictions,
+            "keys_in_memory": dict(self._sizes),
+            "keys_on_disk": sorted(spilled.keys()),
+        }
+
+
+def get_session_store(backing: MutableMapping, **kwargs) -> SessionStore:
+    """backing(st.session_state)에 저장소를 1개만 만들어 재사용."""
+    store = backing.get(_STORE_KEY)
+    if not isinstance(store, SessionStore):
+        session_id = kwargs.pop("session_id", None) or _streamlit_session_id()
+        store = SessionStore(backing, session_id=session_id, **kwargs)
+        backing[_STORE_KEY] = store
+    return store
+
+
+def _streamlit_session_id() -> Optional[str]:
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx is not None else None
+    except Exception:
+        return None
+
+
+def report_usage() -> List[Dict[str, Any]]:
+    """현재 살아 있는 모든 세션의 사용량 (메모리 큰 순)."""
+    rows = [store.usage() for store in list(_registry.values())]
+    return sorted(rows, key=lambda r: r["memory_bytes"], reverse=True)
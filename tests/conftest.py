@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""저장소 루트의 평면 모듈(batch_engine 등)을 tests에서 import할 수 있도록 경로 추가."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""water_fill(집단 한도 배분) / run_ledger(이월공제 원장) 불변식."""
+import numpy as np
+import pytest
+
+from carryforward import NO_LIMIT, run_ledger
+from group_cap import water_fill
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_water_fill_invariants(seed):
+    rng = np.random.default_rng(seed)
+    n, n_groups = 200, 7
+    usable = rng.integers(0, 10_000, n)
+    groups = rng.integers(0, n_groups, n)
+    caps = rng.integers(-1, 300_000, n_groups)  # 음수 = 한도 없음
+    weights = rng.uniform(0.5, 3.0, n) if seed % 2 else None
+
+    alloc = water_fill(usable, caps, groups, weights)
+
+    assert alloc.dtype == np.int64
+    assert (alloc >= 0).all()
+    assert (alloc <= usable).all()
+    for g in range(n_groups):
+        m = groups == g
+        expected = usable[m].sum() if caps[g] < 0 else min(caps[g], usable[m].sum())
+        assert alloc[m].sum() == expected
+
+
+def test_water_fill_single_group_equal_level():
+    alloc = water_fill(np.array([100, 500, 900]), 1000)
+    assert alloc.tolist() == [100, 450, 450]
+
+
+@pytest.mark.parametrize("carry_years", [0, 1, 5, 10])
+def test_run_ledger_invariants(carry_years):
+    rng = np.random.default_rng(carry_years)
+    n, n_years = 50, 15
+    generated = rng.integers(0, 1_000_000, (n, n_years))
+    limit = rng.integers(0, 1_200_000, (n, n_years))
+    limit[rng.random((n, n_years)) < 0.1] = NO_LIMIT
+    opening = rng.integers(0, 200_000, (n, carry_years))
+
+    led = run_ledger(generated, limit, carry_years, opening=opening)
+
+    for f in ("generated", "used", "used_carryforward", "used_current", "expired", "balance"):
+        assert (getattr(led, f) >= 0).all(), f
+    assert (led.used <= limit).all()
+    assert (led.used == led.used_carryforward + led.used_current).all()
+    assert (led.used_current <= generated).all()
+    # 발생 + 기초 이월 = 사용 + 소멸 + 기말 이월잔액
+    assert (generated.sum(axis=1) + opening.sum(axis=1)
+            == led.used.sum(axis=1) + led.expired.sum(axis=1) + led.balance[:, -1]).all()
+    assert (led.balance[:, -1] == led.buckets.sum(axis=1)).all()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+""".app_cache 계층: 같은 내용은 다시 쓰지 않음, 원자적 교체, 외부 변경 감지."""
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from app_cache import AppCache, get_app_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AppCache(tmp_path / ".app_cache")
+
+
+def test_unchanged_content_is_not_rewritten(cache):
+    assert cache.write_bytes("logo.png", b"png-1") is True
+    mtime = (cache.root / "logo.png").stat().st_mtime_ns
+    assert cache.write_bytes("logo.png", b"png-1") is False
+    assert cache.stats["disk_writes"] == 1
+    assert cache.stats["skipped_writes"] == 1
+    assert (cache.root / "logo.png").stat().st_mtime_ns == mtime
+
+    assert cache.write_bytes("logo.png", b"png-2") is True
+    assert (cache.root / "logo.png").read_bytes() == b"png-2"
+
+
+def test_write_json_is_key_order_independent(cache):
+    assert cache.write_json("prefs.json", {"a": 1, "b": "한글"}) is True
+    assert cache.write_json("prefs.json", {"b": "한글", "a": 1}) is False
+    assert cache.read_json("prefs.json") == {"a": 1, "b": "한글"}
+
+
+def test_read_uses_mirror_until_disk_changes(cache):
+    cache.write_bytes("name.txt", b"one")
+    assert cache.read_bytes("name.txt") == b"one"
+    assert cache.stats["disk_reads"] == 0
+
+    # 다른 워커가 파일을 바꿈 → stat 서명이 달라져 다시 읽음
+    path = cache.root / "name.txt"
+    path.write_bytes(b"other worker")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    assert cache.read_bytes("name.txt") == b"other worker"
+    assert cache.stats["disk_reads"] == 1
+
+    path.unlink()
+    assert cache.read_bytes("name.txt") is None
+    assert cache.read_json("name.txt", default={}) == {}
+
+
+def test_dirty_check_uses_disk_when_mirror_is_stale(tmp_path):
+    root = tmp_path / ".app_cache"
+    a, b = AppCache(root), AppCache(root)   # 워커 두 개
+    a.write_bytes("x", b"v1")
+    b.write_bytes("x", b"v2")
+    # a의 미러는 v1이지만 디스크는 v2 → v1 쓰기는 실제로 수행
+    assert a.write_bytes("x", b"v1") is True
+    assert b.read_bytes("x") == b"v1"
+    # 디스크와 같은 내용이면 (미러가 낡았어도) 쓰지 않음
+    assert b.write_bytes("x", b"v1") is False
+
+
+def test_atomic_write_leaves_no_temp_files_on_failure(cache, monkeypatch):
+    cache.write_bytes("data.bin", b"old")
+
+    def boom(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", boom)
+    with pytest.raises(OSError):
+        cache.write_bytes("data.bin", b"new")
+    assert (cache.root / "data.bin").read_bytes() == b"old"
+    assert sorted(p.name for p in cache.root.iterdir() if p.name != ".lock") == ["data.bin"]
+
+
+def test_concurrent_writers_end_with_one_complete_value(cache):
+    values = [bytes([i]) * 100_000 for i in range(8)]
+    threads = [threading.Thread(target=cache.write_bytes, args=("big.bin", v)) for v in values]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert (cache.root / "big.bin").read_bytes() in values
+
+
+def test_get_app_cache_is_shared_per_path(tmp_path):
+    root = tmp_path / ".app_cache"
+    assert get_app_cache(root) is get_app_cache(Path(str(root) + "/"))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""테넌트별 자산 저장소: 테넌트 id 생성, 테넌트 격리, 내용주소 중복 제거, GC, 이전 형식 가져오기."""
+import json
+import os
+
+import pytest
+
+from app_cache import AppCache
+from asset_store import AssetStore, browser_tenant, is_browser_token, new_browser_token, user_tenant
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AssetStore(AppCache(tmp_path))
+
+
+def test_browser_tenant_requires_random_token():
+    token = new_browser_token()
+    assert is_browser_token(token)
+    assert browser_tenant(token) == browser_tenant(token)
+    assert browser_tenant(token) != browser_tenant(new_browser_token())
+    for bad in ("default", "acme", "", token[:-1], token + "x", "../" + token[3:]):
+        with pytest.raises(ValueError):
+            browser_tenant(bad)
+
+
+def test_user_tenant_is_scoped_by_issuer():
+    assert user_tenant("https://idp-a", "42") != user_tenant("https://idp-b", "42")
+    assert user_tenant("https://idp-a", "42").startswith("u-")
+    with pytest.raises(ValueError):
+        user_tenant("https://idp-a", "")
+
+
+def test_tenants_do_not_share_logo_or_company_name(store):
+    a, b = browser_tenant(new_browser_token()), browser_tenant(new_browser_token())
+    store.set_logo(a, b"logo-a")
+    store.set_company_name(a, "A사")
+    store.set_company_name(b, "B사")
+
+    assert store.get_logo(a) == b"logo-a"
+    assert store.get_logo(b) is None
+    assert store.get_company_name(a) == "A사"
+    assert store.get_company_name(b) == "B사"
+
+
+def test_same_logo_is_stored_once(store):
+    a, b = "u-a", "u-b"
+    assert store.set_logo(a, b"same") == store.set_logo(b, b"same")
+    assert len(list(store.assets_dir.glob("*.png"))) == 1
+
+
+def test_gc_removes_least_recently_used_unreferenced_assets(tmp_path):
+    store = AssetStore(AppCache(tmp_path), max_total_bytes=350)
+    kept = store.set_logo("u-a", b"k" * 100)           # 테넌트가 가리키는 자산
+    old = store.put_asset(b"o" * 100)
+    mid = store.put_asset(b"m" * 100)
+    for i, digest in enumerate((kept, old, mid)):
+        os.utime(store.assets_dir / f"{digest}.png", (1000 + i, 1000 + i))
+
+    new = store.put_asset(b"n" * 100)                   # 400B > 350B → 참조 없는 자산 중 가장 오래된 것 삭제
+    remaining = {p.stem for p in store.assets_dir.glob("*.png")}
+    assert remaining == {kept, mid, new}
+    assert store.get_asset(old) is None
+    assert store.get_logo("u-a") == b"k" * 100
+
+
+def test_get_asset_rejects_bad_digest_and_corrupt_file(store):
+    digest = store.put_asset(b"png")
+    assert store.get_asset("../tenants/x") is None
+    fresh = AssetStore(store.cache)                     # 메모리 캐시 없이 디스크에서 읽음
+    (store.assets_dir / f"{digest}.png").write_bytes(b"tampered")
+    assert fresh.get_asset(digest) is None
+
+
+def test_import_legacy_once_without_overwriting(tmp_path):
+    (tmp_path / "logo.png").write_bytes(b"legacy-logo")
+    (tmp_path / "prefs.json").write_text(json.dumps({"company_name": "옛 기관"}, ensure_ascii=False),
+                                         encoding="utf-8")
+    store = AssetStore(AppCache(tmp_path))
+    assert store.import_legacy() is True
+    assert store.get_logo("default") == b"legacy-logo"
+    assert store.get_company_name("default") == "옛 기관"
+    assert (tmp_path / "logo.png").exists()
+
+    store.set_company_name("default", "새 기관")
+    assert store.import_legacy() is False
+    assert store.get_company_name("default") == "새 기관"
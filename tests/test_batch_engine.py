@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""compute_batch(배열 계산) ↔ calc_* (1건 계산) 차등 테스트 + 숫자 칸 오류 표시."""
+import dataclasses
+import os
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_engine import compute_batch
+from employment_tax_credit_calc import (
+    CompanySize, HeadcountInputs, Region, apply_caps_and_min_tax, calc_clawback, calc_gross_credit,
+    load_params_from_json,
+)
+
+POLICY_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "policies", "2023.json")
+TIERS = {"0.0": 0.0, "0.1": 0.5, "0.3": 1.0}
+
+
+@pytest.fixture(scope="module")
+def params():
+    return load_params_from_json(POLICY_JSON)
+
+
+def _random_rows(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        prev = rng.randint(0, 100)
+        curr = max(prev + rng.randint(-10, 20), 0)
+        r = dict(
+            company=f"c{i}",
+            company_size=rng.choice([s.value for s in CompanySize]),
+            region=rng.choice([x.value for x in Region]),
+            prev_total=prev, curr_total=curr,
+            prev_youth=rng.randint(0, 10), curr_youth=rng.randint(0, 15),
+            converted_regular=rng.randint(0, 3), returned_from_parental_leave=rng.randint(0, 2),
+            tax_before_credit=rng.choice([None, rng.randint(0, 10 ** 9)]),
+        )
+        for y in range(1, 4):
+            r[f"followup_{y}"] = rng.choice([None, curr - rng.randint(-3, 8)])
+        rows.append(r)
+    return rows
+
+
+@pytest.mark.parametrize("method", ["proportional", "all_or_nothing", "tiered"])
+@pytest.mark.parametrize("cap", [None, 30_000_000])
+def test_compute_batch_matches_scalar(params, method, cap):
+    params = dataclasses.replace(params, max_credit_total=cap)
+    tiers = TIERS if method == "tiered" else None
+    rows = _random_rows(1000)
+    res = compute_batch(pd.DataFrame(rows), params, method, tiers)
+
+    assert (res["error"] == "").all()
+    for i, r in enumerate(rows):
+        size = CompanySize(r["company_size"])
+        h = HeadcountInputs(r["prev_total"], r["curr_total"], r["prev_youth"], r["curr_youth"],
+                            r["converted_regular"], r["returned_from_parental_leave"])
+        gross = calc_gross_credit(size, Region(r["region"]), h, params)
+        applied = apply_caps_and_min_tax(gross, params, r["tax_before_credit"])
+        assert res["gross"].iloc[i] == gross
+        assert res["applied"].iloc[i] == applied
+        for y in range(1, 4):
+            f = r[f"followup_{y}"]
+            expected = 0 if f is None else calc_clawback(applied, h.curr_total, f, params.retention_years[size], y,
+                                                         method, tiers)
+            assert res[f"clawback_{y}"].iloc[i] == expected, (i, y)
+
+
+def test_non_numeric_cells_are_marked_as_error(params):
+    rows = _random_rows(5, seed=7)
+    df = pd.DataFrame(rows).astype({"curr_total": object, "tax_before_credit": object, "followup_1": object})
+    df.loc[1, "curr_total"] = "열두명"
+    df.loc[2, "tax_before_credit"] = "미정"
+    df.loc[3, "followup_1"] = "?"
+    df.loc[4, "prev_total"] = np.nan
+    res = compute_batch(df, params)
+
+    assert res["error"].iloc[0] == ""
+    assert "curr_total" in res["error"].iloc[1]
+    assert "tax_before_credit" in res["error"].iloc[2]
+    assert "followup_1" in res["error"].iloc[3]
+    assert "prev_total" in res["error"].iloc[4]
+    bad = res["error"] != ""
+    assert (res.loc[bad, ["gross", "applied", "total_clawback"]] == 0).all().all()
+
+
+def test_invalid_code_and_number_errors_are_combined(params):
+    df = pd.DataFrame(_random_rows(1))
+    df["company_size"] = "개인"
+    df["curr_total"] = "x"
+    err = compute_batch(df, params)["error"].iloc[0]
+    assert err.startswith("기업규모/지역 값 오류; ")
+    assert "curr_total" in err
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""계산 그래프: calc_* 직접 호출과 같은 결과, 입력이 바뀐 단계만 재계산."""
+import dataclasses
+import itertools
+import os
+
+import pytest
+
+from calc_graph import COL_CLAWBACK, CalcGraph
+from employment_tax_credit_calc import (
+    CompanySize, HeadcountInputs, Region,
+    apply_caps_and_min_tax, calc_clawback, calc_gross_credit, load_params_from_json,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def params():
+    return load_params_from_json(os.path.join(ROOT, "policies", "2023.json"))
+
+
+HEADS = [
+    HeadcountInputs(prev_total=50, curr_total=60, prev_youth=10, curr_youth=14, converted_regular=2,
+                    returned_from_parental_leave=1),
+    HeadcountInputs(prev_total=60, curr_total=55, prev_youth=5, curr_youth=9),
+    HeadcountInputs(prev_total=0, curr_total=3),
+]
+FOLLOWUPS = [(1, 58, 12), (2, 60, 14), (3, 40, 5)]
+
+
+@pytest.mark.parametrize(
+    "size,region,heads,tax,method",
+    list(itertools.product(CompanySize, Region, HEADS, [None, 120_000_000, 5_000_000],
+                           ["proportional", "all_or_nothing", "tiered"])),
+)
+def test_graph_matches_direct_calc(params, size, region, heads, tax, method):
+    g = CalcGraph()
+    g.set_params(params)
+    g.set_company(size, region)
+    g.set_heads(heads)
+    g.set_tax_before_credit(tax)
+    g.set_clawback_method(method)
+    g.set_followups(FOLLOWUPS)
+
+    gross = calc_gross_credit(size, region, heads, params)
+    applied = apply_caps_and_min_tax(gross, params, tax_before_credit=tax)
+    retention = params.retention_years[size]
+    expected = [
+        calc_clawback(applied, heads.curr_total, total, retention, year, method=method,
+                      tiered_thresholds=params.clawback_tiers)
+        for year, total, _ in FOLLOWUPS
+    ]
+    assert g.gross == gross
+    assert g.applied == applied
+    assert [r[COL_CLAWBACK] for r in g.schedule_records()] == expected
+    assert g.total_clawback == sum(expected)
+
+
+def test_capped_params_match_direct_calc(params):
+    capped = dataclasses.replace(params, max_credit_total=10_000_000)
+    heads = HEADS[0]
+    g = CalcGraph()
+    g.set_params(capped)
+    g.set_company(CompanySize.SME, Region.NON_METRO)
+    g.set_heads(heads)
+    g.set_tax_before_credit(None)
+    gross = calc_gross_credit(CompanySize.SME, Region.NON_METRO, heads, capped)
+    assert g.gross == gross
+    assert g.applied == apply_caps_and_min_tax(gross, capped) == 10_000_000
+
+
+def test_only_changed_stages_recompute(params):
+    g = CalcGraph()
+    g.set_params(params)
+    g.set_company(CompanySize.SME, Region.SEOUL_METRO)
+    g.set_heads(HEADS[0])
+    g.set_tax_before_credit(120_000_000)
+    g.set_followups(FOLLOWUPS)
+    g.total_clawback
+    before = dict(g.eval_counts)
+
+    # 같은 값을 다시 넣으면 재계산 없음
+    g.set_heads(HEADS[0])
+    g.total_clawback
+    assert g.eval_counts == before
+
+    # 세전세액 변경 → gross는 그대로, 2년차 인원 변경 → clawback[2]만 재계산
+    g.set_tax_before_credit(130_000_000)
+    g.gross
+    assert g.eval_counts["gross"] == before["gross"]
+    g.set_tax_before_credit(120_000_000)
+    g.total_clawback
+    counts = dict(g.eval_counts)
+    g.set_followup(2, 50, 10)
+    g.total_clawback
+    assert g.eval_counts["clawback[2]"] == counts["clawback[2]"] + 1
+    assert g.eval_counts["clawback[1]"] == counts["clawback[1]"]
+    assert g.eval_counts["clawback[3]"] == counts["clawback[3]"]
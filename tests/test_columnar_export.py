@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""열 기반 결과 저장: 소수 인원/세액 왕복 + 분할 경로 + Arrow 화면 결과."""
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+from batch_engine import compute_batch, open_arrow_result, run_batch_to_arrow
+from columnar_export import ColumnarResultWriter
+from employment_tax_credit_calc import CompanySize, Region, load_params_from_json
+
+POLICY_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "policies", "2023.json")
+
+
+@pytest.fixture(scope="module")
+def params():
+    return load_params_from_json(POLICY_JSON)
+
+
+def _companies():
+    return pd.DataFrame([
+        dict(company="A", industry_code="25112", company_size=CompanySize.SME.value, region=Region.NON_METRO.value,
+             prev_total=50.0, curr_total=60.25, prev_youth=10, curr_youth=14, converted_regular=0,
+             returned_from_parental_leave=0, tax_before_credit=120_000_000.5, followup_1=57.5, followup_2=None),
+        dict(company="B", industry_code="01110", company_size=CompanySize.LARGE.value, region=Region.SEOUL_METRO.value,
+             prev_total=10, curr_total=12, prev_youth=0, curr_youth=1, converted_regular=1,
+             returned_from_parental_leave=0, tax_before_credit=None, followup_1=12, followup_2=11),
+    ])
+
+
+def _read(path: str, fmt: str) -> pd.DataFrame:
+    if fmt == "parquet":
+        return pd.read_parquet(path)
+    if fmt == "feather":
+        return pd.read_feather(path)
+    return pd.read_csv(path, encoding="utf-8-sig", dtype={"company": str, "industry_code": str})
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather", "csv"])
+def test_fractional_followup_round_trip(tmp_path, params, fmt):
+    res = compute_batch(_companies(), params)
+    with ColumnarResultWriter(str(tmp_path), fmt=fmt, tax_year=2024) as w:
+        w.write(res)
+
+    files = sorted(glob.glob(str(tmp_path / "tax_year=2024" / "*" / "*" / "part-*")))
+    assert len(files) == 2 and w.stats["rows"] == 2
+    got = pd.concat([_read(f, fmt) for f in files]).sort_values("company").reset_index(drop=True)
+    assert got["followup_1"].tolist() == [57.5, 12.0]
+    assert got["curr_total"].tolist() == [60.25, 12.0]
+    assert got["tax_before_credit"].iloc[0] == 120_000_000.5
+    assert got["industry_code"].tolist() == ["25112", "01110"]
+    assert got["applied"].tolist() == res.sort_values("company")["applied"].tolist()
+    assert "SME" in files[0] or "SME" in files[1]
+
+
+def test_run_id_gives_new_part_files(tmp_path, params):
+    res = compute_batch(_companies(), params)
+    for _ in range(2):
+        with ColumnarResultWriter(str(tmp_path), fmt="csv", tax_year=2024) as w:
+            w.write(res)
+    assert len(glob.glob(str(tmp_path / "**" / "part-*.csv"), recursive=True)) == 4
+
+
+def test_arrow_result_accepts_fractional_followup(tmp_path, params):
+    path = str(tmp_path / "result.arrow")
+    totals = run_batch_to_arrow([_companies()], params, path)
+    table = open_arrow_result(path)
+    assert totals["rows"] == 2 and table.num_rows == 2
+    assert table.column("followup_1").to_pylist() == [57.5, 12.0]
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""write-only 엑셀 내보내기: 숫자 셀 + 표시형식, 문자열 열 보존, 노랑 칸 규칙, Arrow 결과 스트리밍."""
+import os
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from batch_engine import open_arrow_result, run_batch_to_arrow
+from employment_tax_credit_calc import load_params_from_json
+from excel_export import (
+    STYLE_COUNT, STYLE_COUNT_INPUT, STYLE_HEADER, STYLE_KRW, STYLE_KRW_INPUT, arrow_to_xlsx, write_rows_xlsx,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLUMNS = ["company", "industry_code", "curr_total", "followup_1", "applied", "clawback_1", "error"]
+
+
+def _rows(n):
+    for i in range(n):
+        yield [f"{i:05d}", "01110", 10 + i, None if i == 1 else f"{1000 + i:,}", 1_000_000 * i, 0.5 * i, ""]
+
+
+def test_numbers_styles_and_highlight(tmp_path):
+    path = str(tmp_path / "out.xlsx")
+    assert write_rows_xlsx(path, COLUMNS, _rows(6), highlight_columns=["followup_1"]) == 6
+
+    ws = load_workbook(path)["일괄 계산 결과"]
+    assert [c.value for c in ws[1]] == COLUMNS
+    assert all(c.style == STYLE_HEADER for c in ws[1])
+
+    col = {name: i for i, name in enumerate(COLUMNS)}
+    data = list(ws.iter_rows(min_row=2))
+    # 문자열 열은 숫자처럼 보여도 문자열 (앞자리 0 유지)
+    assert [r[col["company"]].value for r in data][:2] == ["00000", "00001"]
+    assert data[0][col["industry_code"]].value == "01110"
+    # 금액/인원은 숫자 셀 ("1,000" 같은 문자열도 숫자로)
+    assert [r[col["followup_1"]].value for r in data] == [1000, None, 1002, 1003, 1004, 1005]
+    assert data[3][col["applied"]].value == 3_000_000
+    assert data[3][col["clawback_1"]].value == 1.5
+    assert data[0][col["error"]].value is None
+    assert data[2][col["applied"]].style == STYLE_KRW
+    assert data[2][col["curr_total"]].style == STYLE_COUNT
+    # 숫자가 있는 첫 3칸만 노랑 (빈칸은 세지 않음)
+    styles = [r[col["followup_1"]].style for r in data]
+    assert styles == [STYLE_COUNT_INPUT, "tc_text", STYLE_COUNT_INPUT, STYLE_COUNT_INPUT, STYLE_COUNT, STYLE_COUNT]
+    assert data[0][col["followup_1"]].fill.fgColor.rgb.endswith("FCE8A1")
+
+
+def test_highlighted_amount_column(tmp_path):
+    path = str(tmp_path / "amount.xlsx")
+    write_rows_xlsx(path, ["applied"], ([v] for v in (5, 6, 7, 8)), highlight_columns=["applied"])
+    ws = load_workbook(path).active
+    assert [r[0].style for r in ws.iter_rows(min_row=2)] == [STYLE_KRW_INPUT] * 3 + [STYLE_KRW]
+    assert ws["A2"].number_format == '#,##0"원"'
+
+
+def test_arrow_to_xlsx_matches_arrow_result(tmp_path):
+    params = load_params_from_json(os.path.join(ROOT, "policies", "2023.json"))
+    companies = pd.DataFrame([
+        dict(company=f"{i:03d}", industry_code="01110", company_size="중소기업", region="지방",
+             prev_total=10, curr_total=12 + i, prev_youth=0, curr_youth=1, converted_regular=0,
+             returned_from_parental_leave=0, tax_before_credit=None, followup_1=11 + i)
+        for i in range(25)
+    ])
+    arrow_path = str(tmp_path / "r.arrow")
+    run_batch_to_arrow([companies.iloc[:10], companies.iloc[10:]], params, arrow_path)
+    xlsx_path = str(tmp_path / "r.xlsx")
+    assert arrow_to_xlsx(arrow_path, xlsx_path) == 25
+
+    table = open_arrow_result(arrow_path)
+    ws = load_workbook(xlsx_path).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert list(rows[0]) == table.column_names
+    expected = table.to_pandas()
+    got = pd.DataFrame(rows[1:], columns=rows[0])
+    assert got["company"].tolist() == expected["company"].tolist()
+    for name in ("gross", "applied", "clawback_1", "curr_total"):
+        assert got[name].tolist() == pytest.approx(expected[name].tolist())
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""XLSX 스트리밍 읽기: 한글 머리글 자동 매핑, 머리글 행 자동 선택, 청크 분할, 문자열 열 보존."""
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from batch_engine import read_companies_chunked
+from excel_import import iter_xlsx_chunks, map_header, map_headers, normalize_header, read_xlsx_headers
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("기업명", "company"),
+    ("회사", "company"),
+    ("직전 상시근로자 수(명)", "prev_total"),
+    ("당해연도 청년등 상시근로자 수", "curr_youth"),
+    ("세전세액(원)", "tax_before_credit"),
+    ("KSIC 코드", "industry_code"),
+    ("정규직 전환 인원", "converted_regular"),
+    ("curr_total", "curr_total"),
+    ("PREV_TOTAL", "prev_total"),
+    ("비고", None),
+    (None, None),
+])
+def test_map_header(header, expected):
+    assert map_header(header) == expected
+
+
+def test_normalize_header_strips_units_but_not_whole_word():
+    assert normalize_header(" 상시근로자 수 (명) ") == "상시근로자"
+    assert normalize_header("명") == "명"
+
+
+def test_map_headers_keeps_unknown_and_first_duplicate():
+    mapping, unmapped = map_headers(["기업명", None, "비고", "회사", "직전상시", ""])
+    assert mapping == {0: "company", 2: "비고", 4: "prev_total"}
+    assert unmapped == ["비고"]
+
+
+def _write_xlsx(path, rows):
+    wb = Workbook()
+    ws = wb.active
+    for r in rows:
+        ws.append(r)
+    wb.save(path)
+    return str(path)
+
+
+HEADER = ["기업명", "업종코드", "기업규모", "지역", "직전 상시근로자 수", "당해 상시근로자 수",
+          "직전 청년등", "당해 청년등", "세전세액(원)", "비고"]
+
+
+def _data_rows(n):
+    return [[f"기업{i}" if i % 3 else 1000 + i, "01110" if i % 2 else 5621, "중소기업", "수도권",
+             10 + i, 12 + i, 1, 2 + (i % 3), 100_000_000 if i % 4 else None, "메모"] for i in range(n)]
+
+
+def test_header_row_found_after_title_rows_and_chunked(tmp_path):
+    rows = [["2024년 통합고용세액공제 대상 기업"], [None], HEADER] + _data_rows(12)
+    rows.insert(8, [None] * len(HEADER))   # 중간 빈 행은 건너뜀
+    path = _write_xlsx(tmp_path / "companies.xlsx", rows)
+
+    chunks = list(iter_xlsx_chunks(path, chunksize=5))
+    assert [len(c) for c in chunks] == [5, 5, 2]
+    df = pd.concat(chunks, ignore_index=True)
+    assert list(df.columns) == ["company", "industry_code", "company_size", "region", "prev_total", "curr_total",
+                                "prev_youth", "curr_youth", "tax_before_credit", "비고"]
+    # 문자열 열: 숫자로 저장된 값도 문자열, 앞자리 0 유지
+    assert df["company"].iloc[0] == "1000"
+    assert df["industry_code"].tolist()[:2] == ["5621", "01110"]
+    # 숫자 열은 숫자로 (빈칸은 NaN)
+    assert df["curr_total"].tolist() == [12 + i for i in range(12)]
+    assert df["tax_before_credit"].isna().tolist() == [i % 4 == 0 for i in range(12)]
+
+    mapping, unmapped = read_xlsx_headers(path)
+    assert mapping[0] == "company" and unmapped == ["비고"]
+
+
+def test_explicit_header_row_and_short_rows(tmp_path):
+    rows = [["기업명", "비고"], ["회사", "직전상시", "당해상시"], ["X", 5], ["Y", 6, 7]]
+    path = _write_xlsx(tmp_path / "h.xlsx", rows)
+    df = next(iter_xlsx_chunks(path, header_row=2))
+    assert list(df.columns) == ["company", "prev_total", "curr_total"]
+    assert df["company"].tolist() == ["X", "Y"]
+    assert df["prev_total"].tolist() == [5, 6]
+    assert df["curr_total"].isna().tolist() == [True, False]   # 짧은 행의 빠진 칸은 빈칸
+
+
+def test_empty_sheet(tmp_path):
+    path = _write_xlsx(tmp_path / "empty.xlsx", [])
+    assert list(iter_xlsx_chunks(path)) == []
+
+
+def test_read_companies_chunked_dispatches_xlsx(tmp_path):
+    path = _write_xlsx(tmp_path / "c.xlsx", [HEADER] + _data_rows(7))
+    chunks = list(read_companies_chunked(path, chunksize=3))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+    with pytest.raises(ValueError, match=".xls"):
+        list(read_companies_chunked(str(tmp_path / "old.xls")))
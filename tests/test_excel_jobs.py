@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""엑셀 작업 관리자: 같은 내용은 한 작업에 합류, 완료 작업은 LRU에 보관, 실패 작업은 다시 제출."""
+import threading
+from datetime import datetime
+
+from excel_jobs import ExcelJobManager, content_key
+
+
+def test_content_key_hashes_bytes_and_json():
+    assert content_key({"a": 1, "b": 2}, b"logo") == content_key({"b": 2, "a": 1}, b"logo")
+    assert content_key({"a": 1}, b"logo") != content_key({"a": 1}, b"logo2")
+
+
+def test_same_content_joins_first_job_and_keeps_its_created_at():
+    jobs = ExcelJobManager(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    def render(created_at):
+        calls.append(created_at)
+        release.wait(5)
+        return created_at.isoformat().encode()
+
+    key = content_key({"applied": 100})
+    first = jobs.submit(key, render, created_at=datetime(2024, 1, 1, 9, 0, 0))
+    second = jobs.submit(key, render, created_at=datetime(2024, 1, 1, 9, 0, 5))  # 진행 중 → 합류
+    release.set()
+    assert second is first
+    assert first.result(5) == b"2024-01-01T09:00:00"
+    third = jobs.submit(key, render, created_at=datetime(2024, 1, 2))  # 완료 후 → 보관된 결과
+    assert third is first
+    assert len(calls) == 1
+
+
+def test_finished_jobs_are_kept_up_to_max_results():
+    jobs = ExcelJobManager(max_workers=1, max_results=2)
+    futs = [jobs.submit(str(i), lambda i=i: bytes([i])) for i in range(3)]
+    for f in futs:
+        f.result(5)
+    jobs.submit("3", lambda: b"3").result(5)
+    assert jobs.get("0") is None and jobs.get("1") is None
+    assert jobs.get("2") is futs[2]
+
+
+def test_failed_job_is_resubmitted():
+    jobs = ExcelJobManager(max_workers=1)
+
+    def boom():
+        raise RuntimeError("x")
+
+    failed = jobs.submit("k", boom)
+    assert isinstance(failed.exception(5), RuntimeError)
+    retry = jobs.submit("k", lambda: b"ok")
+    assert retry is not failed and retry.result(5) == b"ok"
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""단건 보고서: 골격 복제(render_report_xlsx)가 build_report_xlsx와 같은 통합문서를 만드는지."""
+import io
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+
+from excel_report import build_report_xlsx, get_report_skeleton, prepare_logo, render_report_xlsx
+
+CREATED = datetime(2026, 3, 1, 9, 30, 0)
+SUMMARY = {"company_size": "중소기업", "region": "수도권", "retention_years": 3,
+           "gross": 27_300_000, "applied": 8_400_000, "clawback_method": "tiered"}
+INPUTS = {"tax_before_credit": 120_000_000, "prev_total": 50, "prev_youth": 10, "curr_total": 60,
+          "curr_youth": 14, "converted_regular": 2, "returned_parental": 1}
+LAST_CALC = {
+    "total_clawback": 1_234_567,
+    "schedule_records": [
+        {"연차": 1, "사후연도 상시": 58, "사후연도 청년등": 12, "추징세액": 280_000},
+        {"연차": 2, "사후연도 상시": 57.5, "사후연도 청년등": None, "추징세액": 420_000},
+        {"연차": 3, "사후연도 상시": 55, "사후연도 청년등": 11, "추징세액": 534_567},
+        {"연차": 4, "사후연도 상시": 54, "사후연도 청년등": 10, "추징세액": 0},
+    ],
+}
+
+
+def _logo_png() -> bytes:
+    from PIL import Image
+    out = io.BytesIO()
+    Image.new("RGB", (800, 200), (10, 120, 200)).save(out, format="PNG")
+    return out.getvalue()
+
+
+def _cells(data: bytes):
+    wb = load_workbook(io.BytesIO(data))
+    out = {}
+    for ws in wb.worksheets:
+        out[ws.title] = {
+            "cells": [(c.coordinate, c.value, c.font.b, c.fill.fgColor.rgb if c.fill.fill_type else None)
+                      for row in ws.iter_rows() for c in row if c.value is not None],
+            "widths": {k: d.width for k, d in ws.column_dimensions.items() if d.width},
+            "images": len(ws._images),
+        }
+    return out
+
+
+@pytest.mark.parametrize("with_logo", [False, True])
+@pytest.mark.parametrize("company", ["", "A&B <주식회사>", " 앞뒤 공백 "])
+def test_skeleton_matches_build(with_logo, company):
+    logo = _logo_png() if with_logo else None
+    expected = build_report_xlsx(SUMMARY, INPUTS, LAST_CALC, company, logo_png=logo, created_at=CREATED)
+    actual = render_report_xlsx(SUMMARY, INPUTS, LAST_CALC, company, logo_png=logo, created_at=CREATED)
+    assert _cells(actual) == _cells(expected)
+
+
+def test_skeleton_without_schedule_and_empty_inputs():
+    expected = build_report_xlsx(None, None, None, created_at=CREATED)
+    actual = render_report_xlsx(None, None, None, created_at=CREATED)
+    assert _cells(actual) == _cells(expected)
+
+
+def test_skeleton_is_reused_per_logo():
+    prepared = prepare_logo(_logo_png())
+    assert prepared is not None
+    assert get_report_skeleton(prepared) is get_report_skeleton(prepared)
+    assert get_report_skeleton(prepared) is not get_report_skeleton(None)
+
+
+def test_created_at_goes_to_document_properties():
+    wb = load_workbook(io.BytesIO(render_report_xlsx(SUMMARY, INPUTS, LAST_CALC, created_at=CREATED)))
+    assert wb.properties.created == CREATED
+    assert wb["결과요약"]["B2"].value == "2026-03-01 09:30:00"
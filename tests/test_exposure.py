@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""추징 노출 예측: 노출 행렬 / 시나리오 추징 행렬 ↔ (기업, 공제연도, 사후연차)마다 calc_clawback 직접 호출."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from employment_tax_credit_calc import calc_clawback
+from exposure import exposure_matrix, forecast_exposure, headcount_paths
+
+TIERS = {"0.0": 0.0, "0.1": 0.5, "0.3": 1.0}
+
+
+def _history(seed=11, n_companies=25, years=range(2020, 2025)):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for c in range(n_companies):
+        retention = int(rng.choice([2, 3]))
+        heads = float(rng.integers(5, 80))
+        for y in years:
+            heads = max(0.0, heads + float(rng.integers(-8, 9)) + (0.5 if rng.random() < 0.2 else 0.0))
+            if rng.random() < 0.15:
+                continue  # 그해 기록 없음 (인원은 앞 연도 값 이어 씀, 공제액 0)
+            rows.append(dict(company=f"c{c}", tax_year=y, applied=int(rng.integers(0, 50_000_000)),
+                             curr_total=heads, retention_years=retention))
+    return pd.DataFrame(rows)
+
+
+def _reference(df, change, method, tiers):
+    """(기업, 공제연도, 사후연차)마다 calc_clawback을 부르는 기준 계산."""
+    y0, y1 = int(df["tax_year"].min()), int(df["tax_year"].max())
+    k = int(df["retention_years"].max())
+    years = list(range(y0, y1 + k + 1))
+    exposure, claw = {}, {}
+    for company, g in df.groupby("company", sort=False):
+        rec = g.set_index("tax_year")
+        path, last = {}, np.nan
+        for y in range(y0, y1 + 1):
+            if y in rec.index:
+                last = float(rec.loc[y, "curr_total"])
+            path[y] = last
+        for y in range(y1 + 1, y1 + k + 1):
+            path[y] = path[y - 1] * (1.0 + change)
+        e = dict.fromkeys(years, 0)
+        c = dict.fromkeys(years, 0)
+        for s, r in rec.iterrows():
+            for lag in range(1, int(r["retention_years"]) + 1):
+                e[s + lag] += int(r["applied"])
+                c[s + lag] += calc_clawback(int(r["applied"]), float(r["curr_total"]), path[s + lag],
+                                            int(r["retention_years"]), lag, method, tiers)
+        exposure[company] = [e[y] for y in years]
+        claw[company] = [c[y] for y in years]
+    return years, exposure, claw
+
+
+@pytest.mark.parametrize("method", ["proportional", "all_or_nothing", "tiered"])
+@pytest.mark.parametrize("change", [0.0, -0.07])
+def test_forecast_matches_calc_clawback(method, change):
+    df = _history()
+    tiers = TIERS if method == "tiered" else None
+    fc = forecast_exposure(df, {"s": change}, method, tiers)
+    years, exposure, claw = _reference(df, change, method, tiers)
+
+    assert fc.years == years
+    for i, company in enumerate(fc.companies):
+        assert fc.exposure[i].tolist() == exposure[company], company
+        assert fc.clawback["s"][i].tolist() == claw[company], company
+    totals = fc.totals()
+    assert totals["at_risk"].sum() == sum(sum(v) for v in exposure.values())
+    assert totals["clawback_s"].sum() == sum(sum(v) for v in claw.values())
+
+
+def test_exposure_matrix_per_year_retention():
+    applied = np.array([[100, 200, 300]])
+    retention = np.array([[1, 3, 2]])
+    # 2020분: 2021 / 2021분: 2022~2024 / 2022분: 2023~2024
+    assert exposure_matrix(applied, retention).tolist() == [[0, 100, 200, 500, 500, 0]]
+
+
+def test_headcount_paths_fill_and_growth():
+    actual = np.array([[10.0, np.nan, 8.0], [np.nan, 5.0, np.nan]])
+    paths = headcount_paths(actual, 6, [-0.5, 0.0])
+    assert paths[0].tolist() == [10.0, 10.0, 8.0, 4.0, 4.0, 4.0]
+    assert np.isnan(paths[1, 0])
+    assert paths[1, 1:].tolist() == [5.0, 5.0, 2.5, 2.5, 2.5]
+
+
+def test_to_frame_lists_only_exposed_cells():
+    df = pd.DataFrame(dict(company=["A", "B"], tax_year=[2024, 2024], applied=[1000, 0],
+                           curr_total=[10, 10], retention_years=[2, 2]))
+    frame = forecast_exposure(df, {"감원": -0.2}).to_frame()
+    assert frame[["company", "year", "at_risk"]].values.tolist() == [["A", 2025, 1000], ["A", 2026, 1000]]
+    assert frame["clawback_감원"].tolist() == [200, 360]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""제외업종 색인: KSIC 앞자리 일치(가장 긴 앞자리 우선), 코드 정규화, 업종명 일치, 열 분류 = 1건 분류."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from industry_index import compile_exclusions
+
+ENTRIES = ["5621:유흥주점업", "56211:일반 유흥주점업", "0111", "I56", "기타소비성서비스업", ""]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return compile_exclusions(ENTRIES)
+
+
+@pytest.mark.parametrize("code,expected", [
+    ("56211", "제외업종: 일반 유흥주점업 (KSIC 56211)"),   # 긴 앞자리 우선
+    ("56212", "제외업종: 유흥주점업 (KSIC 5621)"),
+    ("5621", "제외업종: 유흥주점업 (KSIC 5621)"),
+    ("562", ""),                                          # 앞자리보다 짧은 코드는 해당 없음
+    ("56-21.3", "제외업종: 유흥주점업 (KSIC 5621)"),       # 하이픈/점 제거
+    (" 5621 ", "제외업종: 유흥주점업 (KSIC 5621)"),
+    (5621.0, "제외업종: 유흥주점업 (KSIC 5621)"),          # 숫자로 읽힌 코드
+    ("01110", "제외업종: KSIC 0111"),                      # 앞자리 0 유지
+    ("1110", ""),
+    ("i5621", "제외업종: KSIC I56"),                       # 대분류 문자는 대문자로
+    (None, ""),
+    (float("nan"), ""),
+])
+def test_match_prefix(index, code, expected):
+    assert index.match(code) == expected
+
+
+def test_name_only_entries(index):
+    assert index.match(None, "기타소비성서비스업") == "제외업종: 기타소비성서비스업"
+    assert index.match("", " 기타소비성서비스업 ") == "제외업종: 기타소비성서비스업"
+    assert index.match("1010", "기타소비성") == ""
+    # 코드가 맞으면 코드 사유 우선
+    assert index.match("5621", "기타소비성서비스업").endswith("(KSIC 5621)")
+
+
+def test_classify_matches_match(index):
+    rng = np.random.default_rng(3)
+    pool = ["56211", "56219", "5621", "562", "01110", "0111", "011", "I5621", "4711", "", None, "56-211"]
+    names = ["기타소비성서비스업", "음식점업", None, ""]
+    codes = [pool[i] for i in rng.integers(0, len(pool), 500)]
+    name_col = [names[i] for i in rng.integers(0, len(names), 500)]
+    # 원래 index가 0부터가 아니어도 위치 기준으로 분류
+    out = index.classify(pd.Series(codes, index=range(1000, 1500)), pd.Series(name_col))
+    assert list(out) == [index.match(c, n) for c, n in zip(codes, name_col)]
+
+
+def test_classify_numeric_column_and_names_only():
+    index = compile_exclusions(["5621", "유흥주점업"])
+    assert list(index.classify(pd.Series([5621, 4711]))) == ["제외업종: KSIC 5621", ""]
+    assert list(index.classify(None, pd.Series(["유흥주점업", "x"]))) == ["제외업종: 유흥주점업", ""]
+
+
+def test_empty_index():
+    index = compile_exclusions(None)
+    assert not index
+    assert index.match("5621") == ""
+    assert index.entries() == []
+    assert bool(compile_exclusions(["", "  "])) is False
+
+
+def test_entries_longest_prefix_first(index):
+    keys = [k for k, _ in index.entries()]
+    assert keys == ["56211", "0111", "5621", "I56", "기타소비성서비스업"]
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""파라미터 스키마: 오류 경로 보고, JSON 형식 오류, 정상 설정 변환."""
+import copy
+import json
+import os
+
+import pytest
+
+from employment_tax_credit_calc import CompanySize, Region, load_params_from_json
+from params_schema import ParamsValidationError, parse_params_dict, validate_params_dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLICY = os.path.join(ROOT, "policies", "2023.json")
+
+
+@pytest.fixture
+def cfg():
+    with open(POLICY, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_valid_policy_parses(cfg):
+    assert validate_params_dict(cfg) == []
+    params = parse_params_dict(cfg)
+    assert params.per_head_basic[CompanySize.SME][Region.SEOUL_METRO] == 1200000
+
+
+def test_all_errors_reported_with_paths(cfg):
+    bad = copy.deepcopy(cfg)
+    bad["per_head_basic"]["중소기업"]["수도권"] = -1000
+    bad["per_head_youth"]["소기업"] = {"수도권": 1, "지방": 1}
+    bad["min_tax_limit_rate"] = 1.5
+    bad["retention_yeras"] = 3
+    del bad["retention_years"]
+    bad["tiered_thresholds"] = {"none": 0.5, "half": 0.2, "full": 0.9}
+    paths = {e.path for e in validate_params_dict(bad)}
+    assert paths == {
+        "$.per_head_basic.중소기업.수도권",
+        "$.per_head_youth.소기업",
+        "$.min_tax_limit_rate",
+        "$.retention_yeras",
+        "$.retention_years",
+        "$.tiered_thresholds",
+    }
+    with pytest.raises(ParamsValidationError) as ei:
+        parse_params_dict(bad)
+    assert len(ei.value.errors) == len(paths)
+
+
+def test_clawback_tier_order(cfg):
+    bad = dict(cfg, clawback_tiers=[[0.0, 0.5], [0.0, 0.6], [0.5, 0.4]])
+    paths = [e.path for e in validate_params_dict(bad)]
+    assert paths == ["$.clawback_tiers[1]", "$.clawback_tiers[2]"]
+
+
+def test_non_object_root():
+    errors = validate_params_dict([1, 2])
+    assert [e.path for e in errors] == ["$"]
+
+
+def test_load_params_from_json_decode_error(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"per_head_basic": ', encoding="utf-8")
+    with pytest.raises(ParamsValidationError) as ei:
+        load_params_from_json(str(path))
+    (err,) = ei.value.errors
+    assert err.path == "$"
+    assert str(path) in err.message
+
+
+def test_load_params_from_json_schema_error(tmp_path, cfg):
+    cfg["retention_years"]["중소기업"] = 0
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps(cfg, ensure_ascii=False), encoding="utf-8")
+    with pytest.raises(ParamsValidationError) as ei:
+        load_params_from_json(str(path))
+    assert [e.path for e in ei.value.errors] == ["$.retention_years.중소기업"]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""파라미터 감시자: 변경 시 교체, 같은 내용은 새 버전 없음, 잘못된 파일은 이전 버전 유지, 보관 개수/아카이브."""
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from params_schema import ParamsValidationError
+from params_watcher import ParamsWatcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLICY_JSON = os.path.join(ROOT, "policies", "2023.json")
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = tmp_path / "params.json"
+    shutil.copy(POLICY_JSON, p)
+    return p
+
+
+def _write(path, text):
+    # 같은 크기/같은 시각에 다시 써도 변경으로 보이도록 수정시각을 앞으로
+    st = path.stat() if path.exists() else None
+    path.write_text(text, encoding="utf-8")
+    if st is not None:
+        os.utime(path, ns=(st.st_atime_ns, max(path.stat().st_mtime_ns, st.st_mtime_ns) + 1_000_000))
+
+
+def _with(path, **changes):
+    cfg = json.loads(path.read_text(encoding="utf-8"))
+    cfg.update(changes)
+    return json.dumps(cfg, ensure_ascii=False)
+
+
+def test_reload_on_change_and_keep_old_snapshot(path):
+    reloaded = []
+    w = ParamsWatcher(str(path), on_reload=reloaded.append)
+    first = w.current
+    assert first.version == 1
+    assert w.check() is False               # 변경 없음
+
+    _write(path, _with(path, per_head_conversion=900000))
+    assert w.check() is True
+    assert w.current.version == 2
+    assert w.current.params.per_head_conversion == 900000
+    assert first.params.per_head_conversion == 800000   # 이미 받은 스냅샷은 그대로
+    assert reloaded == [w.current]
+    assert w.get(1) is first and w.find(first.fingerprint) is first
+
+
+def test_same_content_does_not_create_version(path):
+    w = ParamsWatcher(str(path))
+    _write(path, json.dumps(json.loads(path.read_text(encoding="utf-8")), ensure_ascii=False, indent=4))
+    assert w.check() is False
+    assert [s.version for s in w.history()] == [1]
+
+
+def test_invalid_file_keeps_previous_version_until_fixed(path):
+    errors = []
+    w = ParamsWatcher(str(path), on_error=errors.append)
+    good = w.current
+
+    _write(path, '{"per_head_basic": ')
+    assert w.check() is False
+    assert w.current is good
+    assert isinstance(w.last_error, ParamsValidationError)
+    assert w.check() is False               # 같은 파일 상태는 알림 한 번
+    assert len(errors) == 1
+
+    with open(POLICY_JSON, encoding="utf-8") as f:
+        cfg = json.load(f)
+    _write(path, json.dumps(dict(cfg, retention_years={"중소기업": 0, "중견기업": 3, "대기업": 2}), ensure_ascii=False))
+    assert w.check() is False               # 스키마 오류도 이전 버전 유지
+    assert w.current is good
+    assert len(errors) == 2
+
+    _write(path, json.dumps(dict(cfg, retention_years={"중소기업": 3, "중견기업": 3, "대기업": 3}), ensure_ascii=False))
+    assert w.check() is True
+    assert w.last_error is None
+    assert w.current.version == 2
+
+
+def test_keep_versions_and_archive(path, tmp_path):
+    archive = tmp_path / "archive"
+    w = ParamsWatcher(str(path), keep_versions=2, archive_dir=str(archive))
+    for amount in (810000, 820000, 830000):
+        _write(path, _with(path, per_head_conversion=amount))
+        assert w.check() is True
+    assert [s.version for s in w.history()] == [3, 4]
+    assert len(list(archive.glob("*.json"))) == 4
+    saved = json.loads((archive / f"{w.current.fingerprint}.json").read_text(encoding="utf-8"))
+    assert saved["per_head_conversion"] == 830000
+
+
+def test_first_load_error_is_raised(tmp_path):
+    p = tmp_path / "bad.json"
+    p.write_text("[]", encoding="utf-8")
+    with pytest.raises(ParamsValidationError):
+        ParamsWatcher(str(p))
+
+
+def test_background_thread_picks_up_change(path):
+    with ParamsWatcher(str(path), poll_interval=0.05) as w:
+        _write(path, _with(path, per_head_conversion=990000))
+        deadline = time.monotonic() + 5
+        while w.current.version == 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert w.current.params.per_head_conversion == 990000
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""시행령 레지스트리: 과세연도별 버전 선택, 스냅샷 재사용/무효화, 연도 혼합 일괄 계산."""
+import dataclasses
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import policy_registry
+from batch_engine import compute_batch
+from employment_tax_credit_calc import load_params_from_json, params_to_dict
+from policy_registry import PolicyRegistry, load_registry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLICY_JSON = os.path.join(ROOT, "policies", "2023.json")
+
+
+@pytest.fixture(scope="module")
+def params_2023():
+    return load_params_from_json(POLICY_JSON)
+
+
+@pytest.fixture(scope="module")
+def params_2025(params_2023):
+    return dataclasses.replace(params_2023, per_head_conversion=1_300_000, max_credit_total=20_000_000,
+                               excluded_industries=["5621"])
+
+
+@pytest.fixture
+def policy_dir(tmp_path, params_2025):
+    d = tmp_path / "policies"
+    d.mkdir()
+    shutil.copy(POLICY_JSON, d / "2023.json")
+    # effective_year가 없으면 파일명 앞 4자리 사용
+    cfg = params_to_dict(params_2025)
+    (d / "2025_개정.json").write_text(json.dumps(cfg, ensure_ascii=False), encoding="utf-8")
+    return d
+
+
+def test_version_for_year(params_2023, params_2025):
+    reg = PolicyRegistry()
+    reg.register(2025, params_2025, "개정")
+    reg.register(2023, params_2023, "당초")
+    assert reg.years == [2023, 2025]
+    with pytest.raises(KeyError):
+        reg.version_for_year(2022)
+    assert reg.version_for_year(2023).name == "당초"
+    assert reg.version_for_year(2024).effective_year == 2023
+    assert reg.params_for_year(2030) is params_2025
+
+    reg.register(2025, params_2023, "재개정")   # 같은 시행연도는 교체
+    assert len(reg) == 2
+    assert reg.version_for_year(2026).name == "재개정"
+
+
+def test_snapshot_is_reused_until_sources_change(policy_dir, tmp_path, monkeypatch, params_2025):
+    snap = str(tmp_path / "cache" / "policy_snapshot.npz")
+    reg = load_registry(str(policy_dir), snap)
+    assert reg.years == [2023, 2025]
+    assert os.path.exists(snap)
+
+    # 서명이 같으면 JSON을 다시 읽지 않음
+    def fail(path):
+        raise AssertionError(f"JSON을 다시 읽음: {path}")
+
+    monkeypatch.setattr(policy_registry, "read_policy_file", fail)
+    cached = load_registry(str(policy_dir), snap)
+    assert cached.years == [2023, 2025]
+    assert cached.version_for_year(2025).name == "2025_개정"
+    assert cached.params_for_year(2025) == params_2025
+    assert (cached.tensor.basic == reg.tensor.basic).all()
+
+    # 원본이 바뀌면 다시 컴파일
+    monkeypatch.undo()
+    cfg = json.loads((policy_dir / "2023.json").read_text(encoding="utf-8"))
+    cfg["per_head_conversion"] = 1
+    (policy_dir / "2023.json").write_text(json.dumps(cfg, ensure_ascii=False), encoding="utf-8")
+    assert load_registry(str(policy_dir), snap).params_for_year(2023).per_head_conversion == 1
+
+
+def test_file_without_year_is_rejected(tmp_path):
+    d = tmp_path / "p"
+    d.mkdir()
+    cfg = json.loads(open(POLICY_JSON, encoding="utf-8").read())
+    del cfg["effective_year"]
+    (d / "개정안.json").write_text(json.dumps(cfg, ensure_ascii=False), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_registry(str(d))
+
+
+def test_compute_uses_each_rows_tax_year(params_2023, params_2025):
+    reg = PolicyRegistry()
+    reg.register(2023, params_2023)
+    reg.register(2025, params_2025)
+    base = dict(company_size="중소기업", region="수도권", prev_total=10, curr_total=30, prev_youth=0,
+                curr_youth=5, converted_regular=4, returned_from_parental_leave=0, tax_before_credit=None,
+                followup_1=25, followup_2=31, industry_code="1010")
+    df = pd.DataFrame([dict(base, tax_year=2022), dict(base, tax_year=2023), dict(base, tax_year=2024),
+                       dict(base, tax_year=2025), dict(base, tax_year=2025, industry_code="56211"),
+                       dict(base, tax_year=None)])
+    res = reg.compute(df, tax_year=2025)
+
+    assert res["error"].iloc[0] == "과세연도에 해당하는 시행령 없음"
+    expect_2023 = compute_batch(df.iloc[[1]], params_2023).iloc[0]
+    expect_2025 = compute_batch(df.iloc[[3]], params_2025).iloc[0]
+    for i, expected in ((1, expect_2023), (2, expect_2023), (3, expect_2025), (5, expect_2025)):
+        for col in ("gross", "applied", "clawback_1", "total_clawback"):
+            assert res[col].iloc[i] == expected[col], (i, col)
+    assert res["applied"].iloc[3] == 20_000_000 < res["applied"].iloc[1]
+    assert res["excluded"].iloc[4] != "" and res["applied"].iloc[4] == 0
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""기업별 보고서 ZIP: 오류/업종 제외 행은 건너뛰고 skipped.csv에 기록."""
+import csv
+import dataclasses
+import io
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from batch_engine import compute_batch
+from employment_tax_credit_calc import CompanySize, Region, load_params_from_json
+from report_bundle import SKIPPED_MANIFEST, build_report_bundle, payloads_from_batch, safe_filename
+
+POLICY_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "policies", "2023.json")
+
+
+@pytest.fixture(scope="module")
+def result():
+    params = dataclasses.replace(load_params_from_json(POLICY_JSON), excluded_industries=["0111"])
+    base = dict(company_size=CompanySize.SME.value, region=Region.NON_METRO.value, prev_total=10, curr_total=15,
+                prev_youth=0, curr_youth=2, tax_before_credit=None, followup_1=14)
+    df = pd.DataFrame([
+        dict(base, company="정상(주)", industry_code="25112"),
+        dict(base, company="오류(주)", industry_code="25112", company_size="개인"),
+        dict(base, company="농업(주)", industry_code="01110"),
+    ])
+    return compute_batch(df, params)
+
+
+def test_error_and_excluded_rows_are_listed_not_rendered(tmp_path, result):
+    skipped = []
+    out = tmp_path / "reports.zip"
+    stats = build_report_bundle(payloads_from_batch(result, skipped=skipped), str(out), workers=1, skipped=skipped)
+
+    assert stats["files"] == 1 and stats["skipped"] == 2
+    with zipfile.ZipFile(out) as zf:
+        assert sorted(zf.namelist()) == sorted([safe_filename("정상(주)", 0), SKIPPED_MANIFEST])
+        rows = list(csv.DictReader(io.StringIO(zf.read(SKIPPED_MANIFEST).decode("utf-8-sig"))))
+    assert [r["company"] for r in rows] == ["오류(주)", "농업(주)"]
+    assert rows[0]["error"] == "기업규모/지역 값 오류"
+    assert rows[1]["error"].startswith("업종 제외")
+
+
+def test_payload_carries_schedule(result):
+    (name, summary, inputs, last_calc, company), = payloads_from_batch(result.iloc[:1])
+    assert company == "정상(주)" and summary["applied"] == int(result["applied"].iloc[0])
+    assert last_calc["schedule_records"][0]["사후연도 상시"] == 14
+    assert inputs["curr_total"] == 15
+
+
+def test_safe_filename_strips_path_characters():
+    assert safe_filename('a/b:c*"d', 3) == "00003_a_b_c_d.xlsx"
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""급여대장 집계: (기업, 직원, 연월) 중복 제거, 색인 기간 제한, 청년등 판정."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from roster import (
+    EmployeeMonthIndex, HeadcountAccumulator, YouthRule, aggregate_roster, classify_youth, parse_year_month,
+)
+
+
+def _roster(n_rows=6000, seed=3):
+    rng = np.random.default_rng(seed)
+    ym = np.sort(rng.choice([y * 100 + m for y in (2023, 2024) for m in range(1, 13)], n_rows))
+    return pd.DataFrame({
+        "company": rng.choice(["A", "B", "C"], n_rows),
+        "employee_id": np.where(rng.random(n_rows) < 0.05, "", rng.integers(0, 60, n_rows).astype(str)),
+        "month": [f"{v // 100}-{v % 100:02d}" for v in ym],
+        "weight": rng.choice([1.0, 0.5, 0.75], n_rows),
+        "youth": rng.integers(0, 2, n_rows),
+    })
+
+
+def _brute_force(df):
+    d = df.assign(ym=parse_year_month(df["month"]), w=df["weight"].astype(float))
+    d["yw"] = d["w"] * (d["youth"] > 0)
+    blank = d["employee_id"].str.strip() == ""
+    g = d[~blank].groupby(["company", "employee_id", "ym"])[["w", "yw"]].max().reset_index()
+    rows = pd.concat([g, d[blank][["company", "employee_id", "ym", "w", "yw"]]])
+    return rows.groupby(["company", "ym"])[["w", "yw"]].sum().sort_index()
+
+
+def _chunks(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+@pytest.mark.parametrize("chunk", [97, 1000, 6000])
+def test_dedupe_matches_brute_force_for_any_chunk_size(chunk):
+    df = _roster()
+    m = aggregate_roster(_chunks(df, chunk)).monthly().set_index(["company", "ym"]).sort_index()
+    expected = _brute_force(df)
+    assert np.allclose(m["total"].to_numpy(), expected["w"].to_numpy())
+    assert np.allclose(m["youth"].to_numpy(), expected["yw"].to_numpy())
+
+
+def test_index_keeps_only_recent_months():
+    acc = HeadcountAccumulator(dedupe_window=1)
+    for c in _chunks(_roster(), 200):
+        acc.add(c)
+        assert len(acc.index._parts) <= 2  # 최근 연월 + 직전 1개월
+
+
+def test_unsorted_input_needs_unbounded_window():
+    df = _roster().sample(frac=1.0, random_state=1)
+    with pytest.raises(ValueError, match="연월 순"):
+        aggregate_roster(_chunks(df, 500))
+    m = aggregate_roster(_chunks(df, 500), dedupe_window=None).monthly().set_index(["company", "ym"]).sort_index()
+    assert np.allclose(m["total"].to_numpy(), _brute_force(df)["w"].to_numpy())
+
+
+def test_index_returns_only_increase_over_previous_max():
+    idx = EmployeeMonthIndex()
+    keys = np.array([5, 9], dtype=np.uint64)
+    ym = np.array([202401, 202401])
+    assert [a.tolist() for a in idx.update(keys, ym, np.array([0.5, 1.0]), np.array([0.0, 1.0]))] == [[0.5, 1.0], [0.0, 1.0]]
+    assert [a.tolist() for a in idx.update(keys, ym, np.array([1.0, 0.5]), np.array([1.0, 0.0]))] == [[0.5, 0.0], [1.0, 0.0]]
+
+
+def test_bool_youth_text_and_missing_prior_year():
+    df = pd.DataFrame({
+        "company": ["A"] * 4, "employee_id": ["1", "2", "3", "4"],
+        "month": ["2024-01"] * 4, "youth": ["Y", "N", "예", "true"],
+    })
+    acc = aggregate_roster([df])
+    assert acc.monthly()["youth"].tolist() == [3.0]
+    f = acc.heads_frame(2024)
+    assert np.isnan(f["prev_total"].iloc[0]) and f["curr_total"].iloc[0] == 0.33
+    with pytest.raises(KeyError):
+        acc.heads("A", 2024)
+
+
+def test_classify_youth_bands_and_military_extension():
+    rule = YouthRule(bands=((15, 34),), military_cap_years=6)
+    birth = np.array(["1988-06-01", "1988-06-01", "2000-01-01", None], dtype="datetime64[D]")
+    ref = np.array(["2024-12-31"] * 4, dtype="datetime64[D]")
+    flags = classify_youth(birth, ref, rule, military_months=np.array([0, 24, 0, 0]))
+    assert flags.tolist() == [False, True, True, False]
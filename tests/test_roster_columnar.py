@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""열 기반 급여대장(memmap) ↔ CSV 청크 집계(aggregate_roster) 동등성."""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from roster import YouthRule, aggregate_roster, read_roster_chunked
+from roster_columnar import META_FILE, ColumnarRoster, convert_roster_file
+
+
+def _write(tmp_path, df):
+    path = tmp_path / "payroll.csv"
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+    return str(path)
+
+
+def _random_roster(n=5000, seed=11):
+    rng = np.random.default_rng(seed)
+    ym = np.sort(rng.choice([y * 100 + m for y in (2023, 2024) for m in range(1, 13)], n))
+    birth = pd.Timestamp("1985-01-01") + pd.to_timedelta(rng.integers(0, 6000, n), unit="D")
+    return pd.DataFrame({
+        "company": rng.choice(["A", "B", "C"], n),
+        "employee_id": np.where(rng.random(n) < 0.05, "", rng.integers(0, 50, n).astype(str)),
+        "month": [f"{v // 100}-{v % 100:02d}" for v in ym],
+        "weight": rng.choice([1.0, 0.5, 0.75, 0.0], n),
+        "birth_date": birth.strftime("%Y-%m-%d"),
+    })
+
+
+def _assert_same(a, b):
+    a = a.sort_values(["company", "ym"]).reset_index(drop=True)
+    b = b.sort_values(["company", "ym"]).reset_index(drop=True)
+    assert a[["company", "ym"]].astype(str).equals(b[["company", "ym"]].astype(str))
+    assert np.allclose(a["total"].to_numpy(dtype=float), b["total"].to_numpy(dtype=float))
+    assert np.allclose(a["youth"].to_numpy(dtype=float), b["youth"].to_numpy(dtype=float))
+
+
+def test_duplicate_employee_month_counts_once(tmp_path):
+    df = pd.DataFrame({"company": ["A"] * 4, "employee_id": ["1", "1", "2", "3"],
+                       "month": ["2024-01"] * 4, "weight": [1, 1, 1, 1]})
+    path = _write(tmp_path, df)
+    expected = aggregate_roster(read_roster_chunked(path, path)).heads_frame(2024)
+    got = convert_roster_file(path, str(tmp_path / "bin")).accumulator().heads_frame(2024)
+    assert expected["curr_total"].iloc[0] == got["curr_total"].iloc[0] == 0.25
+
+
+@pytest.mark.parametrize("params_rule", [None, YouthRule(bands=((15, 34),))])
+def test_memmap_matches_csv_aggregation(tmp_path, params_rule):
+    path = _write(tmp_path, _random_roster())
+    expected = aggregate_roster(read_roster_chunked(path, path, chunksize=700), youth_rule=params_rule)
+    table = convert_roster_file(path, str(tmp_path / "bin"), chunksize=900)
+    got = table.accumulator(youth_rule=params_rule)
+    _assert_same(expected.monthly(), got.monthly())
+    assert expected.heads_frame(2024).equals(got.heads_frame(2024))
+
+
+def test_no_dedupe_matches_too(tmp_path):
+    path = _write(tmp_path, _random_roster(seed=5))
+    expected = aggregate_roster(read_roster_chunked(path, path), dedupe=False)
+    got = convert_roster_file(path, str(tmp_path / "bin")).accumulator(dedupe=False)
+    _assert_same(expected.monthly(), got.monthly())
+
+
+def test_old_format_is_reconverted(tmp_path):
+    path = _write(tmp_path, _random_roster(200))
+    out = str(tmp_path / "bin")
+    convert_roster_file(path, out)
+    meta_path = tmp_path / "bin" / META_FILE
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["format_version"] = 1
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    with pytest.raises(ValueError):
+        ColumnarRoster(out)
+    assert len(convert_roster_file(path, out)) == 200
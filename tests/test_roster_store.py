@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""월별 인원 저장소: 월 단위 델타 반영 = 전체 재집계, 재반영 멱등, 다른 기업/달 보존, 영향 기업만 공제액 재계산."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from employment_tax_credit_calc import load_params_from_json
+from roster import aggregate_roster
+from roster_store import HeadcountStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _roster(seed=5, companies=("A", "B", "C"), years=(2023, 2024)):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for c in companies:
+        for y in years:
+            for m in range(1, 13):
+                n = int(rng.integers(5, 15))
+                rows.append(pd.DataFrame({
+                    "company": c,
+                    "employee_id": [f"{c}{i}" for i in range(n)],
+                    "month": f"{y}-{m:02d}",
+                    "weight": rng.choice([1.0, 0.5], n),
+                    "youth": rng.integers(0, 2, n),
+                }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def _by_month(df):
+    return [g for _, g in df.groupby("month", sort=True)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = HeadcountStore(str(tmp_path / "heads.db"))
+    yield s
+    s.close()
+
+
+def test_monthly_deltas_match_full_aggregation(store):
+    df = _roster()
+    for part in _by_month(df):
+        store.apply_roster([part])
+    expected = aggregate_roster([df]).heads_frame(2024).sort_values("company").reset_index(drop=True)
+    actual = store.heads_frame(2024)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    assert store.heads("A", 2024).curr_total == pytest.approx(expected.loc[0, "curr_total"])
+    with pytest.raises(KeyError, match="직전 연도"):
+        store.heads("A", 2023)
+
+
+def test_reapplying_a_month_replaces_only_its_cells(store):
+    df = _roster()
+    store.apply_roster([df])
+    before_b = store.monthly("B")
+    before_a = store.monthly("A")
+
+    # A의 2024-07만 다시 제출 (인원 절반) → A의 그 달만 바뀌고 B/C와 A의 다른 달은 그대로
+    july = df[(df["company"] == "A") & (df["month"] == "2024-07")]
+    res = store.apply_roster([july.iloc[: len(july) // 2]])
+    assert res.companies == ["A"] and res.months == [202407] and res.years == [2024]
+    pd.testing.assert_frame_equal(store.monthly("B"), before_b)
+    after_a = store.monthly("A")
+    changed = after_a["total"] != before_a["total"]
+    assert after_a.loc[changed, "ym"].tolist() == [202407]
+
+    # 같은 델타를 한 번 더 넣어도 결과 동일
+    snapshot = store.heads_frame(2024)
+    store.apply_roster([july.iloc[: len(july) // 2]])
+    pd.testing.assert_frame_equal(store.heads_frame(2024), snapshot)
+
+
+def test_update_recomputes_credits_for_delta_companies_only(store):
+    params = load_params_from_json(os.path.join(ROOT, "policies", "2023.json"))
+    store.set_companies(pd.DataFrame({
+        "company": ["A", "B", "C"], "company_size": "중소기업", "region": "수도권",
+        "tax_before_credit": [None, 50_000_000, None],
+    }))
+    df = _roster()
+    res = store.update([df], params)
+    assert sorted(res.credits["company"].unique()) == ["A", "B", "C"]
+    first = store.credits(2024).set_index("company")
+    # 2023년은 직전 연도 기록이 없어 오류 행
+    assert store.credits(2023)["error"].notna().all()
+
+    extra = pd.DataFrame({"company": "C", "employee_id": [f"new{i}" for i in range(30)], "month": "2024-12",
+                          "weight": 1.0, "youth": 1})
+    res = store.update([pd.concat([df[(df["company"] == "C") & (df["month"] == "2024-12")], extra])], params)
+    assert res.companies == ["C"]
+    assert sorted(res.credits["company"].unique()) == ["C"]
+    second = store.credits(2024).set_index("company")
+    assert second.loc["C", "gross"] > first.loc["C", "gross"]
+    assert second.loc[["A", "B"], "gross"].tolist() == first.loc[["A", "B"], "gross"].tolist()
+
+
+def test_observed_months_and_reopen(tmp_path):
+    path = str(tmp_path / "heads.db")
+    s = HeadcountStore(path, months="observed")
+    df = _roster(companies=("A",), years=(2024,))
+    s.apply_roster([df[df["month"] <= "2024-03"]])
+    expected = aggregate_roster([df[df["month"] <= "2024-03"]], months="observed").yearly()
+    s.close()
+
+    s = HeadcountStore(path, months="observed")
+    assert s.heads_frame(2024)["curr_total"].iloc[0] == pytest.approx(expected["avg_total"].iloc[0])
+    s.close()
+    with pytest.raises(ValueError):
+        HeadcountStore(path, months="weekly")
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""시나리오 저장소: 테넌트 격리, 추징 비율 조회, 계산기 CLI 저장 경로."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from scenario_store import ScenarioRecord, ScenarioStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = ScenarioStore(str(tmp_path / "scenarios.db"))
+    yield s
+    s.close()
+
+
+def _record(tenant, company, applied=1000, clawback=0, **kw):
+    return ScenarioRecord(gross=applied, applied=applied, retention_years=2, total_clawback=clawback,
+                          company=company, tax_year=2024, tenant=tenant, **kw)
+
+
+def test_query_is_scoped_to_tenant(store):
+    store.add_scenarios([_record("a", "X"), _record("a", "Y"), _record("b", "X")])
+    assert sorted(r["company"] for r in store.query("a")) == ["X", "Y"]
+    assert [r["company"] for r in store.query("b")] == ["X"]
+    assert store.query("c") == []
+    with pytest.raises(ValueError):
+        store.query(None)
+
+
+def test_min_clawback_ratio_and_schedule(store):
+    sid = store.add_scenario(_record("a", "X", applied=1000, clawback=600,
+                                     schedule=[{"연차": 1, "사후연도 상시": 9, "사후연도 청년등": 0, "추징세액": 600}]))
+    store.add_scenario(_record("a", "Y", applied=1000, clawback=100))
+    assert [r["company"] for r in store.query("a", min_clawback_ratio=0.5)] == ["X"]
+    assert store.get(sid)["schedule_records"][0]["추징세액"] == 600
+
+
+def test_calculator_cli_saves_under_tenant(tmp_path):
+    db = str(tmp_path / "h.db")
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "employment_tax_credit_calc.py"),
+         "--company-size", "중소기업", "--region", "지방", "--params-json", os.path.join(ROOT, "policies", "2023.json"),
+         "--prev-total", "10", "--curr-total", "15", "--company", "X", "--tax-year", "2024",
+         "--history-db", db, "--tenant", "acme"],
+        check=True, capture_output=True,
+    )
+    s = ScenarioStore(db)
+    try:
+        assert [r["company"] for r in s.query("acme")] == ["X"]
+        assert s.query("default") == []
+    finally:
+        s.close()
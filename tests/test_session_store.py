@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""세션 저장소: 예산 초과 시 LRU spill, get()으로 복원, append 크기 누적, 세션 종료 시 정리."""
+import gc
+import os
+
+from session_store import SessionStore, _Spilled, get_session_store
+
+KB = 1024
+
+
+def _store(tmp_path, budget=100 * KB, threshold=10 * KB):
+    backing = {}
+    return backing, SessionStore(backing, budget_bytes=budget, large_threshold=threshold,
+                                 spill_dir=str(tmp_path / "spill"))
+
+
+def test_lru_spill_and_reload(tmp_path):
+    backing, store = _store(tmp_path)
+    store.set("a", b"a" * 40 * KB)
+    store.set("b", b"b" * 40 * KB)
+    store.get("a")                      # a를 최근 사용으로
+    store.set("c", b"c" * 40 * KB)      # 120KB > 100KB → 가장 덜 쓰인 b가 내려감
+
+    assert isinstance(backing["b"], _Spilled)
+    assert not isinstance(backing["a"], _Spilled)
+    usage = store.usage()
+    assert usage["keys_on_disk"] == ["b"]
+    assert usage["memory_bytes"] == 80 * KB
+    assert 0 < usage["disk_bytes"] < 40 * KB
+
+    spill_file = backing["b"].path
+    assert store.get("b") == b"b" * 40 * KB   # 복원되면서 다른 값(a)이 내려감
+    assert not os.path.exists(spill_file)
+    assert isinstance(backing["a"], _Spilled)
+    assert store.evictions == 2
+    assert store["a"] == b"a" * 40 * KB
+
+
+def test_small_values_are_not_spilled(tmp_path):
+    backing, store = _store(tmp_path, budget=10 * KB, threshold=10 * KB)
+    for i in range(5):
+        store.set(f"s{i}", "x" * 4 * KB)
+    assert store.usage()["keys_on_disk"] == []
+    assert store.usage()["memory_bytes"] == 20 * KB
+
+
+def test_overwrite_removes_spill_file(tmp_path):
+    backing, store = _store(tmp_path)
+    store.set("a", b"a" * 60 * KB)
+    store.set("b", b"b" * 60 * KB)
+    path = backing["a"].path
+    store.set("a", b"new")
+    assert not os.path.exists(path)
+    assert store.get("a") == b"new"
+
+
+def test_append_adds_item_size(tmp_path):
+    backing, store = _store(tmp_path)
+    store.append("chat", {"role": "user", "content": "x" * 1000})
+    first = store.usage()["keys_in_memory"]["chat"]
+    store.append("chat", {"role": "assistant", "content": "y" * 1000})
+    assert store.usage()["keys_in_memory"]["chat"] > first + 1000
+    assert [m["role"] for m in store.get("chat")] == ["user", "assistant"]
+
+
+def test_pop(tmp_path):
+    backing, store = _store(tmp_path)
+    store.set("a", b"a" * 60 * KB)
+    store.set("b", b"b" * 60 * KB)
+    assert store.pop("a") == b"a" * 60 * KB
+    assert "a" not in store and "a" not in store.usage()["keys_in_memory"]
+    assert store.pop("missing", 1) == 1
+
+
+def test_session_end_removes_spill_dir_and_files(tmp_path):
+    spill_dir = tmp_path / "spill"
+    backing = {}
+    store = get_session_store(backing, session_id="s1", budget_bytes=10 * KB, large_threshold=KB,
+                              spill_dir=str(spill_dir))
+    assert get_session_store(backing) is store
+    store.set("a", b"a" * 20 * KB)
+    store.set("b", b"b" * 20 * KB)
+    result = store.new_file(prefix="batch_result_", suffix=".csv")
+    assert os.path.dirname(result) == str(spill_dir)
+    assert len(os.listdir(spill_dir)) == 2
+
+    del store, backing
+    gc.collect()
+    assert not spill_dir.exists()